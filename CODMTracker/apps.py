@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class CODMTrackerConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'CODMTracker'
+
+    def ready(self):
+        from . import checks  # Vérifications de configuration (cache partagé entre workers)
+        from .images import connecter_signaux
+        connecter_signaux()  # Miniatures générées à l'enregistrement des images
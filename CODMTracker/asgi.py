@@ -3,6 +3,15 @@ ASGI config for CODMTracker project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Même projet que wsgi.py, mais les vues asynchrones (flux SSE des notifications)
+y gardent une connexion ouverte sans bloquer un worker :
+
+    gunicorn CODMTracker.asgi:application -k uvicorn.workers.UvicornWorker
+
+Le bus de CODMTracker/pubsub.py est en mémoire : un message publié par un
+processus n'atteint que les clients connectés à ce processus. Avec plusieurs
+workers, il faut un bus partagé (Redis...) derrière la même interface.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
@@ -13,4 +22,17 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'CODMTracker.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+
+async def application(scope, receive, send):
+    # Django ne gère que HTTP : le cycle de vie (lifespan) envoyé par uvicorn est acquitté ici
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    await django_application(scope, receive, send)
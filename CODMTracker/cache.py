@@ -0,0 +1,93 @@
+# CODMTracker/cache.py
+# Cache des pages publiques (visiteurs anonymes) et versions des fragments
+import hashlib
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+
+# Groupes de contenu invalidés par les signaux des modèles
+GROUPES_CACHE = ('pages', 'articles', 'forum', 'tournois')
+
+PREFIXE_VERSION = 'cache_version'
+PREFIXE_PAGE = 'page_anonyme'
+
+
+def _cle_version(groupe):
+    return f"{PREFIXE_VERSION}:{groupe}"
+
+
+def version_cache(groupe):
+    """Retourne la version courante d'un groupe (change à chaque invalidation)"""
+    version = cache.get(_cle_version(groupe))
+    if version is None:
+        cache.add(_cle_version(groupe), 1, timeout=None)
+        version = cache.get(_cle_version(groupe), 1)
+    return version
+
+
+def versions_cache():
+    """Retourne les versions de tous les groupes en une seule lecture du cache"""
+    cles = {_cle_version(groupe): groupe for groupe in GROUPES_CACHE}
+    trouvees = cache.get_many(cles.keys())
+    return {groupe: trouvees.get(cle, 1) for cle, groupe in cles.items()}
+
+
+def invalider_cache(*groupes):
+    """Invalide les pages et fragments d'un ou plusieurs groupes.
+
+    Les anciennes entrées ne sont pas supprimées : elles ne sont simplement
+    plus jamais lues et expirent d'elles-mêmes.
+    """
+    for groupe in groupes:
+        try:
+            cache.incr(_cle_version(groupe))
+        except ValueError:
+            # Clé absente (cache vidé ou jamais initialisé)
+            cache.set(_cle_version(groupe), 2, timeout=None)
+
+
+def _a_des_messages(request):
+    """True si des messages flash attendent d'être affichés (page non partageable)"""
+    if 'messages' in request.COOKIES:
+        return True
+    session = getattr(request, 'session', None)
+    return bool(session and session.get('_messages'))
+
+
+def _cle_page(request, groupe):
+    chemin = hashlib.md5(request.get_full_path().encode('utf-8')).hexdigest()
+    return f"{PREFIXE_PAGE}:{groupe}:{version_cache(groupe)}:{chemin}"
+
+
+def cache_anonyme(groupe, timeout=None):
+    """Décorateur : met en cache la réponse complète pour les visiteurs anonymes.
+
+    - Les utilisateurs connectés passent toujours par la vue (fragments en cache).
+    - Seules les réponses 200 sans cookie ni jeton CSRF sont stockées.
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'CACHE_PAGES_TIMEOUT', 300)
+
+    def decorateur(view_func):
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or request.user.is_authenticated or _a_des_messages(request):
+                return view_func(request, *args, **kwargs)
+
+            cle = _cle_page(request, groupe)
+            response = cache.get(cle)
+            if response is not None:
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            if (
+                response.status_code == 200
+                and not response.streaming
+                and not response.cookies
+                and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+                and not request.META.get('CSRF_COOKIE_USED')
+            ):
+                cache.set(cle, response, timeout)
+            return response
+        return _wrapped
+    return decorateur
@@ -0,0 +1,42 @@
+# CODMTracker/checks.py
+# Vérifications de configuration exécutées par manage.py check (et au démarrage)
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+CACHES_PAR_PROCESSUS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def verifier_cache_partage(app_configs, **kwargs):
+    """Le cache des pages, ses invalidations et les limites de débit doivent être communs aux workers"""
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.DEBUG or backend not in CACHES_PAR_PROCESSUS or getattr(settings, 'WEB_CONCURRENCY', 1) <= 1:
+        return []
+    return [Error(
+        f"Le cache par défaut ({backend}) est propre à chaque processus, avec {settings.WEB_CONCURRENCY} workers.",
+        hint=(
+            "Une invalidation ne viderait que le worker qui a traité l'écriture et chaque limite de débit "
+            "serait multipliée par le nombre de workers. Définissez REDIS_URL ou utilisez "
+            "django.core.cache.backends.db.DatabaseCache (manage.py createcachetable)."
+        ),
+        id='CODMTracker.E001',
+    )]
+
+
+@register()
+def verifier_flux_temps_reel(app_configs, **kwargs):
+    """Le bus des flux SSE est en mémoire : il ne relie pas plusieurs processus"""
+    if not getattr(settings, 'FLUX_TEMPS_REEL', False) or getattr(settings, 'WEB_CONCURRENCY', 1) <= 1:
+        return []
+    return [Warning(
+        f"FLUX_TEMPS_REEL est activé avec {settings.WEB_CONCURRENCY} workers.",
+        hint=(
+            "CODMTracker/pubsub.py ne livre un message qu'aux flux du processus qui l'a publié : "
+            "les autres onglets ne seraient pas notifiés. Servez le site avec un seul processus ASGI "
+            "ou laissez FLUX_TEMPS_REEL à False."
+        ),
+        id='CODMTracker.W001',
+    )]
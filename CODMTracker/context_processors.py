@@ -0,0 +1,8 @@
+from .cache import versions_cache
+
+
+def cache_versions(request):
+    """Context processor : versions des groupes de cache pour les balises {% cache %}"""
+    return {
+        'cache_versions': versions_cache()
+    }
@@ -0,0 +1,206 @@
+# CODMTracker/courriels.py
+# File d'envoi des courriels : la requête enregistre, le worker envoie par lots sur une connexion SMTP réutilisée
+# En production, seule la commande envoyer_courriels envoie (worker.sh) : les processus web ne font
+# qu'insérer dans la file. Avec COURRIELS_ENVOI_DIRECT (DEBUG, backend console...), envoi après le commit.
+import functools
+import logging
+import time
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import get_template
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Un courriel réservé par un worker qui s'arrête en route est repris après ce délai
+DELAI_RESERVATION = timedelta(minutes=5)
+# Attente avant le n-ième nouvel essai : 30 s, 1 min, 2 min, 4 min...
+DELAI_REESSAI_BASE = 30
+
+
+def _reglage(nom, defaut):
+    return getattr(settings, nom, defaut)
+
+
+# Modèles de courriels : templates/emails/<nom>.txt et .html (mise en page commune emails/base.html)
+CONTACT = 'contact@codmtracker.com'
+
+
+@functools.cache
+def _gabarits(modele):
+    """Versions texte et HTML du modèle, compilées une seule fois par processus"""
+    return get_template(f'emails/{modele}.txt'), get_template(f'emails/{modele}.html')
+
+
+def rendre(modele, contexte):
+    """(texte, html) du modèle : seules les variables du contexte sont évaluées à chaque envoi"""
+    texte, html = _gabarits(modele)
+    contexte = {'annee': timezone.localdate().year, 'contact': CONTACT, **contexte}
+    return texte.render(contexte).strip(), html.render(contexte)
+
+
+def _envoi_direct():
+    """Sans worker (développement) : la file est vidée dans la requête, une fois la transaction validée"""
+    def vider():
+        while envoyer_lot()[0]:
+            pass
+    if _reglage('COURRIELS_ENVOI_DIRECT', False):
+        transaction.on_commit(vider)
+
+
+def mettre_en_file(sujet, texte, destinataires, html='', expediteur=None):
+    """Enregistre un courriel, envoyé ensuite par la commande envoyer_courriels ; retourne la ligne créée"""
+    from .models import CourrielEnAttente
+
+    courriel = CourrielEnAttente.objects.create(
+        destinataires=list(destinataires),
+        expediteur=expediteur or _reglage('DEFAULT_FROM_EMAIL', ''),
+        sujet=sujet,
+        texte=texte,
+        html=html or '',
+        prochain_essai=timezone.now(),
+    )
+    _envoi_direct()
+    return courriel
+
+
+def envoyer_modele(modele, sujet, destinataires, contexte, expediteur=None):
+    """Rend le modèle et met le courriel en file"""
+    texte, html = rendre(modele, contexte)
+    return mettre_en_file(sujet, texte, destinataires, html=html, expediteur=expediteur)
+
+
+def envoyer_modele_en_masse(modele, sujet, envois, expediteur=None):
+    """Un courriel par (destinataire, contexte), inséré par lots ; retourne le nombre mis en file"""
+    from .models import CourrielEnAttente
+
+    expediteur = expediteur or _reglage('DEFAULT_FROM_EMAIL', '')
+    taille_lot = _reglage('COURRIELS_LOT', 50)
+    maintenant = timezone.now()
+    lot, total = [], 0
+    for destinataire, contexte in envois:
+        texte, html = rendre(modele, contexte)
+        lot.append(CourrielEnAttente(
+            destinataires=[destinataire],
+            expediteur=expediteur,
+            sujet=sujet,
+            texte=texte,
+            html=html,
+            prochain_essai=maintenant,
+        ))
+        if len(lot) >= taille_lot:
+            total += len(CourrielEnAttente.objects.bulk_create(lot))
+            lot = []
+    if lot:
+        total += len(CourrielEnAttente.objects.bulk_create(lot))
+    if total:
+        _envoi_direct()
+    return total
+
+
+def _reserver(taille_lot):
+    """Réserve jusqu'à taille_lot courriels dus pour ce worker (UPDATE conditionnel, sans verrou de ligne)"""
+    from .models import CourrielEnAttente
+
+    maintenant = timezone.now()
+    dus = CourrielEnAttente.objects.filter(
+        Q(statut=CourrielEnAttente.EN_ATTENTE) | Q(statut=CourrielEnAttente.EN_COURS),
+        prochain_essai__lte=maintenant,
+    )
+    ids = list(dus.order_by('prochain_essai').values_list('id', flat=True)[:taille_lot])
+    if not ids:
+        return []
+    jeton = uuid.uuid4().hex
+    # Un autre worker qui a réservé entre-temps a décalé prochain_essai : la ligne n'est plus prise ici
+    dus.filter(id__in=ids).update(
+        statut=CourrielEnAttente.EN_COURS,
+        jeton=jeton,
+        prochain_essai=maintenant + DELAI_RESERVATION,
+    )
+    return list(CourrielEnAttente.objects.filter(jeton=jeton, statut=CourrielEnAttente.EN_COURS).order_by('id'))
+
+
+def _message(courriel, connexion):
+    message = EmailMultiAlternatives(
+        subject=courriel.sujet,
+        body=courriel.texte,
+        from_email=courriel.expediteur or None,
+        to=courriel.destinataires,
+        connection=connexion,
+    )
+    if courriel.html:
+        message.attach_alternative(courriel.html, 'text/html')
+    return message
+
+
+def _echec(courriel, erreur, tentatives_max):
+    """Replanifie le courriel avec un délai croissant, ou l'abandonne après tentatives_max essais"""
+    from .models import CourrielEnAttente
+
+    courriel.tentatives += 1
+    definitif = courriel.tentatives >= tentatives_max
+    CourrielEnAttente.objects.filter(id=courriel.id).update(
+        statut=CourrielEnAttente.ECHEC if definitif else CourrielEnAttente.EN_ATTENTE,
+        tentatives=courriel.tentatives,
+        prochain_essai=timezone.now() + timedelta(seconds=DELAI_REESSAI_BASE * 2 ** (courriel.tentatives - 1)),
+        jeton='',
+        derniere_erreur=str(erreur)[:1000],
+    )
+    logger.warning(f"Échec d'envoi du courriel {courriel.id} (essai {courriel.tentatives}) : {erreur}")
+
+
+def envoyer_lot(taille_lot=None):
+    """Envoie un lot de courriels dus sur une seule connexion ; retourne (envoyés, en échec)"""
+    from .models import CourrielEnAttente
+
+    taille_lot = taille_lot or _reglage('COURRIELS_LOT', 50)
+    courriels = _reserver(taille_lot)
+    if not courriels:
+        return 0, 0
+
+    # Débit plafonné (quota du fournisseur SMTP) pour ce worker : avec N commandes
+    # envoyer_courriels en parallèle, le débit total est N × COURRIELS_PAR_SECONDE
+    intervalle = 1 / _reglage('COURRIELS_PAR_SECONDE', 5)
+    tentatives_max = _reglage('COURRIELS_TENTATIVES_MAX', 5)
+    envoyes, echecs = [], 0
+    restants = list(courriels)
+    connexion = get_connection(fail_silently=False)
+    try:
+        connexion.open()
+        while restants:
+            courriel = restants.pop(0)
+            debut = time.monotonic()
+            try:
+                _message(courriel, connexion).send()
+                envoyes.append(courriel.id)
+            except Exception as e:
+                echecs += 1
+                _echec(courriel, e, tentatives_max)
+                # La connexion peut être tombée : on repart sur une connexion neuve
+                connexion.close()
+                connexion.open()
+            attente = intervalle - (time.monotonic() - debut)
+            if attente > 0 and restants:
+                time.sleep(attente)
+    except Exception as e:
+        # Serveur injoignable : le reste du lot est replanifié comme un échec
+        logger.error(f"Serveur d'envoi indisponible : {e}")
+        for courriel in restants:
+            echecs += 1
+            _echec(courriel, e, tentatives_max)
+    finally:
+        connexion.close()
+
+    if envoyes:
+        CourrielEnAttente.objects.filter(id__in=envoyes).update(
+            statut=CourrielEnAttente.ENVOYE,
+            date_envoi=timezone.now(),
+            jeton='',
+            derniere_erreur='',
+        )
+    logger.info(f"Courriels : {len(envoyes)} envoyé(s), {echecs} en échec")
+    return len(envoyes), echecs
@@ -0,0 +1,98 @@
+# CODMTracker/db_router.py
+# Routage des lectures vers la réplique pour les modèles très consultés
+import logging
+import time
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+ALIAS_PRIMAIRE = 'default'
+ALIAS_REPLIQUE = 'replica'
+
+# Modèles dont les lectures peuvent être servies par la réplique
+MODELES_REPLIQUE = {
+    'forum.post',
+    'forum.commentaire',
+    'statistiques.statistiquesjoueur',
+    'articles.article',
+    'tournois.tournoi',
+}
+
+# True pendant une requête qui doit tout lire sur la primaire (écriture, read-your-writes)
+_forcer_primaire = ContextVar('forcer_primaire', default=False)
+
+# État de la réplique mis en cache dans le processus : (disponible, vérifié_le)
+_etat_replique = {'disponible': True, 'verifie_le': 0.0}
+
+
+def forcer_primaire(actif=True):
+    """Force (ou non) les lectures sur la primaire pour le contexte courant, retourne le jeton de reset"""
+    return _forcer_primaire.set(actif)
+
+
+def retablir(jeton):
+    _forcer_primaire.reset(jeton)
+
+
+def _retard_replique(connection):
+    """Retard de réplication en secondes (0 si la base n'est pas une réplique en streaming)"""
+    if connection.vendor != 'postgresql':
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT CASE WHEN pg_is_in_recovery() "
+            "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+            "ELSE 0 END"
+        )
+        return float(cursor.fetchone()[0] or 0)
+
+
+def replique_disponible():
+    """Vérifie (au plus toutes les REPLICA_VERIFICATION_SECONDES) que la réplique répond et n'est pas en retard"""
+    maintenant = time.monotonic()
+    intervalle = getattr(settings, 'REPLICA_VERIFICATION_SECONDES', 10)
+    if maintenant - _etat_replique['verifie_le'] < intervalle:
+        return _etat_replique['disponible']
+
+    _etat_replique['verifie_le'] = maintenant
+    try:
+        retard = _retard_replique(connections[ALIAS_REPLIQUE])
+        disponible = retard <= getattr(settings, 'REPLICA_RETARD_MAX', 5)
+        if not disponible:
+            logger.warning(f"Réplique en retard de {retard:.1f}s : lectures sur la primaire")
+    except Exception as e:
+        logger.error(f"Réplique injoignable, repli sur la primaire : {e}")
+        disponible = False
+    _etat_replique['disponible'] = disponible
+    return disponible
+
+
+class ReplicaRouter:
+    """Envoie les lectures des modèles de MODELES_REPLIQUE vers la réplique.
+
+    - Toutes les écritures vont sur la primaire.
+    - Lectures sur la primaire si la requête est forcée (voir ReplicaMiddleware),
+      si une transaction est ouverte ou si la réplique est en retard.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.label_lower not in MODELES_REPLIQUE:
+            return ALIAS_PRIMAIRE
+        if _forcer_primaire.get() or connections[ALIAS_PRIMAIRE].in_atomic_block:
+            return ALIAS_PRIMAIRE
+        if not replique_disponible():
+            return ALIAS_PRIMAIRE
+        return ALIAS_REPLIQUE
+
+    def db_for_write(self, model, **hints):
+        return ALIAS_PRIMAIRE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Même données des deux côtés : les relations sont toujours valides
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # La réplique reçoit le schéma par réplication
+        return db == ALIAS_PRIMAIRE
@@ -0,0 +1,69 @@
+# CODMTracker/error_pages.py
+# Pages d'erreur 404/500 pré-rendues une seule fois par processus (visiteurs anonymes)
+import logging
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_ERREUR = {
+    404: '404.html',
+    500: '500.html',
+}
+
+# Cache en mémoire : status -> HTML encodé
+_pages_rendues = {}
+
+
+def rendre_page_erreur(status):
+    """Retourne le HTML (bytes) de la page d'erreur, rendu au premier appel puis servi depuis le cache"""
+    contenu = _pages_rendues.get(status)
+    if contenu is None:
+        # Rendu sans requête : la page est identique pour tous les visiteurs anonymes
+        contenu = render_to_string(TEMPLATES_ERREUR[status]).encode('utf-8')
+        _pages_rendues[status] = contenu
+    return contenu
+
+
+def prechauffer_pages_erreur():
+    """Pré-rend toutes les pages d'erreur (appelé au démarrage par le middleware)"""
+    for status in TEMPLATES_ERREUR:
+        try:
+            rendre_page_erreur(status)
+        except Exception as e:
+            # On réessaiera au premier besoin plutôt que d'empêcher le démarrage
+            logger.warning(f"Pré-rendu de la page {status} impossible : {e}")
+
+
+def _contenu_erreur(status, request):
+    """Utilisateur connecté : rendu avec la requête (navigation, notifications, messages).
+    Anonyme, ou rendu impossible (base indisponible pendant une 500) : page pré-rendue."""
+    user = getattr(request, 'user', None) if request is not None else None
+    if user is not None and user.is_authenticated:
+        try:
+            return render_to_string(TEMPLATES_ERREUR[status], request=request).encode('utf-8')
+        except Exception as e:
+            logger.warning(f"Rendu de la page {status} avec la requête impossible : {e}")
+    return rendre_page_erreur(status)
+
+
+def reponse_erreur(status, request=None):
+    """Construit la réponse HTML de la page d'erreur (en cache pour les visiteurs anonymes)"""
+    response = HttpResponse(
+        _contenu_erreur(status, request),
+        status=status,
+        content_type='text/html; charset=utf-8',
+    )
+    # Marqueur : évite que les middlewares ne rendent la page une seconde fois
+    response.page_erreur = True
+    return response
+
+
+def est_reponse_api(request, response):
+    """True si la réponse est destinée à du JavaScript (JSON / AJAX) et doit rester intacte"""
+    if response.get('Content-Type', '').startswith('application/json'):
+        return True
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return True
+    accept = request.headers.get('Accept', '')
+    return 'application/json' in accept and 'text/html' not in accept
@@ -0,0 +1,206 @@
+# CODMTracker/images.py
+# Miniatures WebP/JPEG des images envoyées : générées en arrière-plan, servies via srcset
+import hashlib
+import logging
+import os
+from io import BytesIO
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.signals import post_save
+from PIL import Image, ImageOps
+from .stockage import empreinte_contenu, est_immuable
+from .taches import Regroupeur
+
+logger = logging.getLogger(__name__)
+
+# Champs image du projet : modèle → noms des champs
+CHAMPS_IMAGES = {
+    'profils.ProfilJoueur': ['avatar'],
+    'boutique.Categorie': ['image'],
+    'boutique.Produit': ['image'],
+    'articles.Article': ['image'],
+    'articles.ArticleImage': ['image'],
+    'forum.Post': ['image'],
+    'tournois.Tournoi': ['image'],
+}
+
+# Largeurs générées (jamais au-delà de la largeur de l'original)
+LARGEURS = (64, 160, 320, 640, 1280)
+QUALITE = {'webp': 80, 'jpg': 82}
+DOSSIER = 'derives'
+
+PREFIXE_CACHE = 'image_derivee'
+# Miniatures pas encore générées : on retente la lecture en base après ce délai
+DUREE_CACHE_ABSENT = 60
+
+
+def chemin_derive(empreinte, largeur, extension):
+    return f"{DOSSIER}/{empreinte[:2]}/{empreinte}-{largeur}.{extension}"
+
+
+def _cle_cache(nom):
+    return f"{PREFIXE_CACHE}:{hashlib.md5(nom.encode('utf-8')).hexdigest()}"
+
+
+def _enregistrer(image, chemin, extension):
+    """Enregistre un dérivé sans métadonnées (ni EXIF ni GPS : rien n'est passé à save)"""
+    if default_storage.exists(chemin):
+        # Même contenu déjà traité (image renvoyée à l'identique)
+        return
+    tampon = BytesIO()
+    if extension == 'jpg':
+        if image.mode != 'RGB':
+            fond = Image.new('RGB', image.size, (255, 255, 255))
+            fond.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+            image = fond
+        image.save(tampon, 'JPEG', quality=QUALITE['jpg'], optimize=True, progressive=True)
+    else:
+        image.save(tampon, 'WEBP', quality=QUALITE['webp'], method=4)
+    default_storage.save(chemin, ContentFile(tampon.getvalue()))
+
+
+def _charger(fichier, cote_max):
+    """(image orientée tenant dans cote_max × cote_max, dimensions orientées de l'original).
+
+    Les JPEG sont décodés directement à l'échelle 1/2, 1/4 ou 1/8 (draft) : la
+    mémoire dépend de la taille visée, pas de celle de la photo envoyée.
+    """
+    with Image.open(fichier) as source:
+        taille = source.size
+        if source.getexif().get(0x0112) in (5, 6, 7, 8):
+            # Rotation de 90° à appliquer : largeur et hauteur s'échangent
+            taille = taille[::-1]
+        if source.format == 'JPEG':
+            source.draft('RGB', (cote_max, cote_max))
+        # Orientation de l'appareil appliquée aux pixels avant de perdre l'EXIF
+        image = ImageOps.exif_transpose(source)
+        image = image.convert('RGBA' if 'A' in image.getbands() or image.mode == 'P' else 'RGB')
+    if max(image.size) > cote_max:
+        image.thumbnail((cote_max, cote_max), Image.LANCZOS)
+    return image, taille
+
+
+def reduire_original(nom):
+    """Remplace un original plus grand que IMAGES_DIMENSION_MAX par une version réduite.
+
+    Les références des champs image sont mises à jour (UPDATE, sans signal) ;
+    l'ancien fichier devient orphelin et part avec nettoyer_medias.
+    Retourne le nom à utiliser pour la suite.
+    """
+    dimension_max = getattr(settings, 'IMAGES_DIMENSION_MAX', 2560)
+    with default_storage.open(nom, 'rb') as fichier:
+        with Image.open(fichier) as source:
+            if max(source.size) <= dimension_max:
+                return nom
+        fichier.seek(0)
+        image, _ = _charger(fichier, dimension_max)
+
+    tampon = BytesIO()
+    if 'A' in image.getbands():
+        image.save(tampon, 'PNG', optimize=True)
+        extension = '.png'
+    else:
+        image.save(tampon, 'JPEG', quality=88, optimize=True, progressive=True)
+        extension = '.jpg'
+    # Nom neutre : le stockage le remplace par l'empreinte du contenu réduit
+    nouveau = default_storage.save(f'reduite{extension}', ContentFile(tampon.getvalue()))
+
+    for label, champs in CHAMPS_IMAGES.items():
+        modele = apps.get_model(label)
+        for champ in champs:
+            modele._base_manager.filter(**{champ: nom}).update(**{champ: nouveau})
+    logger.info(f"Original réduit : {nom} → {nouveau} ({image.width}×{image.height})")
+    return nouveau
+
+
+def generer(nom):
+    """Génère les dérivés d'une image du stockage ; retourne l'ImageDerivee ou None si illisible"""
+    from .models import ImageDerivee
+
+    try:
+        with default_storage.open(nom, 'rb') as fichier:
+            if est_immuable(nom):
+                # Nom par empreinte : inutile de relire tout le fichier
+                empreinte = os.path.basename(nom).split('.')[0]
+            else:
+                empreinte = empreinte_contenu(fichier)
+            image, (largeur_originale, hauteur_originale) = _charger(fichier, LARGEURS[-1])
+    except FileNotFoundError:
+        raise
+    except (OSError, Image.DecompressionBombError) as e:
+        logger.warning(f"Image illisible, pas de miniatures pour {nom} : {e}")
+        return None
+
+    largeurs = sorted({min(largeur, image.width) for largeur in LARGEURS})
+    for largeur in largeurs:
+        hauteur = max(1, round(image.height * largeur / image.width))
+        reduite = image if largeur == image.width else image.resize((largeur, hauteur), Image.LANCZOS)
+        for extension in ('webp', 'jpg'):
+            _enregistrer(reduite, chemin_derive(empreinte, largeur, extension), extension)
+
+    derivee, _ = ImageDerivee.objects.update_or_create(original=nom, defaults={
+        'empreinte': empreinte,
+        'largeur': largeur_originale,
+        'hauteur': hauteur_originale,
+        'largeurs': largeurs,
+    })
+    cache.delete(_cle_cache(nom))
+    return derivee
+
+
+def traiter(nom):
+    """Réduit l'original si besoin, puis génère ses miniatures"""
+    return generer(reduire_original(nom))
+
+
+def generer_lot(noms):
+    """Traitement du Regroupeur : images pas encore dérivées uniquement"""
+    from .models import ImageDerivee
+
+    deja = set(ImageDerivee.objects.filter(original__in=noms).values_list('original', flat=True))
+    for nom in sorted(set(noms) - deja):
+        try:
+            traiter(nom)
+        except FileNotFoundError:
+            logger.warning(f"Image introuvable dans le stockage : {nom}")
+        except (OSError, Image.DecompressionBombError) as e:
+            logger.warning(f"Image illisible : {nom} : {e}")
+
+
+# Une rafale d'enregistrements (import, admin) ne lance qu'un traitement
+file_derives = Regroupeur(generer_lot, delai=1.0, taille_max=20)
+
+
+def derives(nom):
+    """(empreinte, largeurs) des miniatures d'une image, ou None si elles n'existent pas encore"""
+    cle = _cle_cache(nom)
+    trouve = cache.get(cle)
+    if trouve is None:
+        from .models import ImageDerivee
+
+        ligne = ImageDerivee.objects.filter(original=nom).values_list('empreinte', 'largeurs').first()
+        # Le nom d'un original ne change jamais de contenu : entrée permanente une fois générée
+        cache.set(cle, ligne or (), timeout=None if ligne else DUREE_CACHE_ABSENT)
+        if not ligne:
+            # Image antérieure aux miniatures : générée au passage, l'original est servi en attendant
+            file_derives.ajouter(nom)
+        trouve = ligne or ()
+    return tuple(trouve) or None
+
+
+def _planifier(sender, instance, **kwargs):
+    noms = [
+        getattr(instance, champ).name
+        for champ in CHAMPS_IMAGES[sender._meta.label]
+        if getattr(instance, champ)
+    ]
+    if noms:
+        file_derives.ajouter(*noms)
+
+
+def connecter_signaux():
+    for label in CHAMPS_IMAGES:
+        post_save.connect(_planifier, sender=apps.get_model(label), dispatch_uid=f'images_derivees:{label}')
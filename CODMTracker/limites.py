@@ -0,0 +1,175 @@
+# CODMTracker/limites.py
+# Limitation de débit (connexion, inscription, OTP, endpoints JSON) : compteurs dans le cache par défaut
+import hashlib
+import math
+import time
+from functools import wraps
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.shortcuts import redirect
+
+PREFIXE = 'limite'
+PREFIXE_STATS = 'limite_stats'
+
+# Règle → (capacité, période en secondes) : un seau de `capacité` jetons rempli en `période`.
+# Surchargeables par settings.LIMITES = {'connexion_ip': (50, 300), ...}
+REGLES = {
+    'connexion_ip': (30, 300),
+    'connexion_identifiant': (5, 300),
+    'inscription_ip': (20, 3600),
+    'otp_ip': (10, 3600),
+    'otp_identifiant': (3, 600),
+    'mot_de_passe_ip': (20, 3600),
+    'api': (120, 60),
+    # Hachages de mots de passe pour tout le site (clé unique), voir prendre_hachage
+    'hachage': (10, 1),
+}
+
+# Historique des statistiques exposées au staff
+MINUTES_STATS = 60
+
+MESSAGE = "Trop de tentatives. Réessayez dans {minutes} minute(s)."
+
+
+def _regle(nom):
+    return {**REGLES, **getattr(settings, 'LIMITES', {})}[nom]
+
+
+def _incr(cle, timeout):
+    """cache.add puis incr : atomique avec Redis, lecture puis écriture avec DatabaseCache"""
+    cache.add(cle, 0, timeout)
+    try:
+        return cache.incr(cle)
+    except ValueError:
+        # Clé expirée entre add et incr
+        cache.set(cle, 1, timeout)
+        return 1
+
+
+def _compter_stats(regle, autorise):
+    minute = int(time.time() // 60)
+    _incr(f"{PREFIXE_STATS}:{regle}:{'ok' if autorise else 'refus'}:{minute}", (MINUTES_STATS + 1) * 60)
+
+
+def consommer(regle, identite):
+    """Prend un jeton pour identite ; retourne (autorisé, secondes avant le prochain jeton).
+
+    Le seau est compté sur une fenêtre glissante : jetons pris dans la fenêtre
+    courante + ceux de la précédente au prorata du temps restant : un incr et
+    une lecture par appel, sans verrou. Les workers ne partagent la limite que si
+    le cache est commun (Redis, DatabaseCache ; LocMem n'est accepté qu'avec un
+    seul worker, voir checks.py). Seul Redis rend l'incr atomique : avec
+    DatabaseCache, des requêtes simultanées peuvent perdre un incrément et la
+    limite est approximative sous forte concurrence.
+    """
+    capacite, periode = _regle(regle)
+    empreinte = hashlib.md5(str(identite).encode('utf-8')).hexdigest()
+    position = time.time() / periode
+    fenetre = int(position)
+    ecoule = position - fenetre
+
+    courant = _incr(f"{PREFIXE}:{regle}:{empreinte}:{fenetre}", periode * 2)
+    precedent = cache.get(f"{PREFIXE}:{regle}:{empreinte}:{fenetre - 1}", 0)
+    autorise = courant + precedent * (1 - ecoule) <= capacite
+    _compter_stats(regle, autorise)
+    if autorise:
+        return True, 0
+    return False, math.ceil(periode * (1 - ecoule))
+
+
+def ip_client(request):
+    """Adresse du client, derrière PROXYS_DE_CONFIANCE proxys (X-Forwarded-For lu depuis la droite)"""
+    proxys = getattr(settings, 'PROXYS_DE_CONFIANCE', 0)
+    if proxys:
+        adresses = [a.strip() for a in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if a.strip()]
+        if len(adresses) >= proxys:
+            return adresses[-proxys]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+# Clés de limitation : request → identité, ou None pour ne pas compter la requête
+
+def par_ip(request):
+    return ip_client(request)
+
+
+def par_utilisateur(request):
+    if request.user.is_authenticated:
+        return f'u{request.user.pk}'
+    return ip_client(request)
+
+
+def par_champ(nom):
+    """Valeur du champ POST (email, identifiant...), normalisée"""
+    def cle(request):
+        return request.POST.get(nom, '').strip().lower() or None
+    return cle
+
+
+def limiter(regle, cle=par_ip, methodes=('POST',), json=False):
+    """Décorateur : refuse la requête quand le seau de la règle est vide pour cette clé.
+
+    Les vues HTML reçoivent un message et une redirection (302) vers la même page,
+    les endpoints JSON (json=True) une réponse 429 {'success': False, 'error': ...} ;
+    Retry-After dans les deux cas.
+    """
+    def decorateur(view_func):
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            if request.method in methodes:
+                identite = cle(request)
+                if identite:
+                    autorise, attente = consommer(regle, identite)
+                    if not autorise:
+                        return reponse_refus(request, attente, json)
+            return view_func(request, *args, **kwargs)
+        return _wrapped
+    return decorateur
+
+
+def reponse_refus(request, attente, json=False):
+    message = MESSAGE.format(minutes=max(1, math.ceil(attente / 60)))
+    if json:
+        response = JsonResponse({'success': False, 'error': message}, status=429)
+    else:
+        messages.error(request, message)
+        response = redirect(request.get_full_path())
+    response['Retry-After'] = str(attente)
+    return response
+
+
+def prendre_hachage():
+    """Jeton du seau 'hachage', pris juste avant de hacher un mot de passe ; (autorisé, attente).
+
+    Un sémaphore par processus ne borne rien avec plusieurs workers : le seau est
+    une clé unique du cache partagé, le hachage en trop est refusé au lieu de s'empiler.
+    Seuls les vrais hachages le consomment (pas les étapes OTP ni les identifiants inconnus).
+    """
+    return consommer('hachage', 'global')
+
+
+def statistiques(minutes=MINUTES_STATS):
+    """Requêtes autorisées / refusées par règle sur les dernières minutes (une lecture du cache)"""
+    regles = list({**REGLES, **getattr(settings, 'LIMITES', {})})
+    actuelle = int(time.time() // 60)
+    plage = range(actuelle - minutes + 1, actuelle + 1)
+    cles = [
+        f"{PREFIXE_STATS}:{regle}:{statut}:{minute}"
+        for regle in regles for statut in ('ok', 'refus') for minute in plage
+    ]
+    valeurs = cache.get_many(cles)
+    resultat = {}
+    for regle in regles:
+        series = {
+            statut: [valeurs.get(f"{PREFIXE_STATS}:{regle}:{statut}:{minute}", 0) for minute in plage]
+            for statut in ('ok', 'refus')
+        }
+        resultat[regle] = {
+            'capacite': _regle(regle),
+            'autorisees': {'1min': series['ok'][-1], '5min': sum(series['ok'][-5:]), f'{minutes}min': sum(series['ok'])},
+            'refusees': {'1min': series['refus'][-1], '5min': sum(series['refus'][-5:]), f'{minutes}min': sum(series['refus'])},
+            'par_minute': series,
+        }
+    return resultat
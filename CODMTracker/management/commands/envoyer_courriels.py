@@ -0,0 +1,69 @@
+"""
+Envoie les courriels en file (nouveaux essais compris), à lancer par cron ou en continu.
+Seul expéditeur du site : les processus web ne font que mettre en file. Le débit
+COURRIELS_PAR_SECONDE est appliqué par instance de la commande.
+Usage: python manage.py envoyer_courriels --continu --purger-jours 7
+"""
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from CODMTracker.courriels import envoyer_lot
+from CODMTracker.models import CourrielEnAttente
+
+
+class Command(BaseCommand):
+    help = 'Envoie les courriels dus de la file par lots, sur une connexion SMTP par lot'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=None,
+            help='Courriels envoyés par connexion (défaut : COURRIELS_LOT)',
+        )
+        parser.add_argument(
+            '--continu',
+            action='store_true',
+            help='Reste actif et relève la file toutes les --intervalle secondes',
+        )
+        parser.add_argument(
+            '--intervalle',
+            type=float,
+            default=5,
+            help='Attente entre deux relèves de la file en mode continu',
+        )
+        parser.add_argument(
+            '--purger-jours',
+            type=int,
+            default=None,
+            help='Supprime les courriels envoyés depuis plus de N jours',
+        )
+
+    def handle(self, *args, **options):
+        total_envoyes = total_echecs = 0
+        try:
+            while True:
+                envoyes, echecs = envoyer_lot(options['taille_lot'])
+                total_envoyes += envoyes
+                total_echecs += echecs
+                if envoyes or echecs:
+                    self.stdout.write(f"📨 {envoyes} envoyé(s), {echecs} en échec")
+                    continue
+                if not options['continu']:
+                    break
+                time.sleep(options['intervalle'])
+        except KeyboardInterrupt:
+            pass
+
+        if options['purger_jours'] is not None:
+            limite = timezone.now() - timedelta(days=options['purger_jours'])
+            supprimes, _ = CourrielEnAttente.objects.filter(
+                statut=CourrielEnAttente.ENVOYE, date_envoi__lt=limite
+            ).delete()
+            self.stdout.write(f"🗑️ {supprimes} courriel(s) envoyé(s) purgé(s)")
+
+        restants = CourrielEnAttente.objects.filter(statut=CourrielEnAttente.ECHEC).count()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {total_envoyes} courriel(s) envoyé(s), {total_echecs} échec(s) ; {restants} en échec définitif"
+        ))
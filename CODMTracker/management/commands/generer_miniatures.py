@@ -0,0 +1,69 @@
+"""
+Génère les miniatures des images déjà envoyées (avatars, produits, articles, posts, tournois)
+Usage: python manage.py generer_miniatures --taille-lot 200
+"""
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from CODMTracker.images import CHAMPS_IMAGES, traiter
+from CODMTracker.models import ImageDerivee
+
+
+class Command(BaseCommand):
+    help = 'Génère (ou régénère avec --forcer) les miniatures WebP/JPEG de toutes les images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=200,
+            help='Nombre d\'objets lus par requête',
+        )
+        parser.add_argument(
+            '--forcer',
+            action='store_true',
+            help='Régénère aussi les images qui ont déjà leurs miniatures',
+        )
+
+    def handle(self, *args, **options):
+        taille_lot = options['taille_lot']
+        generees = ignorees = erreurs = 0
+
+        for label, champs in CHAMPS_IMAGES.items():
+            modele = apps.get_model(label)
+            for champ in champs:
+                dernier_id = 0
+                # Parcours keyset sur l'id, seulement les lignes qui ont une image
+                while True:
+                    lignes = list(
+                        modele.objects.filter(pk__gt=dernier_id)
+                        .exclude(**{champ: ''}).exclude(**{f'{champ}__isnull': True})
+                        .order_by('pk')
+                        .values_list('pk', champ)[:taille_lot]
+                    )
+                    if not lignes:
+                        break
+                    dernier_id = lignes[-1][0]
+                    noms = [nom for _, nom in lignes]
+                    deja = set()
+                    if not options['forcer']:
+                        deja = set(ImageDerivee.objects.filter(original__in=noms).values_list('original', flat=True))
+                    for nom in noms:
+                        if nom in deja:
+                            ignorees += 1
+                            continue
+                        try:
+                            if traiter(nom):
+                                generees += 1
+                            else:
+                                erreurs += 1
+                        except FileNotFoundError:
+                            erreurs += 1
+                            self.stdout.write(self.style.WARNING(f'⚠️ Fichier introuvable : {nom}'))
+                        except OSError as e:
+                            erreurs += 1
+                            self.stdout.write(self.style.WARNING(f'⚠️ Image illisible : {nom} ({e})'))
+                self.stdout.write(f'→ {label}.{champ} traité')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ {generees} image(s) traitée(s), {ignorees} déjà à jour, {erreurs} en erreur'
+        ))
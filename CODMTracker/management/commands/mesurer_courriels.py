@@ -0,0 +1,71 @@
+"""
+Compare le coût de rendu des emails : modèles recompilés à chaque envoi vs compilés une fois
+Usage: python manage.py mesurer_courriels --iterations 2000
+"""
+import time
+from django.core.management.base import BaseCommand
+from django.template import Context, Engine, engines
+from django.utils import timezone
+from CODMTracker.courriels import CONTACT, rendre
+
+# Contexte type de chaque modèle
+CONTEXTES = {
+    'code_otp': {'code': '483920', 'minutes': 10},
+    'commande_payee': {
+        'prenom': 'Awa', 'numero': 'CMD-awa-20260101120000-1', 'total': '15000.00',
+        'frais_livraison': '1000.00', 'total_avec_livraison': '16000.00', 'adresse': 'Cocody, Abidjan',
+    },
+    'rappel_tournoi': {
+        'prenom': 'Awa', 'tournoi': 'Coupe CODM', 'mode': 'Battle Royale',
+        'date_debut': timezone.now(), 'recompense': '50 000 FCFA', 'lien': 'https://codmtracker.com/tournois/',
+    },
+}
+
+
+def moteur_sans_cache():
+    """Même configuration que le moteur du projet, sans le loader en cache : chaque get_template recompile"""
+    moteur = engines['django'].engine
+    return Engine(
+        dirs=moteur.dirs,
+        loaders=['django.template.loaders.filesystem.Loader', 'django.template.loaders.app_directories.Loader'],
+        libraries=moteur.libraries,
+    )
+
+
+class Command(BaseCommand):
+    help = 'Mesure le rendu texte + HTML de chaque modèle d\'email, avec et sans compilation préalable'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=1000,
+            help='Nombre de rendus par mesure',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        moteur = moteur_sans_cache()
+
+        for modele, contexte in CONTEXTES.items():
+            complet = {'annee': timezone.localdate().year, 'contact': CONTACT, **contexte}
+
+            debut = time.perf_counter()
+            for _ in range(iterations):
+                moteur.get_template(f'emails/{modele}.txt').render(Context(complet))
+                moteur.get_template(f'emails/{modele}.html').render(Context(complet))
+            recompile = time.perf_counter() - debut
+
+            rendre(modele, contexte)  # compilation unique, hors mesure
+            debut = time.perf_counter()
+            for _ in range(iterations):
+                rendre(modele, contexte)
+            precompile = time.perf_counter() - debut
+
+            self.stdout.write(
+                f"✉️ {modele:<16} recompilé : {recompile / iterations * 1e6:8.1f} µs/email   "
+                f"précompilé : {precompile / iterations * 1e6:8.1f} µs/email   "
+                f"(x{recompile / precompile:.1f}, {iterations / precompile:,.0f} emails/s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {iterations} rendus par mesure"))
@@ -0,0 +1,144 @@
+"""
+Copie toutes les données d'une base SQLite vers la base configurée (PostgreSQL)
+Usage: python manage.py migrer_sqlite_vers_postgres --source db.sqlite3
+
+La base de destination doit déjà être migrée (python manage.py migrate).
+"""
+from contextlib import contextmanager
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connections, transaction, models
+from CODMTracker.database import config_sqlite
+
+ALIAS_SOURCE = 'sqlite_source'
+
+
+def modeles_ordonnes():
+    """Tous les modèles concrets (tables M2M incluses), parents avant enfants"""
+    modeles = [
+        m for m in apps.get_models(include_auto_created=True)
+        if m._meta.managed and not m._meta.proxy
+    ]
+    ordonnes, vus = [], set()
+
+    def visiter(modele, pile=()):
+        if modele in vus or modele in pile:
+            return
+        for champ in modele._meta.concrete_fields:
+            cible = champ.related_model if champ.is_relation else None
+            if cible is not None and cible is not modele and cible in modeles:
+                visiter(cible, pile + (modele,))
+        vus.add(modele)
+        ordonnes.append(modele)
+
+    for modele in modeles:
+        visiter(modele)
+    return ordonnes
+
+
+@contextmanager
+def dates_brutes(modele):
+    """Désactive auto_now / auto_now_add pour conserver les dates d'origine"""
+    champs = [
+        f for f in modele._meta.concrete_fields
+        if isinstance(f, models.DateField) and (f.auto_now or f.auto_now_add)
+    ]
+    etats = [(f, f.auto_now, f.auto_now_add) for f in champs]
+    for f in champs:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in etats:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Copie les données SQLite vers la base par défaut (PostgreSQL), par lots'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            type=str,
+            default=str(settings.BASE_DIR / 'db.sqlite3'),
+            help='Chemin du fichier SQLite à copier',
+        )
+        parser.add_argument(
+            '--destination',
+            type=str,
+            default='default',
+            help='Alias de la base de destination',
+        )
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=1000,
+            help='Nombre de lignes lues et insérées par lot',
+        )
+        parser.add_argument(
+            '--noinput',
+            action='store_true',
+            help='Ne pas demander de confirmation avant de vider la destination',
+        )
+
+    def handle(self, *args, **options):
+        destination = options['destination']
+        taille_lot = options['taille_lot']
+
+        if connections[destination].vendor == 'sqlite':
+            raise CommandError('La destination est déjà une base SQLite : configurez DATABASE_URL.')
+
+        # configure_settings complète les clés par défaut (TIME_ZONE, CONN_MAX_AGE, AUTOCOMMIT, TEST...)
+        # qu'un alias ajouté après le démarrage n'a pas
+        source = connections.configure_settings({
+            **connections.settings,
+            ALIAS_SOURCE: config_sqlite(options['source']),
+        })[ALIAS_SOURCE]
+        connections.settings[ALIAS_SOURCE] = source
+
+        if not options['noinput']:
+            reponse = input(f'⚠️ Toutes les données de "{destination}" vont être remplacées. Continuer ? (oui/non) ')
+            if reponse.strip().lower() not in ('oui', 'o', 'yes', 'y'):
+                self.stdout.write(self.style.WARNING('Migration annulée.'))
+                return
+
+        ordre = modeles_ordonnes()
+
+        with transaction.atomic(using=destination):
+            # Vider la destination (enfants d'abord) : contenttypes et permissions
+            # créés par migrate doivent reprendre les identifiants de la source
+            for modele in reversed(ordre):
+                modele._base_manager.using(destination).all()._raw_delete(destination)
+
+            for modele in ordre:
+                total = self.copier_modele(modele, destination, taille_lot)
+                self.stdout.write(f'✓ {modele._meta.label}: {total} ligne(s)')
+
+            # Réaligner les séquences d'identifiants sur les données copiées
+            sql = connections[destination].ops.sequence_reset_sql(no_style(), ordre)
+            with connections[destination].cursor() as cursor:
+                for requete in sql:
+                    cursor.execute(requete)
+
+        connections[ALIAS_SOURCE].close()
+        self.stdout.write(self.style.SUCCESS('\n✅ Migration SQLite → PostgreSQL terminée'))
+
+    def copier_modele(self, modele, destination, taille_lot):
+        """Copie une table par lots ordonnés sur la clé primaire (pas d'OFFSET)"""
+        pk = modele._meta.pk.attname
+        queryset = modele._base_manager.using(ALIAS_SOURCE).order_by(pk)
+        total = 0
+        dernier = None
+
+        with dates_brutes(modele):
+            while True:
+                lot_qs = queryset if dernier is None else queryset.filter(**{f'{pk}__gt': dernier})
+                lot = list(lot_qs[:taille_lot])
+                if not lot:
+                    break
+                modele._base_manager.using(destination).bulk_create(lot, batch_size=taille_lot)
+                total += len(lot)
+                dernier = getattr(lot[-1], pk)
+        return total
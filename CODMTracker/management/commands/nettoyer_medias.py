@@ -0,0 +1,125 @@
+"""
+Supprime les fichiers médias qui ne sont plus référencés par aucun champ fichier/image
+Usage: python manage.py nettoyer_medias --age-min 24 --taille-lot 500 [--simulation]
+"""
+from datetime import timedelta
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import models
+from django.utils import timezone
+from CODMTracker.images import chemin_derive
+from CODMTracker.models import ImageDerivee
+
+
+def parcourir(stockage, dossier=''):
+    """Tous les fichiers du stockage, dossier par dossier"""
+    dossiers, fichiers = stockage.listdir(dossier)
+    for fichier in fichiers:
+        yield f'{dossier}/{fichier}' if dossier else fichier
+    for sous_dossier in dossiers:
+        yield from parcourir(stockage, f'{dossier}/{sous_dossier}' if dossier else sous_dossier)
+
+
+class Command(BaseCommand):
+    help = 'Supprime par lots les médias orphelins (originaux et miniatures) après lecture de toutes les références'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=500,
+            help='Nombre de lignes lues (et de fichiers supprimés) par lot',
+        )
+        parser.add_argument(
+            '--age-min',
+            type=int,
+            default=24,
+            help='Âge minimal en heures d\'un fichier supprimé (envois en cours épargnés)',
+        )
+        parser.add_argument(
+            '--simulation',
+            action='store_true',
+            help='Affiche ce qui serait supprimé sans rien supprimer',
+        )
+
+    def references(self, taille_lot):
+        """Noms référencés par tous les FileField/ImageField du projet (parcours keyset par modèle)"""
+        noms = set()
+        for modele in apps.get_models():
+            champs = [
+                champ.name for champ in modele._meta.concrete_fields
+                if isinstance(champ, models.FileField)
+            ]
+            for champ in champs:
+                dernier_pk = None
+                while True:
+                    lignes = modele._base_manager.exclude(**{champ: ''}).exclude(**{f'{champ}__isnull': True})
+                    if dernier_pk is not None:
+                        lignes = lignes.filter(pk__gt=dernier_pk)
+                    lignes = list(lignes.order_by('pk').values_list('pk', champ)[:taille_lot])
+                    if not lignes:
+                        break
+                    noms.update(nom for _, nom in lignes)
+                    dernier_pk = lignes[-1][0]
+        return noms
+
+    def derives_gardes(self, references, limite, taille_lot, simulation):
+        """Chemins des miniatures encore utiles ; les lignes ImageDerivee orphelines sont supprimées"""
+        gardes, orphelines = set(), []
+        dernier_id = 0
+        while True:
+            lignes = list(
+                ImageDerivee.objects.filter(id__gt=dernier_id)
+                .order_by('id')
+                .values_list('id', 'original', 'empreinte', 'largeurs', 'date_creation')[:taille_lot]
+            )
+            if not lignes:
+                break
+            for derivee_id, original, empreinte, largeurs, date_creation in lignes:
+                if original in references or date_creation > limite:
+                    gardes.update(
+                        chemin_derive(empreinte, largeur, extension)
+                        for largeur in largeurs for extension in ('webp', 'jpg')
+                    )
+                else:
+                    orphelines.append(derivee_id)
+            dernier_id = lignes[-1][0]
+
+        if not simulation:
+            for debut in range(0, len(orphelines), taille_lot):
+                ImageDerivee.objects.filter(id__in=orphelines[debut:debut + taille_lot]).delete()
+        self.stdout.write(f'→ {len(orphelines)} entrée(s) de miniatures orpheline(s)')
+        return gardes
+
+    def handle(self, *args, **options):
+        taille_lot = options['taille_lot']
+        simulation = options['simulation']
+        limite = timezone.now() - timedelta(hours=options['age_min'])
+
+        references = self.references(taille_lot)
+        self.stdout.write(f'→ {len(references)} fichier(s) référencé(s)')
+        gardes = references | self.derives_gardes(references, limite, taille_lot, simulation)
+
+        lot, supprimes = [], 0
+        for nom in parcourir(default_storage):
+            if nom in gardes or default_storage.get_modified_time(nom) > limite:
+                continue
+            lot.append(nom)
+            if len(lot) >= taille_lot:
+                supprimes += self.supprimer(lot, simulation)
+                lot = []
+        supprimes += self.supprimer(lot, simulation)
+
+        verbe = 'à supprimer' if simulation else 'supprimé(s)'
+        self.stdout.write(self.style.SUCCESS(f'\n✅ {supprimes} fichier(s) orphelin(s) {verbe}'))
+
+    def supprimer(self, noms, simulation):
+        for nom in noms:
+            if simulation:
+                self.stdout.write(f'  {nom}')
+            else:
+                default_storage.delete(nom)
+        if noms and not simulation:
+            self.stdout.write(f'→ {len(noms)} fichier(s) supprimé(s)')
+        return len(noms)
@@ -1,30 +1,83 @@
 # CODMTracker/middleware.py
-# Middleware pour gérer les erreurs 404 et 500
-from django.http import Http404
-from django.shortcuts import render
+# Middleware pour gérer les erreurs 404 et 500 et le routage vers la réplique
+import time
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from .db_router import ALIAS_REPLIQUE, forcer_primaire, retablir
+from .error_pages import prechauffer_pages_erreur, reponse_erreur, est_reponse_api
+
+
+class ErrorPageMiddleware:
+    """Remplace les réponses d'erreur par la page statique pré-rendue correspondante"""
+    status_code = None
 
-class Custom404Middleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        # Les pages d'erreur sont rendues au démarrage, pas à chaque erreur
+        prechauffer_pages_erreur()
 
     def __call__(self, request):
         response = self.get_response(request)
 
-        # Si c'est une 404 et DEBUG=True, on force notre template
-        if response.status_code == 404:
-            return render(request, '404.html', status=404)
+        if response.status_code != self.status_code:
+            return response
+
+        # Déjà rendue par handler404/handler500 : ne rien refaire
+        if getattr(response, 'page_erreur', False):
+            return response
+
+        # Les endpoints JSON gardent leur propre corps d'erreur
+        if est_reponse_api(request, response):
+            return response
+
+        return reponse_erreur(self.status_code, request)
+
+
+class Custom404Middleware(ErrorPageMiddleware):
+    status_code = 404
 
-        return response
 
-class Custom500Middleware:
+class Custom500Middleware(ErrorPageMiddleware):
+    status_code = 500
+
+
+class ReplicaMiddleware:
+    """Read-your-writes : après une écriture, l'utilisateur lit sur la primaire quelques secondes.
+
+    L'épinglage passe par un cookie pour fonctionner quel que soit le worker gunicorn
+    qui traite la requête suivante.
+    """
+    COOKIE = 'lecture_primaire'
+
     def __init__(self, get_response):
+        if ALIAS_REPLIQUE not in settings.DATABASES:
+            # Pas de réplique configurée : middleware retiré de la chaîne
+            raise MiddlewareNotUsed
         self.get_response = get_response
+        self.duree = getattr(settings, 'REPLICA_EPINGLAGE_SECONDES', 5)
 
     def __call__(self, request):
-        response = self.get_response(request)
+        ecriture = request.method not in ('GET', 'HEAD', 'OPTIONS')
+        epingle = ecriture or self._est_epingle(request)
+
+        jeton = forcer_primaire(epingle)
+        try:
+            response = self.get_response(request)
+        finally:
+            retablir(jeton)
 
-        # Si c'est une 500 et DEBUG=True, on force notre template
-        if response.status_code == 500:
-            return render(request, '500.html', status=500)
+        if ecriture:
+            response.set_cookie(
+                self.COOKIE,
+                str(int(time.time()) + self.duree),
+                max_age=self.duree,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
 
-        return response
\ No newline at end of file
+    def _est_epingle(self, request):
+        try:
+            return int(request.COOKIES.get(self.COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageDerivee',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original', models.CharField(help_text='Nom du fichier original dans le stockage', max_length=255, unique=True)),
+                ('empreinte', models.CharField(db_index=True, help_text='SHA-256 du contenu original', max_length=64)),
+                ('largeur', models.PositiveIntegerField(help_text="Largeur de l'original (après rotation EXIF)")),
+                ('hauteur', models.PositiveIntegerField()),
+                ('largeurs', models.JSONField(default=list, help_text='Largeurs des dérivés générés, croissantes')),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Image dérivée',
+                'verbose_name_plural': 'Images dérivées',
+            },
+        ),
+    ]
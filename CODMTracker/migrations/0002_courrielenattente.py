@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('CODMTracker', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourrielEnAttente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('destinataires', models.JSONField(default=list)),
+                ('expediteur', models.CharField(blank=True, max_length=254)),
+                ('sujet', models.CharField(max_length=255)),
+                ('texte', models.TextField()),
+                ('html', models.TextField(blank=True)),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', "En cours d'envoi"), ('envoye', 'Envoyé'), ('echec', 'Échec définitif')], default='en_attente', max_length=20)),
+                ('tentatives', models.PositiveSmallIntegerField(default=0)),
+                ('prochain_essai', models.DateTimeField(help_text='Date à partir de laquelle le worker peut (re)prendre le courriel')),
+                ('jeton', models.CharField(blank=True, help_text='Worker qui a réservé le courriel', max_length=32)),
+                ('derniere_erreur', models.TextField(blank=True)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('date_envoi', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Courriel en attente',
+                'verbose_name_plural': 'Courriels en attente',
+                'indexes': [models.Index(fields=['statut', 'prochain_essai'], name='courriel_file_idx')],
+            },
+        ),
+    ]
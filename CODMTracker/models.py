@@ -0,0 +1,62 @@
+# CODMTracker/models.py
+# Modèles transverses du projet (fichiers dérivés des images envoyées)
+from django.db import models
+
+
+class ImageDerivee(models.Model):
+    """Miniatures générées pour une image envoyée (voir CODMTracker/images.py).
+
+    Les fichiers dérivés sont nommés d'après l'empreinte du contenu original :
+    derives/ab/<sha256>-<largeur>.webp|jpg
+    """
+    original = models.CharField(max_length=255, unique=True, help_text="Nom du fichier original dans le stockage")
+    empreinte = models.CharField(max_length=64, db_index=True, help_text="SHA-256 du contenu original")
+    largeur = models.PositiveIntegerField(help_text="Largeur de l'original (après rotation EXIF)")
+    hauteur = models.PositiveIntegerField()
+    largeurs = models.JSONField(default=list, help_text="Largeurs des dérivés générés, croissantes")
+    date_creation = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Image dérivée"
+        verbose_name_plural = "Images dérivées"
+
+    def __str__(self):
+        return f"{self.original} ({', '.join(map(str, self.largeurs))})"
+
+
+class CourrielEnAttente(models.Model):
+    """Courriel sortant mis en file (voir CODMTracker/courriels.py) : envoyé par le worker, pas par la requête"""
+    EN_ATTENTE = 'en_attente'
+    EN_COURS = 'en_cours'
+    ENVOYE = 'envoye'
+    ECHEC = 'echec'
+    STATUTS = [
+        (EN_ATTENTE, 'En attente'),
+        (EN_COURS, "En cours d'envoi"),
+        (ENVOYE, 'Envoyé'),
+        (ECHEC, 'Échec définitif'),
+    ]
+
+    destinataires = models.JSONField(default=list)
+    expediteur = models.CharField(max_length=254, blank=True)
+    sujet = models.CharField(max_length=255)
+    texte = models.TextField()
+    html = models.TextField(blank=True)
+    statut = models.CharField(max_length=20, choices=STATUTS, default=EN_ATTENTE)
+    tentatives = models.PositiveSmallIntegerField(default=0)
+    prochain_essai = models.DateTimeField(help_text="Date à partir de laquelle le worker peut (re)prendre le courriel")
+    jeton = models.CharField(max_length=32, blank=True, help_text="Worker qui a réservé le courriel")
+    derniere_erreur = models.TextField(blank=True)
+    date_creation = models.DateTimeField(auto_now_add=True)
+    date_envoi = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Courriel en attente"
+        verbose_name_plural = "Courriels en attente"
+        indexes = [
+            # Prochains courriels à envoyer
+            models.Index(fields=['statut', 'prochain_essai'], name='courriel_file_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.sujet} → {', '.join(self.destinataires)} ({self.get_statut_display()})"
@@ -0,0 +1,91 @@
+# CODMTracker/pubsub.py
+# Bus de messages en mémoire : publication depuis le code synchrone, réception dans les flux ASGI
+# Mono-processus : un message n'atteint que les flux ouverts sur le processus qui l'a publié.
+# À n'activer (FLUX_TEMPS_REEL) qu'avec un seul processus ASGI qui sert aussi les écritures.
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# canal → abonnements en cours (connexions SSE de ce processus)
+_abonnes = defaultdict(set)
+_verrou = threading.Lock()
+
+
+class Abonnement:
+    """File bornée d'un client connecté.
+
+    Si le client ne lit pas assez vite, les messages en trop sont abandonnés et
+    l'abonnement est marqué `en_retard` : le flux envoie alors un seul événement
+    de resynchronisation au lieu d'accumuler de la mémoire.
+    """
+
+    def __init__(self, canaux, taille_file=32):
+        self.canaux = canaux
+        self.boucle = asyncio.get_running_loop()
+        self.file = asyncio.Queue(maxsize=taille_file)
+        self.en_retard = False
+
+    def _deposer(self, message):
+        try:
+            self.file.put_nowait(message)
+        except asyncio.QueueFull:
+            self.en_retard = True
+
+    async def recevoir(self, delai):
+        """Prochain message, ou TimeoutError après `delai` secondes sans message"""
+        return await asyncio.wait_for(self.file.get(), delai)
+
+    def vider(self):
+        while not self.file.empty():
+            self.file.get_nowait()
+        self.en_retard = False
+
+
+def abonner(*canaux, taille_file=32):
+    """Abonne la coroutine courante aux canaux (à appeler dans la boucle asyncio)"""
+    abonnement = Abonnement(canaux, taille_file)
+    with _verrou:
+        for canal in canaux:
+            _abonnes[canal].add(abonnement)
+    return abonnement
+
+
+def desabonner(abonnement):
+    with _verrou:
+        for canal in abonnement.canaux:
+            _abonnes[canal].discard(abonnement)
+            if not _abonnes[canal]:
+                del _abonnes[canal]
+
+
+def publier(canal, message):
+    """Distribue un message aux abonnés du canal, depuis n'importe quel thread (sans bloquer)"""
+    with _verrou:
+        abonnes = list(_abonnes.get(canal, ()))
+    for abonnement in abonnes:
+        try:
+            abonnement.boucle.call_soon_threadsafe(abonnement._deposer, message)
+        except RuntimeError:
+            # Boucle fermée : la connexion est en train de se terminer
+            logger.debug(f"Abonné fermé sur {canal}")
+
+
+def publier_apres_commit(canaux, message):
+    """Publie le message sur chaque canal, seulement si la transaction courante est validée"""
+    canaux = list(canaux)
+
+    def _publier():
+        for canal in canaux:
+            publier(canal, message)
+
+    if canaux:
+        transaction.on_commit(_publier)
+
+
+def a_des_abonnes(canal):
+    with _verrou:
+        return canal in _abonnes
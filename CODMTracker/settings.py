@@ -14,6 +14,8 @@ from pathlib import Path
 from dotenv import load_dotenv
 import os
 
+from .database import config_depuis_url, config_sqlite
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(BASE_DIR / '.env')
@@ -65,6 +67,9 @@ INSTALLED_APPS = [
     'tournois',
     'boutique',
     'forum',
+
+    # Commandes d'exploitation du projet (migration de base, etc.)
+    'CODMTracker',
 ]
 
 MIDDLEWARE = [
@@ -72,6 +77,7 @@ MIDDLEWARE = [
     'CODMTracker.middleware.Custom500Middleware',  # ← en dernier !
 
     'django.middleware.security.SecurityMiddleware',
+    'CODMTracker.middleware.ReplicaMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -95,6 +101,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'forum.context_processors.notifications_count',
+                'CODMTracker.context_processors.cache_versions',
             ],
         },
     },
@@ -106,13 +113,98 @@ WSGI_APPLICATION = 'CODMTracker.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
+# DATABASE_URL (Render) → PostgreSQL avec connexions persistantes, sinon SQLite local en mode WAL
+DATABASE_URL = os.getenv('DATABASE_URL')
+
+if DATABASE_URL:
+    DATABASES = {
+        'default': config_depuis_url(
+            DATABASE_URL,
+            conn_max_age=int(os.getenv('DB_CONN_MAX_AGE', 600)),
+            pgbouncer=os.getenv('DB_PGBOUNCER', 'False').lower() == 'true',
+        )
+    }
+else:
+    DATABASES = {
+        'default': config_sqlite(BASE_DIR / 'db.sqlite3'),
+    }
+
+# Réplique en lecture (forum, classements, blog, tournois)
+# En local : DATABASE_REPLICA_URL=sqlite:////chemin/vers/replica.sqlite3 (copie de db.sqlite3)
+DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = config_depuis_url(
+        DATABASE_REPLICA_URL,
+        conn_max_age=int(os.getenv('DB_CONN_MAX_AGE', 600)),
+        pgbouncer=os.getenv('DB_PGBOUNCER', 'False').lower() == 'true',
+    )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    DATABASE_ROUTERS = ['CODMTracker.db_router.ReplicaRouter']
+
+# Retard de réplication toléré, fréquence de vérification et durée de lecture sur la primaire après une écriture
+REPLICA_RETARD_MAX = int(os.getenv('REPLICA_RETARD_MAX', 5))
+REPLICA_VERIFICATION_SECONDES = 10
+REPLICA_EPINGLAGE_SECONDES = 5
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Partagé par tous les workers en production (invalidations, limites de débit) :
+# Redis si REDIS_URL est défini, sinon la table de cache de la base (manage.py createcachetable).
+# LocMemCache (un cache par processus) seulement en développement, voir CODMTracker/checks.py
+
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHE_BACKEND_DEFAUT, CACHE_LOCATION_DEFAUT = 'django.core.cache.backends.redis.RedisCache', REDIS_URL
+elif DEBUG:
+    CACHE_BACKEND_DEFAUT, CACHE_LOCATION_DEFAUT = 'django.core.cache.backends.locmem.LocMemCache', 'codmtracker'
+else:
+    CACHE_BACKEND_DEFAUT, CACHE_LOCATION_DEFAUT = 'django.core.cache.backends.db.DatabaseCache', 'cache_codmtracker'
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.getenv('CACHE_BACKEND', CACHE_BACKEND_DEFAUT),
+        'LOCATION': os.getenv('CACHE_LOCATION', CACHE_LOCATION_DEFAUT),
+        'TIMEOUT': 300,
     }
 }
 
+# Nombre de workers gunicorn (variable lue aussi par gunicorn) : un cache par processus
+# n'est accepté qu'avec un seul worker
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))
+
+# Durée de vie des pages publiques mises en cache pour les visiteurs anonymes
+CACHE_PAGES_TIMEOUT = int(os.getenv('CACHE_PAGES_TIMEOUT', 300))
+
+
+# Limitation de débit (CODMTracker/limites.py) : compteurs dans le cache par défaut, commun aux
+# workers avec Redis ou DatabaseCache (incr atomique seulement avec Redis). Les règles, dont
+# 'hachage' (mots de passe hachés par seconde pour tout le site), se surchargent par LIMITES.
+# PROXYS_DE_CONFIANCE : nombre de proxys devant l'application (1 sur Render) pour lire l'IP client
+PROXYS_DE_CONFIANCE = int(os.getenv('PROXYS_DE_CONFIANCE', 0))
+
+
+# Tâches d'arrière-plan (CODMTracker/taches.py) : threads par processus,
+# ou exécution immédiate avec TACHES_SYNCHRONES=True
+
+TACHES_WORKERS = int(os.getenv('TACHES_WORKERS', 2))
+TACHES_SYNCHRONES = os.getenv('TACHES_SYNCHRONES', 'False').lower() == 'true'
+
+
+# Flux temps réel (CODMTracker/sse.py), servis seulement par l'application ASGI.
+# FLUX_TEMPS_REEL=True seulement si le site tourne sous ASGI dans un seul processus :
+# le bus (CODMTracker/pubsub.py) ne traverse pas les processus. Sans lui, les pages
+# n'ouvrent aucun flux et le compteur se met à jour au chargement.
+# Connexions ouvertes par processus, par utilisateur, heartbeat et durée max en secondes
+
+FLUX_TEMPS_REEL = os.getenv('FLUX_TEMPS_REEL', 'False').lower() == 'true'
+
+SSE_CONNEXIONS_MAX = int(os.getenv('SSE_CONNEXIONS_MAX', 500))
+SSE_CONNEXIONS_PAR_CLE = int(os.getenv('SSE_CONNEXIONS_PAR_CLE', 3))
+SSE_HEARTBEAT = int(os.getenv('SSE_HEARTBEAT', 25))
+SSE_DUREE_MAX = int(os.getenv('SSE_DUREE_MAX', 3600))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -160,6 +252,27 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Médias nommés par empreinte du contenu (CODMTracker/stockage.py), servis par Django
+# avec un cache longue durée tant qu'aucun serveur/CDN dédié n'est configuré (MEDIA_SERVIR=False)
+STORAGES = {
+    'default': {'BACKEND': 'CODMTracker.stockage.StockageEmpreinte'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+MEDIA_SERVIR = os.getenv('MEDIA_SERVIR', 'True').lower() == 'true'
+
+# Images envoyées (CODMTracker/televersement.py) : au-delà de 1 Mo la réception passe
+# par un fichier temporaire, au-delà de IMAGES_TAILLE_MAX elle est abandonnée.
+# Les originaux plus grands que IMAGES_DIMENSION_MAX pixels sont réduits en arrière-plan.
+FILE_UPLOAD_HANDLERS = [
+    'CODMTracker.televersement.LimiteTaille',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024
+IMAGES_TAILLE_MAX = int(os.getenv('IMAGES_TAILLE_MAX', 15 * 1024 * 1024))
+IMAGES_PIXELS_MAX = int(os.getenv('IMAGES_PIXELS_MAX', 50_000_000))
+IMAGES_DIMENSION_MAX = int(os.getenv('IMAGES_DIMENSION_MAX', 2560))
+
 # Custom User Model
 AUTH_USER_MODEL = 'utilisateurs.Utilisateur'
 
@@ -176,8 +289,21 @@ EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True').lower() == 'true'
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'no-reply@codmtracker.com')
-
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# Adresse publique du site, pour les liens des emails envoyés hors requête
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:8000')
+# File d'envoi (CODMTracker/courriels.py), vidée par la commande envoyer_courriels --continu :
+# taille des lots par connexion, débit et essais. COURRIELS_PAR_SECONDE s'applique à chaque
+# worker envoyer_courriels : à diviser par leur nombre pour respecter le quota du fournisseur
+COURRIELS_LOT = int(os.getenv('COURRIELS_LOT', 50))
+COURRIELS_PAR_SECONDE = float(os.getenv('COURRIELS_PAR_SECONDE', 5))
+COURRIELS_TENTATIVES_MAX = int(os.getenv('COURRIELS_TENTATIVES_MAX', 5))
+# Envoi dans la requête, après le commit, sans worker : par défaut en DEBUG et avec les backends
+# de développement (console, locmem, fichier). En production SMTP, lancer worker.sh (voir ReadMe.md)
+BACKENDS_EMAIL_LOCAUX = ('console', 'locmem', 'filebased', 'dummy')
+COURRIELS_ENVOI_DIRECT = os.getenv(
+    'COURRIELS_ENVOI_DIRECT',
+    str(DEBUG or EMAIL_BACKEND.rsplit('.', 2)[-2] in BACKENDS_EMAIL_LOCAUX),
+).lower() == 'true'
 
 # Site ID
 SITE_ID = 1
@@ -195,9 +321,12 @@ ACCOUNT_EMAIL_VERIFICATION = 'none'  # ou 'mandatory' pour prod
 
 
 AUTHENTICATION_BACKENDS = (
-    'django.contrib.auth.backends.ModelBackend',  
+    'utilisateurs.backends.EmailOuNumeroBackend',  # ModelBackend + connexion par email ou numéro
     'allauth.account.auth_backends.AuthenticationBackend',  
 )
+# Durée (s) pendant laquelle un identifiant sans compte n'est plus recherché en base
+# (cache par défaut : doit être commun aux workers pour être oublié à l'inscription)
+AUTH_INCONNU_DUREE = int(os.getenv('AUTH_INCONNU_DUREE', 60))
 
 
 # OAuth Google prod
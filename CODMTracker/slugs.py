@@ -0,0 +1,49 @@
+# CODMTracker/slugs.py
+# Attribution de slugs uniques sans boucle de sondage
+import secrets
+from django.db import IntegrityError, router, transaction
+from django.utils.text import slugify
+
+# Suffixe aléatoire ajouté en cas de doublon : "meilleure-classe-ak117-3f9a2c"
+LONGUEUR_SUFFIXE = 6
+ESSAIS_MAX = 5
+
+
+def slug_base(source, max_length, defaut='sans-titre'):
+    """Slug du texte source, tronqué pour laisser la place au suffixe"""
+    base = slugify(source)[:max_length - LONGUEUR_SUFFIXE - 1].rstrip('-')
+    return base or defaut
+
+
+def suffixer(base):
+    return f"{base}-{secrets.token_hex(LONGUEUR_SUFFIXE // 2)}"
+
+
+def enregistrer_avec_slug(instance, source, sauvegarder, *args, champ='slug', **kwargs):
+    """Attribue un slug unique à l'instance puis l'enregistre avec sauvegarder(*args, **kwargs).
+
+    Deux requêtes quel que soit le nombre de doublons : un exists() sur le slug de
+    base, puis l'INSERT. Si la base est prise, un suffixe aléatoire court est
+    ajouté ; une collision concurrente lève IntegrityError et déclenche un
+    nouvel essai avec un autre suffixe.
+    """
+    modele = type(instance)
+    alias = kwargs.get('using') or router.db_for_write(modele, instance=instance)
+    gestionnaire = modele._base_manager.using(alias)
+    base = slug_base(source, modele._meta.get_field(champ).max_length)
+
+    candidat = base
+    if gestionnaire.filter(**{champ: base}).exists():
+        candidat = suffixer(base)
+
+    for _ in range(ESSAIS_MAX):
+        setattr(instance, champ, candidat)
+        try:
+            with transaction.atomic(using=alias):
+                return sauvegarder(*args, **kwargs)
+        except IntegrityError:
+            if not gestionnaire.filter(**{champ: candidat}).exists():
+                # Autre contrainte en échec : rien à voir avec le slug
+                raise
+        candidat = suffixer(base)
+    raise IntegrityError(f"Aucun slug libre trouvé pour « {base} » après {ESSAIS_MAX} essais")
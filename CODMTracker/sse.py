@@ -0,0 +1,89 @@
+# CODMTracker/sse.py
+# Flux Server-Sent Events servis par l'application ASGI (limites de connexions, heartbeat)
+import asyncio
+import json
+from collections import Counter
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from .pubsub import abonner, desabonner
+
+# Connexions ouvertes dans ce processus, au total et par clé (utilisateur, équipe...)
+_connexions = Counter()
+
+
+def _reglage(nom, defaut):
+    return getattr(settings, nom, defaut)
+
+
+def evenement(nom, donnees):
+    """Trame SSE d'un événement nommé"""
+    return f"event: {nom}\ndata: {json.dumps(donnees, separators=(',', ':'))}\n\n"
+
+
+async def _flux(canaux, cle, initial, transformer):
+    abonnement = abonner(*canaux, taille_file=_reglage('SSE_TAILLE_FILE', 32))
+    _connexions['total'] += 1
+    _connexions[cle] += 1
+    try:
+        # Reconnexion automatique du navigateur après 5 s si la connexion tombe
+        yield "retry: 5000\n\n"
+        if initial is not None:
+            for nom, donnees in await initial():
+                yield evenement(nom, donnees)
+
+        boucle = asyncio.get_running_loop()
+        fin = boucle.time() + _reglage('SSE_DUREE_MAX', 3600)
+        while boucle.time() < fin:
+            try:
+                message = await abonnement.recevoir(_reglage('SSE_HEARTBEAT', 25))
+            except TimeoutError:
+                # Commentaire SSE : garde la connexion ouverte à travers les proxys
+                yield ": ping\n\n"
+                continue
+            if abonnement.en_retard:
+                # Client trop lent : messages abandonnés, il recharge l'état d'un coup
+                abonnement.vider()
+                yield evenement('resync', {})
+                if initial is not None:
+                    for nom, donnees in await initial():
+                        yield evenement(nom, donnees)
+                continue
+            for nom, donnees in await transformer(message):
+                yield evenement(nom, donnees)
+    finally:
+        desabonner(abonnement)
+        _connexions['total'] -= 1
+        _connexions[cle] -= 1
+        if _connexions[cle] <= 0:
+            del _connexions[cle]
+
+
+async def _tel_quel(message):
+    return [(message['evenement'], message['donnees'])]
+
+
+def reponse_sse(request, canaux, cle, initial=None, transformer=None):
+    """Réponse text/event-stream abonnée aux canaux du bus.
+
+    - `initial` : coroutine retournant les événements envoyés à la connexion (état courant).
+    - `transformer` : coroutine message du bus → liste de (événement, données).
+    Sous WSGI, un flux bloquerait un worker : réponse 204, le navigateur ne se reconnecte pas.
+    Même réponse si FLUX_TEMPS_REEL est désactivé (bus mono-processus, voir pubsub.py).
+    """
+    if not isinstance(request, ASGIRequest) or not _reglage('FLUX_TEMPS_REEL', False):
+        return HttpResponse(status=204)
+    if (
+        _connexions['total'] >= _reglage('SSE_CONNEXIONS_MAX', 500)
+        or _connexions[cle] >= _reglage('SSE_CONNEXIONS_PAR_CLE', 3)
+    ):
+        return HttpResponse(status=503, headers={'Retry-After': '60'})
+
+    response = StreamingHttpResponse(
+        _flux(canaux, cle, initial, transformer or _tel_quel),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Pas de mise en tampon par nginx / le proxy de Render
+    response['X-Accel-Buffering'] = 'no'
+    return response
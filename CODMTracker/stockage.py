@@ -0,0 +1,62 @@
+# CODMTracker/stockage.py
+# Stockage des médias adressé par contenu : un fichier identique n'est écrit qu'une fois
+import hashlib
+import os
+import re
+from django.core.files.storage import FileSystemStorage
+
+DOSSIER = 'fichiers'
+# fichiers/ab/cd/<sha256>.ext (originaux) et derives/ab/<sha256>-<largeur>.ext (miniatures)
+MOTIF_IMMUABLE = re.compile(
+    rf'^(?:{DOSSIER}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/[0-9a-f]{{64}}|derives/[0-9a-f]{{2}}/[0-9a-f]{{64}}-\d+)\.[a-z0-9]+$'
+)
+
+
+def empreinte_contenu(contenu):
+    """SHA-256 du fichier, lu par blocs (jamais entièrement en mémoire)"""
+    empreinte = hashlib.sha256()
+    if hasattr(contenu, 'seek'):
+        contenu.seek(0)
+    for bloc in contenu.chunks():
+        empreinte.update(bloc)
+    if hasattr(contenu, 'seek'):
+        contenu.seek(0)
+    return empreinte.hexdigest()
+
+
+def chemin_empreinte(empreinte, nom_original):
+    extension = os.path.splitext(nom_original)[1].lower()
+    if not re.fullmatch(r'\.[a-z0-9]{1,5}', extension):
+        extension = ''
+    return f"{DOSSIER}/{empreinte[:2]}/{empreinte[2:4]}/{empreinte}{extension}"
+
+
+def est_immuable(nom):
+    """True si le nom dépend du contenu : le fichier peut être mis en cache indéfiniment"""
+    return bool(MOTIF_IMMUABLE.match(nom))
+
+
+class StockageEmpreinte(FileSystemStorage):
+    """Nomme chaque fichier envoyé d'après son contenu (sharding sur 2 niveaux).
+
+    L'`upload_to` des champs est ignoré : le même avatar renvoyé, ou la même photo
+    utilisée par deux produits, pointent vers un seul fichier. Les fichiers ne sont
+    jamais écrasés ni renommés, d'où des URLs cachables à vie ; les fichiers qui ne
+    sont plus référencés sont supprimés par la commande nettoyer_medias.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if est_immuable(name):
+            # Nom déjà calculé d'après le contenu (miniatures, copie d'un fichier stocké)
+            return name if self.exists(name) else super().save(name, content, max_length=max_length)
+        nom = chemin_empreinte(empreinte_contenu(content), name)
+        if self.exists(nom):
+            # Contenu déjà stocké : rien à écrire
+            return nom
+        enregistre = super().save(nom, content, max_length=max_length)
+        if enregistre != nom:
+            # Même contenu écrit en parallèle par une autre requête : on garde l'exemplaire nommé par empreinte
+            self.delete(enregistre)
+        return nom
@@ -0,0 +1,105 @@
+# CODMTracker/taches.py
+# Tâches d'arrière-plan dans le processus : travail différé après commit et traitements par lots
+import atexit
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executeur = None
+_verrou_executeur = threading.Lock()
+
+
+def _synchrone():
+    """TACHES_SYNCHRONES=True : tout s'exécute immédiatement (commandes, débogage)"""
+    return getattr(settings, 'TACHES_SYNCHRONES', False)
+
+
+def _get_executeur():
+    global _executeur
+    with _verrou_executeur:
+        if _executeur is None:
+            _executeur = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'TACHES_WORKERS', 2),
+                thread_name_prefix='taches',
+            )
+        return _executeur
+
+
+def _executer(fonction, *args, **kwargs):
+    try:
+        fonction(*args, **kwargs)
+    except Exception:
+        logger.exception(f"Échec de la tâche {fonction.__name__}")
+    finally:
+        if threading.current_thread() is not threading.main_thread():
+            # Connexions propres au thread de travail : ne pas les laisser ouvertes
+            connections.close_all()
+
+
+def lancer(fonction, *args, **kwargs):
+    """Exécute fonction(*args, **kwargs) en arrière-plan, une fois la transaction courante validée"""
+    def soumettre():
+        if _synchrone():
+            _executer(fonction, *args, **kwargs)
+        else:
+            _get_executeur().submit(_executer, fonction, *args, **kwargs)
+    transaction.on_commit(soumettre)
+
+
+class Regroupeur:
+    """Accumule des clés et les traite par lots, en arrière-plan.
+
+    Un lot part quand `taille_max` clés sont en attente ou `delai` secondes après
+    la première : une rafale d'écritures ne déclenche qu'un traitement. Les clés en
+    double au sein d'un lot sont fusionnées.
+    """
+
+    def __init__(self, traitement, delai=2.0, taille_max=200):
+        self.traitement = traitement
+        self.delai = delai
+        self.taille_max = taille_max
+        self._en_attente = set()
+        self._minuteur = None
+        self._verrou = threading.Lock()
+        atexit.register(self.vider)
+
+    def ajouter(self, *cles):
+        """Planifie le traitement des clés après le commit de la transaction courante"""
+        transaction.on_commit(lambda: self._ajouter(cles))
+
+    def _ajouter(self, cles):
+        if _synchrone():
+            _executer(self.traitement, set(cles))
+            return
+        with self._verrou:
+            self._en_attente.update(cles)
+            plein = len(self._en_attente) >= self.taille_max
+            if not plein and self._minuteur is None:
+                self._minuteur = threading.Timer(self.delai, self._expirer)
+                self._minuteur.daemon = True
+                self._minuteur.start()
+        if plein:
+            self._expirer()
+
+    def _prendre_lot(self):
+        with self._verrou:
+            lot, self._en_attente = self._en_attente, set()
+            if self._minuteur is not None:
+                self._minuteur.cancel()
+                self._minuteur = None
+            return lot
+
+    def _expirer(self):
+        lot = self._prendre_lot()
+        if lot:
+            _get_executeur().submit(_executer, self.traitement, lot)
+
+    def vider(self):
+        """Traite immédiatement les clés en attente (arrêt du processus)"""
+        lot = self._prendre_lot()
+        if lot:
+            _executer(self.traitement, lot)
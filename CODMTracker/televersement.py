@@ -0,0 +1,79 @@
+# CODMTracker/televersement.py
+# Images envoyées : taille plafonnée pendant la réception, en-tête vérifié sans décoder les pixels
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+FORMATS_ACCEPTES = {'JPEG', 'PNG', 'WEBP', 'GIF'}
+
+
+def taille_max():
+    return getattr(settings, 'IMAGES_TAILLE_MAX', 15 * 1024 * 1024)
+
+
+def pixels_max():
+    return getattr(settings, 'IMAGES_PIXELS_MAX', 50_000_000)
+
+
+class LimiteTaille(FileUploadHandler):
+    """Premier gestionnaire d'envoi : abandonne un fichier dès qu'il dépasse IMAGES_TAILLE_MAX.
+
+    Les blocs sont transmis aux gestionnaires suivants (mémoire sous
+    FILE_UPLOAD_MAX_MEMORY_SIZE, fichier temporaire au-delà) ; au dépassement, le
+    fichier partiel est supprimé et le reste du flux lu puis jeté, sans être stocké.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.recus = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.recus += len(raw_data)
+        if self.recus > taille_max():
+            refuses = getattr(self.request, '_televersements_refuses', {})
+            refuses[self.field_name] = f"Fichier trop volumineux (maximum {filesizeformat(taille_max())})."
+            self.request._televersements_refuses = refuses
+            raise SkipFile
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def verifier_image(fichier):
+    """Message d'erreur si le fichier n'est pas une image acceptable, None sinon.
+
+    Image.open ne lit que l'en-tête : format et dimensions sont contrôlés avant
+    tout décodage, les bombes de décompression sont refusées à ce stade. La taille
+    est comparée explicitement à Image.MAX_IMAGE_PIXELS : les filtres de `warnings`
+    sont globaux au processus et ne peuvent pas être changés depuis un thread.
+    """
+    try:
+        with Image.open(fichier) as image:
+            format_image, (largeur, hauteur) = image.format, image.size
+    except Image.DecompressionBombError:
+        return "Image trop grande (nombre de pixels)."
+    except (OSError, SyntaxError, ValueError):
+        return "Le fichier n'est pas une image valide."
+    finally:
+        fichier.seek(0)
+
+    if format_image not in FORMATS_ACCEPTES:
+        return "Format d'image non accepté (JPEG, PNG, WebP ou GIF)."
+    if largeur * hauteur > pixels_max() or (Image.MAX_IMAGE_PIXELS and largeur * hauteur > Image.MAX_IMAGE_PIXELS):
+        return f"Image trop grande ({largeur}×{hauteur} pixels)."
+    return None
+
+
+def image_televersee(request, champ):
+    """(fichier, erreur) pour le champ image d'un formulaire ; (None, None) si rien n'a été envoyé"""
+    # request.FILES d'abord : c'est sa lecture qui déclenche la réception (et les refus)
+    fichier = request.FILES.get(champ)
+    erreur = getattr(request, '_televersements_refuses', {}).get(champ)
+    if erreur:
+        return None, erreur
+    if not fichier:
+        return None, None
+    erreur = verifier_image(fichier)
+    return (None, erreur) if erreur else (fichier, None)
@@ -0,0 +1,47 @@
+# CODMTracker/templatetags/images.py
+# {% image_adaptee %} : <picture> WebP + JPEG avec srcset, le navigateur choisit la taille
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+from ..images import chemin_derive, derives
+
+register = template.Library()
+
+
+def _srcset(empreinte, largeurs, extension):
+    return ', '.join(
+        f"{default_storage.url(chemin_derive(empreinte, largeur, extension))} {largeur}w"
+        for largeur in largeurs
+    )
+
+
+@register.simple_tag
+def image_adaptee(fichier, sizes='100vw', alt='', **attributs):
+    """Image responsive d'un champ ImageField.
+
+    `sizes` indique la largeur affichée (ex. "64px", "(max-width: 768px) 100vw, 320px") :
+    le navigateur télécharge la plus petite miniature suffisante. Tant que les
+    miniatures ne sont pas générées, l'original est servi.
+    Usage : {% image_adaptee produit.image sizes="280px" alt=produit.nom class="photo" %}
+    """
+    if not fichier:
+        return ''
+    attributs.setdefault('loading', 'lazy')
+    attributs.setdefault('decoding', 'async')
+    extra = format_html_join(' ', '{}="{}"', sorted(attributs.items()))
+
+    trouve = derives(fichier.name)
+    if trouve is None:
+        return format_html('<img src="{}" alt="{}" {}>', fichier.url, alt, extra)
+
+    empreinte, largeurs = trouve
+    # src de repli (navigateurs sans srcset) : la plus grande miniature jusqu'à 640px
+    repli = max((largeur for largeur in largeurs if largeur <= 640), default=largeurs[0])
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" {}></picture>',
+        _srcset(empreinte, largeurs, 'webp'), sizes,
+        default_storage.url(chemin_derive(empreinte, repli, 'jpg')),
+        _srcset(empreinte, largeurs, 'jpg'), sizes,
+        alt, extra,
+    )
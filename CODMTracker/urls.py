@@ -2,7 +2,7 @@
 # URL configuration for CODMTracker project.
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from . import views
@@ -13,6 +13,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', views.index_view, name='index'),
     path('a-propos/', views.a_propos_view, name='a_propos'),
+    path('staff/limites/', views.limites_view, name='limites'),
     path('utilisateurs/', include('utilisateurs.urls')),
     path('articles/', include('articles.urls')),
     path('statistiques/', include('statistiques.urls')),
@@ -29,6 +30,10 @@ urlpatterns = [
 handler404 = 'CODMTracker.views.handler404'
 handler500 = 'CODMTracker.views.handler500'
 
+if settings.MEDIA_SERVIR:
+    urlpatterns += [
+        re_path(rf'^{settings.MEDIA_URL.strip("/")}/(?P<path>.*)$', views.media_view, name='media'),
+    ]
+
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATICFILES_DIRS[0] if settings.STATICFILES_DIRS else None)
@@ -1,18 +1,43 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 from django.shortcuts import render
+from django.views.static import serve
+from .error_pages import reponse_erreur
+from .cache import cache_anonyme
+from .limites import statistiques
+from .stockage import est_immuable
 
+@cache_anonyme('pages')
 def index_view(request):
     """Vue pour la page d'accueil"""
     return render(request, 'index.html')
 
+@cache_anonyme('pages')
 def a_propos_view(request):
     """Vue pour la page À propos"""
     return render(request, 'a_propos.html')
 
+def media_view(request, path):
+    """Sert un fichier média ; les noms par empreinte sont cachés à vie par le navigateur et le CDN"""
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if est_immuable(path):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        # Anciens noms (antérieurs au stockage par empreinte) : le fichier peut changer
+        response['Cache-Control'] = 'public, max-age=3600'
+    return response
+
+@staff_member_required
+def limites_view(request):
+    """Requêtes autorisées / refusées par règle de limitation sur la dernière heure (staff)"""
+    return JsonResponse({'regles': statistiques()})
+
 # Gestionnaires d'erreurs personnalisés
 def handler404(request, exception):
     """Gestionnaire personnalisé pour les erreurs 404"""
-    return render(request, '404.html', status=404)
+    return reponse_erreur(404, request)
 
 def handler500(request):
     """Gestionnaire personnalisé pour les erreurs 500"""
-    return render(request, '500.html', status=500)
\ No newline at end of file
+    return reponse_erreur(500, request)
\ No newline at end of file
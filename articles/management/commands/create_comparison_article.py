@@ -3,7 +3,6 @@ Script pour créer un article de type COMPARAISON avec images alternées
 Usage: python manage.py create_comparison_article
 """
 from django.core.management.base import BaseCommand
-from django.utils.text import slugify
 from articles.models import Article, ArticleBlock
 from utilisateurs.models import Utilisateur
 
@@ -42,16 +41,8 @@ class Command(BaseCommand):
 
         # Créer l'article
         titre = "Comparaison : DL Q33 vs Arctic .50 - Quel Sniper Choisir ?"
-        slug = slugify(titre)
-        base_slug = slug
-        counter = 1
-        while Article.objects.filter(slug=slug).exists():
-            slug = f"{base_slug}-{counter}"
-            counter += 1
-
         article = Article.objects.create(
             titre=titre,
-            slug=slug,
             resume="Comparaison détaillée entre les deux snipers les plus populaires de CODM. Découvrez lequel choisir selon votre style de jeu.",
             auteur=auteur,
             layout='standard',
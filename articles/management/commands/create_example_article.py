@@ -4,7 +4,6 @@ Usage: python manage.py create_example_article
 """
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from django.utils.text import slugify
 from articles.models import Article, ArticleImage, ArticleBlock
 from utilisateurs.models import Utilisateur
 
@@ -44,18 +43,8 @@ class Command(BaseCommand):
 
         # Créer l'article principal
         titre = "Top 5 Loadouts Sniper pour Call of Duty Mobile"
-        slug = slugify(titre)
-        
-        # S'assurer que le slug est unique
-        base_slug = slug
-        counter = 1
-        while Article.objects.filter(slug=slug).exists():
-            slug = f"{base_slug}-{counter}"
-            counter += 1
-        
         article = Article.objects.create(
             titre=titre,
-            slug=slug,
             resume="Découvrez les meilleurs loadouts pour devenir un sniper redoutable dans CODM. Guide complet avec armes, accessoires et stratégies.",
             auteur=auteur,
             layout='standard',
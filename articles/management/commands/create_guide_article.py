@@ -3,7 +3,6 @@ Script pour créer un article de type GUIDE avec images alternées (gauche/droit
 Usage: python manage.py create_guide_article
 """
 from django.core.management.base import BaseCommand
-from django.utils.text import slugify
 from articles.models import Article, ArticleBlock
 from utilisateurs.models import Utilisateur
 
@@ -42,16 +41,8 @@ class Command(BaseCommand):
 
         # Créer l'article
         titre = "Guide Complet : Maîtriser les Armes Assault Rifle dans CODM"
-        slug = slugify(titre)
-        base_slug = slug
-        counter = 1
-        while Article.objects.filter(slug=slug).exists():
-            slug = f"{base_slug}-{counter}"
-            counter += 1
-
         article = Article.objects.create(
             titre=titre,
-            slug=slug,
             resume="Apprenez à maîtriser les meilleures armes AR de Call of Duty Mobile. Guide détaillé avec configurations, stratégies et conseils de pros.",
             auteur=auteur,
             layout='standard',
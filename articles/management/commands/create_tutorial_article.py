@@ -3,7 +3,6 @@ Script pour créer un article de type TUTORIEL ÉTAPE PAR ÉTAPE avec images alt
 Usage: python manage.py create_tutorial_article
 """
 from django.core.management.base import BaseCommand
-from django.utils.text import slugify
 from articles.models import Article, ArticleBlock
 from utilisateurs.models import Utilisateur
 
@@ -42,16 +41,8 @@ class Command(BaseCommand):
 
         # Créer l'article
         titre = "Tutoriel : Comment Créer le Loadout Parfait pour Ranked"
-        slug = slugify(titre)
-        base_slug = slug
-        counter = 1
-        while Article.objects.filter(slug=slug).exists():
-            slug = f"{base_slug}-{counter}"
-            counter += 1
-
         article = Article.objects.create(
             titre=titre,
-            slug=slug,
             resume="Apprenez à créer des loadouts optimaux pour le mode Ranked. Guide étape par étape avec exemples concrets et conseils de pros.",
             auteur=auteur,
             layout='standard',
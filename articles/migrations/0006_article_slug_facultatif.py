@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0005_article_layout_alter_article_contenu_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='article',
+            name='slug',
+            field=models.SlugField(blank=True, help_text='Laisser vide pour le générer depuis le titre', unique=True),
+        ),
+    ]
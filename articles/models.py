@@ -1,5 +1,6 @@
 from django.db import models
 from utilisateurs.models import Utilisateur
+from CODMTracker.slugs import enregistrer_avec_slug
 
 # Create your models here.
 class Article(models.Model):
@@ -12,7 +13,7 @@ class Article(models.Model):
     )
     
     titre = models.CharField(max_length=200)
-    slug = models.SlugField(unique=True)
+    slug = models.SlugField(unique=True, blank=True, help_text="Laisser vide pour le générer depuis le titre")
     contenu = models.TextField(help_text="Introduction de l'article")
     resume = models.TextField(max_length=300, blank=True, help_text="Résumé court de l'article (affiché dans la liste)")
     image = models.ImageField(upload_to='articles/', blank=True, null=True, help_text="Image principale de l'article (pour la liste)")
@@ -25,6 +26,13 @@ class Article(models.Model):
     def __str__(self):
         return self.titre
 
+    def save(self, *args, **kwargs):
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            # Slug généré depuis le titre s'il n'est pas fourni
+            enregistrer_avec_slug(self, self.titre, super().save, *args, **kwargs)
+
     class Meta:
         verbose_name = "Article"
         verbose_name_plural = "Articles"
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from CODMTracker.cache import invalider_cache
+from .models import Article, ArticleImage, ArticleBlock
+
+
+@receiver([post_save, post_delete], sender=Article)
+@receiver([post_save, post_delete], sender=ArticleImage)
+@receiver([post_save, post_delete], sender=ArticleBlock)
+def invalider_cache_articles(sender, **kwargs):
+    """Article publié / modifié / supprimé → le blog et les fiches sont recalculés"""
+    invalider_cache('articles')
@@ -1,16 +1,19 @@
 from django.shortcuts import render, get_object_or_404
+from CODMTracker.cache import cache_anonyme
 from .models import Article, ArticleImage, ArticleBlock
 
+@cache_anonyme('articles')
 def blog_view(request):
     """Vue pour la page blog/articles"""
-    articles = Article.objects.filter(publie=True).order_by('-cree_le')
+    articles = Article.objects.filter(publie=True).select_related('auteur').order_by('-cree_le')
     return render(request, 'articles/blog.html', {'articles': articles})
 
+@cache_anonyme('articles')
 def article_detail(request, slug):
     """Vue pour le détail d'un article"""
     article = get_object_or_404(Article, slug=slug, publie=True)
     images = article.images.all()
-    blocks = article.blocks.all()
+    blocks = article.blocks.select_related('image')
     
     return render(request, 'articles/article_detail.html', {
         'article': article,
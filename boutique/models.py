@@ -3,6 +3,7 @@ from django.db import models
 from django.utils import timezone
 from django.utils.text import slugify
 from decimal import Decimal
+from CODMTracker.courriels import envoyer_modele
 
 # Utilisateur
 from utilisateurs.models import Utilisateur
@@ -215,3 +216,19 @@ class Paiement(models.Model):
         commande = self.commande
         commande.statut = 'payee'
         commande.save(update_fields=['statut'])
+
+        # Confirmation par email, mise en file (envoyée après le commit du paiement)
+        utilisateur = commande.utilisateur
+        envoyer_modele(
+            'commande_payee',
+            f"Commande {commande.numero_commande} confirmée",
+            [utilisateur.email],
+            {
+                'prenom': utilisateur.prenom,
+                'numero': commande.numero_commande,
+                'total': commande.total,
+                'frais_livraison': commande.frais_livraison,
+                'total_avec_livraison': commande.total_avec_livraison,
+                'adresse': commande.adresse_livraison,
+            },
+        )
@@ -33,6 +33,7 @@ import os
 
 from .models import Produit, Categorie, Panier, PanierProduit, Commande, Paiement
 from .utils.paystack import initialize_payment, verify_payment
+from CODMTracker.error_pages import reponse_erreur
 from decimal import Decimal
 
 # Clé secrète Paystack (disponible partout dans views.py)
@@ -45,7 +46,7 @@ PAYSTACK_SECRET_KEY = (
 
 
 def custom_404(request, exception):
-    return render(request, "404.html", status=404)
+    return reponse_erreur(404, request)
 
 # --- Helpers ---
 def get_cart_count(user):
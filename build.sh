@@ -10,6 +10,9 @@ python manage.py collectstatic --noinput
 echo "🛠 Migrations"
 python manage.py migrate
 
+echo "🧊 Table du cache partagé"
+python manage.py createcachetable
+
 echo "👤 Création superuser"
 python manage.py shell -c "import create_superuser"
 
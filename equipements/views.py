@@ -3,6 +3,7 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
 import json
+from CODMTracker.limites import limiter, par_utilisateur
 from .models import Equipement
 from profils.models import ProfilJoueur
 
@@ -17,6 +18,7 @@ def loadouts_view(request):
         return render(request, 'equipements/loadouts.html', {'error': 'Veuillez créer votre profil joueur d\'abord'})
 
 @login_required
+@limiter('api', cle=par_utilisateur, json=True)
 def add_loadout_view(request):
     """Vue pour ajouter un loadout (AJAX)"""
     if request.method != 'POST':
@@ -54,6 +56,7 @@ def add_loadout_view(request):
     })
 
 @login_required
+@limiter('api', cle=par_utilisateur, json=True)
 def delete_loadout_view(request, loadout_id):
     """Vue pour supprimer un loadout"""
     if request.method != 'POST':
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Communaute, MembreCommunaute, Post, LikePost, Commentaire, LikeCommentaire, Notification
+from .models import Communaute, MembreCommunaute, Post, LikePost, Commentaire, LikeCommentaire, Notification, CompteurNotifications
 
 
 @admin.register(Communaute)
@@ -42,6 +42,12 @@ class CommentaireAdmin(admin.ModelAdmin):
     list_filter = ['est_actif', 'date_creation']
     search_fields = ['contenu', 'auteur__nom', 'post__titre']
     readonly_fields = ['nombre_likes', 'date_creation', 'date_modification']
+    actions = ['desactiver_fils']
+    
+    def desactiver_fils(self, request, queryset):
+        total = sum(commentaire.desactiver_fil() for commentaire in queryset)
+        self.message_user(request, f'{total} commentaire(s) désactivé(s) avec leurs réponses.')
+    desactiver_fils.short_description = 'Désactiver avec toutes les réponses'
 
 
 @admin.register(LikeCommentaire)
@@ -53,10 +59,10 @@ class LikeCommentaireAdmin(admin.ModelAdmin):
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
-    list_display = ['utilisateur', 'type_notification', 'titre', 'lu', 'date_creation', 'status_color']
+    list_display = ['utilisateur', 'type_notification', 'titre', 'nombre', 'lu', 'date_creation', 'status_color']
     list_filter = ['type_notification', 'lu', 'date_creation']
     search_fields = ['utilisateur__nom', 'utilisateur__prenom', 'titre', 'message']
-    readonly_fields = ['date_creation']
+    readonly_fields = ['date_creation', 'cle_regroupement', 'nombre', 'dernier_acteur']
     date_hierarchy = 'date_creation'
     list_editable = ['lu']
     
@@ -71,6 +77,10 @@ class NotificationAdmin(admin.ModelAdmin):
             'fields': ('post', 'commentaire'),
             'classes': ('collapse',)
         }),
+        ('Regroupement', {
+            'fields': ('cle_regroupement', 'nombre', 'dernier_acteur'),
+            'classes': ('collapse',)
+        }),
         ('Statut', {
             'fields': ('lu', 'date_creation')
         }),
@@ -83,14 +93,33 @@ class NotificationAdmin(admin.ModelAdmin):
         return format_html('<span style="color: #ff1a1a; font-weight: bold;">● Non lu</span>')
     status_color.short_description = 'Statut'
     
-    actions = ['marquer_comme_lu', 'marquer_comme_non_lu']
+    actions = ['marquer_comme_lu', 'marquer_comme_non_lu', 'recalculer_compteurs']
+    
+    def save_model(self, request, obj, form, change):
+        """Formulaire et list_editable : le compteur des non lues suit le champ lu"""
+        super().save_model(request, obj, form, change)
+        if not change or 'lu' in form.changed_data:
+            CompteurNotifications.recalculer_lot([obj.utilisateur_id])
+    
+    def _destinataires(self, queryset):
+        return set(queryset.values_list('utilisateur_id', flat=True))
     
     def marquer_comme_lu(self, request, queryset):
+        destinataires = self._destinataires(queryset)
         updated = queryset.update(lu=True)
+        CompteurNotifications.recalculer_lot(destinataires)
         self.message_user(request, f'{updated} notification(s) marquée(s) comme lue(s).')
     marquer_comme_lu.short_description = 'Marquer comme lues'
     
     def marquer_comme_non_lu(self, request, queryset):
+        destinataires = self._destinataires(queryset)
         updated = queryset.update(lu=False)
+        CompteurNotifications.recalculer_lot(destinataires)
         self.message_user(request, f'{updated} notification(s) marquée(s) comme non lue(s).')
     marquer_comme_non_lu.short_description = 'Marquer comme non lues'
+    
+    def recalculer_compteurs(self, request, queryset):
+        destinataires = self._destinataires(queryset)
+        CompteurNotifications.recalculer_lot(destinataires)
+        self.message_user(request, f'{len(destinataires)} compteur(s) de non lues recalculé(s).')
+    recalculer_compteurs.short_description = 'Recalculer les compteurs des destinataires'
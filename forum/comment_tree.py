@@ -0,0 +1,95 @@
+# forum/comment_tree.py
+# Chargement des fils de commentaires : une page de racines + toutes leurs réponses
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from .models import Commentaire, LikeCommentaire, borne_chemin
+from .pagination import KeysetPaginator
+
+ORDRE_COMMENTAIRES = ('date_creation', 'id')
+
+
+def _sql_descendants(racine_ids):
+    """Requête récursive (SQLite et PostgreSQL) retournant les ids de toutes les réponses actives.
+
+    Utilisée pour les commentaires dont le chemin n'a pas encore été calculé
+    (voir la commande calculer_chemins_commentaires).
+    """
+    table = connection.ops.quote_name(Commentaire._meta.db_table)
+    marques = ', '.join(['%s'] * len(racine_ids))
+    sql = (
+        f"WITH RECURSIVE arbre(id) AS ("
+        f" SELECT id FROM {table} WHERE parent_id IN ({marques}) AND est_actif = %s"
+        f" UNION ALL"
+        f" SELECT c.id FROM {table} c INNER JOIN arbre a ON c.parent_id = a.id WHERE c.est_actif = %s"
+        f") SELECT id FROM arbre"
+    )
+    return sql, [*racine_ids, True, True]
+
+
+def filtre_descendants(racines):
+    """Condition "réponse de l'une des racines" : un intervalle de chemin par racine"""
+    condition = Q()
+    sans_chemin = []
+    for racine in racines:
+        if racine.chemin:
+            condition |= Q(chemin__gt=racine.chemin, chemin__lt=borne_chemin(racine.chemin))
+        else:
+            sans_chemin.append(racine.id)
+    if sans_chemin:
+        sql, params = _sql_descendants(sans_chemin)
+        condition |= Q(id__in=RawSQL(sql, params))
+    return condition
+
+
+def assembler_arbre(racines, descendants):
+    """Rattache chaque réponse à son parent en O(n).
+
+    Les descendants arrivent triés par chemin (ordre de création à chaque niveau) :
+    chaque liste `reponses_chargees` est donc déjà dans l'ordre d'affichage.
+    """
+    noeuds = {}
+    for commentaire in racines:
+        commentaire.reponses_chargees = []
+        noeuds[commentaire.id] = commentaire
+    for commentaire in descendants:
+        commentaire.reponses_chargees = []
+        noeuds[commentaire.id] = commentaire
+    for commentaire in descendants:
+        parent = noeuds.get(commentaire.parent_id)
+        if parent is not None:
+            parent.reponses_chargees.append(commentaire)
+    return noeuds
+
+
+def charger_fil(post, utilisateur=None, curseur=None, par_page=20):
+    """Page de commentaires racines d'un post avec leurs réponses imbriquées.
+
+    Retourne (page, ids des commentaires likés par l'utilisateur parmi ceux affichés).
+    3 requêtes au plus : racines, descendants (intervalles sur l'index (post, chemin)),
+    likes de l'utilisateur.
+    """
+    racines = Commentaire.objects.filter(
+        post=post,
+        est_actif=True,
+        parent__isnull=True
+    ).select_related('auteur')
+    page = KeysetPaginator(racines, ORDRE_COMMENTAIRES, par_page).page(curseur)
+
+    descendants = []
+    if page:
+        descendants = list(
+            Commentaire.objects.filter(filtre_descendants(page), post=post, est_actif=True)
+            .select_related('auteur')
+            .order_by('chemin', 'date_creation', 'id')
+        )
+    noeuds = assembler_arbre(page, descendants)
+
+    # Likes de l'utilisateur uniquement pour les commentaires affichés
+    likes = set()
+    if utilisateur is not None and utilisateur.is_authenticated and noeuds:
+        likes = set(LikeCommentaire.objects.filter(
+            commentaire_id__in=list(noeuds),
+            utilisateur=utilisateur
+        ).values_list('commentaire_id', flat=True))
+    return page, likes
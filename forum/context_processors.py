@@ -1,13 +1,10 @@
-from .models import Notification
+from django.conf import settings
+from .notifications import non_lues
 
 
 def notifications_count(request):
-    """Context processor pour ajouter le nombre de notifications non lues"""
-    if request.user.is_authenticated:
-        count = Notification.objects.filter(utilisateur=request.user, lu=False).count()
-        return {
-            'notifications_count': count
-        }
+    """Context processor pour ajouter le nombre de notifications non lues (compteur maintenu, pas de COUNT)"""
     return {
-        'notifications_count': 0
+        'notifications_count': non_lues(request),
+        'flux_temps_reel': settings.FLUX_TEMPS_REEL,
     }
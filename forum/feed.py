@@ -0,0 +1,81 @@
+# forum/feed.py
+# Fil personnalisé : posts récents de toutes les communautés rejointes
+import hashlib
+from itertools import chain
+from django.core.cache import cache
+from django.db import connections
+from CODMTracker.cache import version_cache
+from .models import MembreCommunaute, Post
+from .pagination import KeysetPaginator
+
+ORDRE_FIL = ('-date_creation', 'id')
+
+# Au-delà, une seule requête sur l'index global (-date_creation, id) est plus efficace
+# que la fusion de lectures par communauté (les posts correspondants y sont denses)
+SEUIL_FUSION = 20
+
+CACHE_PREMIERE_PAGE_SECONDES = 60
+
+
+def communautes_rejointes(utilisateur):
+    """Ids des communautés actives rejointes par l'utilisateur"""
+    return sorted(MembreCommunaute.objects.filter(
+        utilisateur=utilisateur,
+        communaute__est_active=True
+    ).values_list('communaute_id', flat=True))
+
+
+def _posts(communaute_ids):
+    return Post.objects.filter(communaute_id__in=communaute_ids, est_actif=True)
+
+
+def _candidats(communaute_ids, paginateur, curseur, par_page):
+    """Fan-in : les par_page+1 posts suivants de chaque communauté (une requête UNION ALL).
+
+    Chaque sous-requête descend l'index (communaute, -date_creation) et s'arrête
+    après par_page+1 lignes, quel que soit le nombre de posts de la communauté.
+    """
+    apres = paginateur.filtre_curseur(curseur)
+    sous_requetes = [
+        _posts([communaute_id]).filter(apres).order_by(*ORDRE_FIL).values_list('id', flat=True)[:par_page + 1]
+        for communaute_id in communaute_ids
+    ]
+    premiere, *autres = sous_requetes
+    if autres and connections[premiere.db].features.supports_slicing_ordering_in_compound:
+        return list(premiere.union(*autres, all=True))
+    # SQLite : pas de LIMIT dans un UNION, une courte requête par communauté
+    return list(chain.from_iterable(sous_requetes))
+
+
+def page_fil(communaute_ids, curseur=None, par_page=10):
+    """Page du fil, paginée par curseur sur (date_creation, id)"""
+    if not communaute_ids:
+        return KeysetPaginator(Post.objects.none(), ORDRE_FIL, par_page).page()
+
+    if len(communaute_ids) > SEUIL_FUSION:
+        posts = _posts(communaute_ids)
+    else:
+        paginateur = KeysetPaginator(Post.objects.all(), ORDRE_FIL, par_page)
+        posts = Post.objects.filter(id__in=_candidats(communaute_ids, paginateur, curseur, par_page))
+
+    posts = posts.select_related('auteur', 'communaute')
+    return KeysetPaginator(posts, ORDRE_FIL, par_page).page(curseur)
+
+
+def fil_utilisateur(utilisateur, curseur=None, par_page=10):
+    """Fil de l'utilisateur ; la première page est mise en cache quelques instants.
+
+    La clé suit la version du groupe 'forum' (nouveau post) et les communautés
+    rejointes : rejoindre ou quitter une communauté donne une nouvelle page.
+    """
+    communaute_ids = communautes_rejointes(utilisateur)
+    if curseur:
+        return page_fil(communaute_ids, curseur, par_page)
+
+    empreinte = hashlib.md5(','.join(map(str, communaute_ids)).encode('ascii')).hexdigest()
+    cle = f"fil:{utilisateur.pk}:{version_cache('forum')}:{empreinte}:{par_page}"
+    page = cache.get(cle)
+    if page is None:
+        page = page_fil(communaute_ids, None, par_page)
+        cache.set(cle, page, CACHE_PREMIERE_PAGE_SECONDES)
+    return page
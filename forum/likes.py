@@ -0,0 +1,162 @@
+# forum/likes.py
+# Likes par lots : plusieurs posts/commentaires likés ou déliké en une requête
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.urls import reverse
+from .models import Commentaire, LikeCommentaire, LikePost, Post
+from .notifications import notifier_lot
+from .ranking import score_hot
+
+# Nombre maximal d'opérations acceptées par requête
+OPERATIONS_MAX = 100
+
+# Par type de cible : modèle, modèle de like, champ de la cible sur le like
+CIBLES = {
+    'post': (Post, LikePost, 'post_id'),
+    'commentaire': (Commentaire, LikeCommentaire, 'commentaire_id'),
+}
+
+
+VRAI = {'true', '1', 'oui', 'on', 'yes'}
+FAUX = {'false', '0', 'non', 'off', 'no', ''}
+
+
+def lire_booleen(valeur):
+    """true/false JSON, 1/0 ou leurs écritures texte ("false" n'est pas vrai) ; None si illisible"""
+    if isinstance(valeur, bool):
+        return valeur
+    if isinstance(valeur, int) and valeur in (0, 1):
+        return bool(valeur)
+    if isinstance(valeur, str):
+        valeur = valeur.strip().lower()
+        if valeur in VRAI:
+            return True
+        if valeur in FAUX:
+            return False
+    return None
+
+
+def lire_operations(donnees):
+    """{'type': ..., 'id': ..., 'like': bool} → {type: {id: like}} (la dernière opération sur une cible l'emporte)"""
+    etats = {type_cible: {} for type_cible in CIBLES}
+    for operation in donnees[:OPERATIONS_MAX]:
+        try:
+            type_cible = operation['type']
+            cible_id = int(operation['id'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        like = lire_booleen(operation.get('like', True))
+        if type_cible in etats and like is not None:
+            etats[type_cible][cible_id] = like
+    return etats
+
+
+def _recompter_likes(modele, modele_like, champ, ids):
+    """nombre_likes des cibles touchées d'après les lignes réellement présentes, en un UPDATE.
+
+    Un INSERT ignoré (like concurrent déjà créé) ou un DELETE sans ligne ne
+    fausse pas le compteur, contrairement à un delta calculé avant l'écriture.
+    """
+    if ids:
+        nombre = (
+            modele_like.objects.filter(**{champ: OuterRef('pk')})
+            .order_by().values(champ).annotate(total=Count('pk')).values('total')
+        )
+        modele.objects.filter(id__in=ids).update(nombre_likes=Coalesce(Subquery(nombre), 0))
+
+
+def _recalculer_scores(post_ids):
+    posts = list(Post.objects.filter(id__in=post_ids).only('id', 'nombre_likes', 'nombre_commentaires', 'date_creation'))
+    for post in posts:
+        post.score_hot = score_hot(post.nombre_likes, post.nombre_commentaires, post.date_creation)
+    Post.objects.bulk_update(posts, ['score_hot'])
+
+
+def _notifications(utilisateur, type_cible, cibles, request=None):
+    """Événements "a aimé" des nouveaux likes sur le contenu des autres, pour notifier_lot"""
+    evenements = []
+    for cible in cibles:
+        if cible.auteur_id == utilisateur.id:
+            continue
+        post = cible if type_cible == 'post' else cible.post
+        lien = reverse('forum:post_detail', args=[post.communaute.slug, post.slug])
+        if request is not None:
+            lien = request.build_absolute_uri(lien)
+        evenement = {'utilisateur_id': cible.auteur_id, 'lien': lien, 'post': post, 'acteur': utilisateur}
+        if type_cible == 'post':
+            evenement.update(
+                type_notif='like_post',
+                titre='Quelqu\'un a aimé votre post',
+                message=f'{utilisateur.nom} {utilisateur.prenom} a aimé votre post "{post.titre}"',
+            )
+        else:
+            evenement.update(
+                type_notif='like_commentaire',
+                titre='Quelqu\'un a aimé votre commentaire',
+                message=f'{utilisateur.nom} {utilisateur.prenom} a aimé votre commentaire',
+                commentaire=cible,
+            )
+        evenements.append(evenement)
+    return evenements
+
+
+def appliquer_likes(utilisateur, etats, request=None):
+    """Applique les états voulus {type: {id: like}} et retourne le nouvel état des cibles.
+
+    Par type : 1 lecture des cibles, 1 lecture des likes existants, 1 INSERT groupé
+    (ignore_conflicts), 1 DELETE groupé, 1 UPDATE des compteurs recomptés sur les cibles touchées ;
+    puis les notifications de tout le lot en une fois (notifier_lot).
+    """
+    evenements = []
+    with transaction.atomic():
+        for type_cible, voulus in etats.items():
+            if not voulus:
+                continue
+            modele, modele_like, champ = CIBLES[type_cible]
+            cibles = modele.objects.filter(id__in=voulus, est_actif=True)
+            if type_cible == 'post':
+                cibles = cibles.select_related('communaute')
+            else:
+                cibles = cibles.select_related('post', 'post__communaute')
+            cibles = {cible.id: cible for cible in cibles}
+            existants = set(modele_like.objects.filter(
+                utilisateur=utilisateur, **{f'{champ}__in': list(cibles)}
+            ).values_list(champ, flat=True))
+
+            a_liker = [cible_id for cible_id in cibles if voulus[cible_id] and cible_id not in existants]
+            a_retirer = [cible_id for cible_id in cibles if not voulus[cible_id] and cible_id in existants]
+
+            modele_like.objects.bulk_create(
+                [modele_like(utilisateur=utilisateur, **{champ: cible_id}) for cible_id in a_liker],
+                ignore_conflicts=True,
+            )
+            if a_retirer:
+                modele_like.objects.filter(utilisateur=utilisateur, **{f'{champ}__in': a_retirer}).delete()
+
+            _recompter_likes(modele, modele_like, champ, a_liker + a_retirer)
+            if type_cible == 'post' and (a_liker or a_retirer):
+                _recalculer_scores(a_liker + a_retirer)
+            evenements += _notifications(utilisateur, type_cible, [cibles[cible_id] for cible_id in a_liker], request)
+        notifier_lot(evenements)
+
+    return etat_likes(utilisateur, {type_cible: list(voulus) for type_cible, voulus in etats.items()})
+
+
+def etat_likes(utilisateur, ids_par_type):
+    """{type: {id: {'like': bool, 'likes_count': int}}} pour les cibles actives demandées"""
+    resultat = {}
+    for type_cible, ids in ids_par_type.items():
+        modele, modele_like, champ = CIBLES[type_cible]
+        ids = list(ids)[:OPERATIONS_MAX]
+        compteurs = dict(modele.objects.filter(id__in=ids, est_actif=True).values_list('id', 'nombre_likes'))
+        likes = set()
+        if utilisateur.is_authenticated and compteurs:
+            likes = set(modele_like.objects.filter(
+                utilisateur=utilisateur, **{f'{champ}__in': list(compteurs)}
+            ).values_list(champ, flat=True))
+        resultat[type_cible] = {
+            cible_id: {'like': cible_id in likes, 'likes_count': nombre}
+            for cible_id, nombre in compteurs.items()
+        }
+    return resultat
@@ -0,0 +1,56 @@
+"""
+Calcule le chemin matérialisé des commentaires existants, par lots
+Usage: python manage.py calculer_chemins_commentaires --taille-lot 1000
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from forum.models import Commentaire, LARGEUR_SEGMENT, PROFONDEUR_MAX, segment_chemin
+
+
+class Command(BaseCommand):
+    help = 'Renseigne Commentaire.chemin / profondeur pour les commentaires qui n\'en ont pas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=1000,
+            help='Nombre de commentaires mis à jour par transaction',
+        )
+
+    def handle(self, *args, **options):
+        taille_lot = options['taille_lot']
+        total = 0
+
+        # Niveau par niveau : un commentaire n'est traité qu'une fois le chemin de son parent connu
+        while True:
+            lot = list(
+                Commentaire.objects.filter(chemin='')
+                .filter(parent__isnull=True)
+                .only('id', 'parent_id')[:taille_lot]
+            ) or list(
+                Commentaire.objects.filter(chemin='')
+                .exclude(parent__chemin='')
+                .select_related('parent')
+                .only('id', 'parent_id', 'parent__chemin')[:taille_lot]
+            )
+            if not lot:
+                break
+
+            for commentaire in lot:
+                prefixe = commentaire.parent.chemin if commentaire.parent_id else ''
+                if len(prefixe) >= LARGEUR_SEGMENT * PROFONDEUR_MAX:
+                    # Fil trop profond : rangé au niveau de son parent (comme Commentaire.save)
+                    prefixe = prefixe[:-LARGEUR_SEGMENT]
+                commentaire.chemin = prefixe + segment_chemin(commentaire.id)
+                commentaire.profondeur = len(commentaire.chemin) // LARGEUR_SEGMENT - 1
+
+            with transaction.atomic():
+                Commentaire.objects.bulk_update(lot, ['chemin', 'profondeur'], batch_size=taille_lot)
+            total += len(lot)
+            self.stdout.write(f'→ {total} commentaire(s) traité(s)')
+
+        restants = Commentaire.objects.filter(chemin='').count()
+        if restants:
+            self.stdout.write(self.style.WARNING(f'⚠️ {restants} commentaire(s) sans chemin'))
+        self.stdout.write(self.style.SUCCESS(f'\n✅ {total} chemin(s) calculé(s)'))
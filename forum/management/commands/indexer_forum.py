@@ -0,0 +1,49 @@
+"""
+Indexe les posts et commentaires existants pour la recherche, par lots
+Usage: python manage.py indexer_forum --taille-lot 500
+"""
+from django.core.management.base import BaseCommand
+from forum.models import Commentaire, DocumentRecherche, Post
+from forum.search import indexer, reconstruire_index_sqlite
+
+
+class Command(BaseCommand):
+    help = 'Construit (ou reconstruit avec --vider) l\'index de recherche du forum'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=500,
+            help='Nombre d\'objets indexés par lot',
+        )
+        parser.add_argument(
+            '--vider',
+            action='store_true',
+            help='Supprime l\'index existant avant de tout réindexer',
+        )
+
+    def handle(self, *args, **options):
+        taille_lot = options['taille_lot']
+        if options['vider']:
+            DocumentRecherche.objects.all().delete()
+            reconstruire_index_sqlite()
+            self.stdout.write(self.style.WARNING('🗑️ Index vidé'))
+
+        total = 0
+        for type_document, modele in (('post', Post), ('commentaire', Commentaire)):
+            dernier_id = 0
+            # Parcours keyset sur l'id, les objets inactifs sont ignorés par indexer()
+            while True:
+                ids = list(
+                    modele.objects.filter(id__gt=dernier_id, est_actif=True)
+                    .order_by('id')
+                    .values_list('id', flat=True)[:taille_lot]
+                )
+                if not ids:
+                    break
+                total += indexer({(type_document, objet_id) for objet_id in ids})
+                dernier_id = ids[-1]
+                self.stdout.write(f'→ {total} document(s) indexé(s)')
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ {total} document(s) dans l\'index de recherche'))
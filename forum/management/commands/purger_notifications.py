@@ -0,0 +1,43 @@
+"""
+Supprime les notifications lues anciennes, par lots
+Usage: python manage.py purger_notifications --jours 30 --taille-lot 1000
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from forum.models import Notification
+
+
+class Command(BaseCommand):
+    help = 'Supprime les notifications lues depuis plus de N jours'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--jours',
+            type=int,
+            default=30,
+            help='Âge minimal (en jours) des notifications lues à supprimer',
+        )
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=1000,
+            help='Nombre de notifications supprimées par requête',
+        )
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(days=options['jours'])
+        taille_lot = options['taille_lot']
+        anciennes = Notification.objects.filter(lu=True, date_creation__lt=limite)
+
+        total = 0
+        # Lots courts sur l'index (lu, date_creation) : pas de long verrou sur la table
+        while True:
+            ids = list(anciennes.order_by('date_creation').values_list('id', flat=True)[:taille_lot])
+            if not ids:
+                break
+            Notification.objects.filter(id__in=ids).delete()
+            total += len(ids)
+            self.stdout.write(f'→ {total} notification(s) supprimée(s)')
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ {total} notification(s) lue(s) de plus de {options["jours"]} jours supprimée(s)'))
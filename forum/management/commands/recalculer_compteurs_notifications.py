@@ -0,0 +1,41 @@
+"""
+Recalcule les compteurs de notifications non lues (correction de dérive), par lots
+Usage: python manage.py recalculer_compteurs_notifications --taille-lot 1000
+"""
+from django.core.management.base import BaseCommand
+from forum.models import CompteurNotifications
+from utilisateurs.models import Utilisateur
+
+
+class Command(BaseCommand):
+    help = 'Recompte les notifications non lues de chaque utilisateur et corrige CompteurNotifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=1000,
+            help='Nombre d\'utilisateurs recalculés par lot',
+        )
+
+    def handle(self, *args, **options):
+        taille_lot = options['taille_lot']
+        total = corriges = 0
+        dernier_id = 0
+
+        # Parcours keyset sur l'id des utilisateurs
+        while True:
+            ids = list(
+                Utilisateur.objects.filter(pk__gt=dernier_id)
+                .order_by('pk').values_list('pk', flat=True)[:taille_lot]
+            )
+            if not ids:
+                break
+            avant = dict(CompteurNotifications.objects.filter(utilisateur_id__in=ids).values_list('utilisateur_id', 'non_lues'))
+            apres = CompteurNotifications.recalculer_lot(ids)
+            corriges += sum(1 for utilisateur_id, non_lues in apres.items() if avant.get(utilisateur_id, 0) != non_lues)
+            total += len(ids)
+            dernier_id = ids[-1]
+            self.stdout.write(f'→ {total} utilisateur(s) traité(s)')
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ {corriges} compteur(s) corrigé(s) sur {total}'))
@@ -0,0 +1,58 @@
+"""
+Recalcule le score "hot" des posts, par lots
+Usage: python manage.py recalculer_scores_posts --jours 30 --taille-lot 1000
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from forum.models import Post
+from forum.ranking import score_hot
+
+
+class Command(BaseCommand):
+    help = 'Recalcule Post.score_hot (après l\'ajout du champ ou un changement de formule)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--jours',
+            type=int,
+            default=30,
+            help='Ne recalculer que les posts créés depuis N jours',
+        )
+        parser.add_argument(
+            '--tous',
+            action='store_true',
+            help='Recalculer tous les posts, quelle que soit leur date',
+        )
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=1000,
+            help='Nombre de posts mis à jour par transaction',
+        )
+
+    def handle(self, *args, **options):
+        taille_lot = options['taille_lot']
+        posts = Post.objects.only('id', 'nombre_likes', 'nombre_commentaires', 'date_creation', 'score_hot')
+        if not options['tous']:
+            posts = posts.filter(date_creation__gte=timezone.now() - timedelta(days=options['jours']))
+
+        total = 0
+        dernier_id = 0
+        # Parcours keyset sur l'id : chaque lot coûte le même prix
+        while True:
+            lot = list(posts.filter(id__gt=dernier_id).order_by('id')[:taille_lot])
+            if not lot:
+                break
+
+            for post in lot:
+                post.score_hot = score_hot(post.nombre_likes, post.nombre_commentaires, post.date_creation)
+
+            with transaction.atomic():
+                Post.objects.bulk_update(lot, ['score_hot'], batch_size=taille_lot)
+            dernier_id = lot[-1].id
+            total += len(lot)
+            self.stdout.write(f'→ {total} post(s) traité(s)')
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ {total} score(s) recalculé(s)'))
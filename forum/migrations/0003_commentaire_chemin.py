@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0002_notification'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='commentaire',
+            name='chemin',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Chemin matérialisé (ids des ancêtres)', max_length=250),
+        ),
+        migrations.AddField(
+            model_name='commentaire',
+            name='profondeur',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='commentaire',
+            index=models.Index(fields=['post', 'chemin'], name='forum_comme_post_id_c6765d_idx'),
+        ),
+    ]
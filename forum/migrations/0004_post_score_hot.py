@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0003_commentaire_chemin'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='score_hot',
+            field=models.FloatField(default=0, editable=False, help_text='Popularité amortie par l\'âge (tri "hot")'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['communaute', '-score_hot'], name='forum_post_communa_66d1fe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['communaute', '-nombre_likes'], name='forum_post_communa_415606_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-score_hot'], name='forum_post_score_h_e032ec_idx'),
+        ),
+    ]
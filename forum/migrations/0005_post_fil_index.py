@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0004_post_score_hot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-date_creation', 'id'], name='forum_post_date_cr_13f8fe_idx'),
+        ),
+    ]
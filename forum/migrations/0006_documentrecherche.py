@@ -0,0 +1,76 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Index plein texte propre au moteur ; le contenu existant s'indexe ensuite avec
+# python manage.py indexer_forum
+SQLITE_CREATION = [
+    "CREATE VIRTUAL TABLE forum_recherche_fts USING fts5("
+    "contenu_index, content='forum_documentrecherche', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER forum_recherche_ai AFTER INSERT ON forum_documentrecherche BEGIN "
+    "INSERT INTO forum_recherche_fts(rowid, contenu_index) VALUES (new.id, new.contenu_index); END",
+    "CREATE TRIGGER forum_recherche_ad AFTER DELETE ON forum_documentrecherche BEGIN "
+    "INSERT INTO forum_recherche_fts(forum_recherche_fts, rowid, contenu_index) "
+    "VALUES ('delete', old.id, old.contenu_index); END",
+    "CREATE TRIGGER forum_recherche_au AFTER UPDATE ON forum_documentrecherche BEGIN "
+    "INSERT INTO forum_recherche_fts(forum_recherche_fts, rowid, contenu_index) "
+    "VALUES ('delete', old.id, old.contenu_index); "
+    "INSERT INTO forum_recherche_fts(rowid, contenu_index) VALUES (new.id, new.contenu_index); END",
+]
+SQLITE_SUPPRESSION = [
+    "DROP TRIGGER IF EXISTS forum_recherche_au",
+    "DROP TRIGGER IF EXISTS forum_recherche_ad",
+    "DROP TRIGGER IF EXISTS forum_recherche_ai",
+    "DROP TABLE IF EXISTS forum_recherche_fts",
+]
+POSTGRES_CREATION = [
+    "CREATE INDEX forum_recherche_gin ON forum_documentrecherche "
+    "USING GIN (to_tsvector('simple', contenu_index))",
+]
+POSTGRES_SUPPRESSION = [
+    "DROP INDEX IF EXISTS forum_recherche_gin",
+]
+
+
+def _executer(schema_editor, requetes):
+    for requete in requetes.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(requete)
+
+
+def creer_index_plein_texte(apps, schema_editor):
+    _executer(schema_editor, {'sqlite': SQLITE_CREATION, 'postgresql': POSTGRES_CREATION})
+
+
+def supprimer_index_plein_texte(apps, schema_editor):
+    _executer(schema_editor, {'sqlite': SQLITE_SUPPRESSION, 'postgresql': POSTGRES_SUPPRESSION})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0005_post_fil_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentRecherche',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cle', models.CharField(help_text="type:id de l'objet indexé", max_length=40, unique=True)),
+                ('type_document', models.CharField(choices=[('post', 'Post'), ('commentaire', 'Commentaire')], max_length=20)),
+                ('contenu_index', models.TextField()),
+                ('date_creation', models.DateTimeField()),
+                ('commentaire', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='forum.commentaire')),
+                ('communaute', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='forum.communaute')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='forum.post')),
+            ],
+            options={
+                'verbose_name': 'Document de recherche',
+                'verbose_name_plural': 'Documents de recherche',
+                'indexes': [models.Index(fields=['communaute', '-date_creation', 'id'], name='forum_docum_communa_1945ea_idx'), models.Index(fields=['-date_creation', 'id'], name='forum_docum_date_cr_e100d5_idx')],
+            },
+        ),
+        migrations.RunPython(creer_index_plein_texte, supprimer_index_plein_texte),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0006_documentrecherche'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='cle_regroupement',
+            field=models.CharField(blank=True, default='', help_text='type:cible:id des notifications fusionnées', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='dernier_acteur',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='nombre',
+            field=models.PositiveIntegerField(default=1, help_text="Nombre d'événements regroupés"),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['lu', 'date_creation'], name='forum_notif_lu_927921_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(condition=models.Q(('lu', False), models.Q(('cle_regroupement', ''), _negated=True)), fields=('utilisateur', 'cle_regroupement'), name='notification_non_lue_unique'),
+        ),
+    ]
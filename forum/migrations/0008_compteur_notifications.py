@@ -0,0 +1,58 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def initialiser_compteurs(apps, schema_editor):
+    """Compteurs de départ : un COUNT groupé des non lues existantes"""
+    Notification = apps.get_model('forum', 'Notification')
+    CompteurNotifications = apps.get_model('forum', 'CompteurNotifications')
+    alias = schema_editor.connection.alias
+    non_lues = (
+        Notification.objects.using(alias).filter(lu=False)
+        .values('utilisateur_id')
+        .annotate(total=Count('id'))
+    )
+    CompteurNotifications.objects.using(alias).bulk_create(
+        [CompteurNotifications(utilisateur_id=ligne['utilisateur_id'], non_lues=ligne['total']) for ligne in non_lues],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0007_notification_regroupement'),
+        ('utilisateurs', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompteurNotifications',
+            fields=[
+                ('utilisateur', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='compteur_notifications', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('non_lues', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Compteur de notifications',
+                'verbose_name_plural': 'Compteurs de notifications',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='forum_notif_utilisa_6830f4_idx',
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['utilisateur', '-date_creation', 'id'], name='forum_notif_utilisa_e9eeb0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('lu', False)), fields=['utilisateur', 'id'], name='notification_non_lue_idx'),
+        ),
+        migrations.RunPython(initialiser_compteurs, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,13 @@
+from collections import defaultdict
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.utils import timezone
 from utilisateurs.models import Utilisateur
+from CODMTracker.pubsub import publier_apres_commit
+from CODMTracker.slugs import enregistrer_avec_slug
+from CODMTracker.taches import Regroupeur
+from .ranking import score_hot
 
 
 class Communaute(models.Model):
@@ -30,6 +37,25 @@ class Communaute(models.Model):
         self.nombre_posts = self.posts.filter(est_actif=True).count()
         self.nombre_membres = self.membres.count()
         self.save(update_fields=['nombre_posts', 'nombre_membres'])
+    
+    @staticmethod
+    def ajuster_compteurs(communaute_id, posts=0, membres=0):
+        """Applique un delta aux compteurs (un UPDATE, sans COUNT), puis planifie un recalcul différé"""
+        Communaute.objects.filter(pk=communaute_id).update(
+            nombre_posts=Greatest(F('nombre_posts') + posts, 0),
+            nombre_membres=Greatest(F('nombre_membres') + membres, 0),
+        )
+        recalcul_stats.ajouter(communaute_id)
+
+
+def _recalculer_stats(communaute_ids):
+    """Corrige la dérive éventuelle des compteurs (suppressions en cascade, UPDATE groupés...)"""
+    for communaute in Communaute.objects.filter(id__in=communaute_ids):
+        communaute.update_stats()
+
+
+# Une rafale de posts dans une communauté ne déclenche qu'un recalcul, 30 s plus tard
+recalcul_stats = Regroupeur(_recalculer_stats, delai=30.0, taille_max=100)
 
 
 class MembreCommunaute(models.Model):
@@ -67,6 +93,7 @@ class Post(models.Model):
     # Statistiques
     nombre_likes = models.PositiveIntegerField(default=0)
     nombre_commentaires = models.PositiveIntegerField(default=0)
+    score_hot = models.FloatField(default=0, editable=False, help_text="Popularité amortie par l'âge (tri \"hot\")")
     
     # Métadonnées
     date_creation = models.DateTimeField(auto_now_add=True)
@@ -81,24 +108,55 @@ class Post(models.Model):
         indexes = [
             models.Index(fields=['communaute', '-date_creation']),
             models.Index(fields=['auteur', '-date_creation']),
+            # Tris "hot" et "top" par communauté, et page tendances multi-communautés
+            models.Index(fields=['communaute', '-score_hot']),
+            models.Index(fields=['communaute', '-nombre_likes']),
+            models.Index(fields=['-score_hot']),
+            # Fil personnalisé des membres de nombreuses communautés (voir forum/feed.py)
+            models.Index(fields=['-date_creation', 'id']),
         ]
     
     def __str__(self):
         return f"{self.titre} - {self.communaute.nom}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # État en base, pour ajuster les compteurs de communauté par delta au prochain save()
+        instance._etat_en_base = (instance.__dict__.get('communaute_id'), instance.__dict__.get('est_actif'))
+        return instance
+    
     def save(self, *args, **kwargs):
-        if not self.slug:
-            from django.utils.text import slugify
-            self.slug = slugify(self.titre)
-            # Assurer l'unicité
-            base_slug = self.slug
-            counter = 1
-            while Post.objects.filter(slug=self.slug).exists():
-                self.slug = f"{base_slug}-{counter}"
-                counter += 1
-        super().save(*args, **kwargs)
-        # Mettre à jour les stats de la communauté
-        self.communaute.update_stats()
+        # Le score suit les compteurs : recalculé dès qu'un like/commentaire les modifie
+        self.score_hot = score_hot(self.nombre_likes, self.nombre_commentaires, self.date_creation)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'nombre_likes', 'nombre_commentaires'} & set(update_fields):
+            kwargs['update_fields'] = list(update_fields) + ['score_hot']
+        creation = self._state.adding
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            # Slug unique en deux requêtes, même pour un titre très courant
+            enregistrer_avec_slug(self, self.titre, super().save, *args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if creation or update_fields is None or {'communaute', 'communaute_id', 'est_actif'} & set(update_fields):
+            # Les saves de compteurs (likes, commentaires) ne touchent pas à la communauté
+            self._ajuster_communaute(creation)
+        self._etat_en_base = (self.communaute_id, self.est_actif)
+    
+    def _ajuster_communaute(self, creation):
+        """Création, (dés)activation ou déplacement : delta sur nombre_posts des communautés concernées"""
+        avant = (None, False) if creation else getattr(self, '_etat_en_base', (None, None))
+        if avant[1] is None:
+            # État précédent inconnu (instance construite à la main) : recalcul différé seulement
+            recalcul_stats.ajouter(self.communaute_id)
+            return
+        if avant == (self.communaute_id, self.est_actif):
+            return
+        if avant[1]:
+            Communaute.ajuster_compteurs(avant[0], posts=-1)
+        if self.est_actif:
+            Communaute.ajuster_compteurs(self.communaute_id, posts=1)
     
     def update_comment_count(self):
         """Met à jour le nombre de commentaires"""
@@ -134,6 +192,21 @@ class LikePost(models.Model):
         post.save(update_fields=['nombre_likes'])
 
 
+# Chemin matérialisé : ids des ancêtres puis du commentaire, sur LARGEUR_SEGMENT chiffres chacun.
+# Uniquement des chiffres : l'ordre lexicographique est le même quelle que soit la collation.
+LARGEUR_SEGMENT = 10
+PROFONDEUR_MAX = 25
+
+
+def segment_chemin(commentaire_id):
+    return f"{commentaire_id:0{LARGEUR_SEGMENT}d}"
+
+
+def borne_chemin(chemin):
+    """Premier chemin qui suit tout le sous-arbre de `chemin` (frère suivant)"""
+    return chemin[:-LARGEUR_SEGMENT] + segment_chemin(int(chemin[-LARGEUR_SEGMENT:]) + 1)
+
+
 class Commentaire(models.Model):
     """Commentaire sous un post - Niveau 3"""
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='commentaires')
@@ -141,6 +214,10 @@ class Commentaire(models.Model):
     contenu = models.TextField()
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='reponses', help_text="Commentaire parent pour les réponses")
     
+    # Fil de discussion
+    chemin = models.CharField(max_length=LARGEUR_SEGMENT * PROFONDEUR_MAX, blank=True, default='', editable=False, help_text="Chemin matérialisé (ids des ancêtres)")
+    profondeur = models.PositiveSmallIntegerField(default=0, editable=False)
+    
     # Statistiques
     nombre_likes = models.PositiveIntegerField(default=0)
     
@@ -155,16 +232,64 @@ class Commentaire(models.Model):
         ordering = ['date_creation']
         indexes = [
             models.Index(fields=['post', 'date_creation']),
+            # Fil ordonné pour l'affichage et sous-arbres : parcours d'intervalle sur le chemin
+            models.Index(fields=['post', 'chemin']),
         ]
     
     def __str__(self):
         return f"Commentaire de {self.auteur.nom} sur {self.post.titre}"
     
     def save(self, *args, **kwargs):
+        creation = self.pk is None
+        if creation and self.parent_id:
+            # Parent antérieur au chemin matérialisé : sa profondeur n'est connue qu'une fois son chemin calculé
+            self.parent.assurer_chemin()
+        if creation and self.parent_id and self.parent.profondeur >= PROFONDEUR_MAX - 1:
+            # Fil trop profond : la réponse est rattachée au même niveau que son parent
+            self.parent = self.parent.parent
         super().save(*args, **kwargs)
+        if creation:
+            self.calculer_chemin()
         # Mettre à jour le nombre de commentaires du post
         self.post.update_comment_count()
     
+    def calculer_chemin(self):
+        """Renseigne chemin/profondeur juste après l'insertion (l'id n'est connu qu'à ce moment)"""
+        prefixe = self.parent.assurer_chemin() if self.parent_id else ''
+        if len(prefixe) >= LARGEUR_SEGMENT * PROFONDEUR_MAX:
+            # Ancien fil trop profond : rangé au niveau de son parent (comme calculer_chemins_commentaires)
+            prefixe = prefixe[:-LARGEUR_SEGMENT]
+        self.chemin = prefixe + segment_chemin(self.pk)
+        self.profondeur = len(self.chemin) // LARGEUR_SEGMENT - 1
+        Commentaire.objects.filter(pk=self.pk).update(chemin=self.chemin, profondeur=self.profondeur)
+
+    def assurer_chemin(self):
+        """Chemin du commentaire, calculé à la volée (ancêtres compris) s'il n'a pas encore été rempli"""
+        if not self.chemin:
+            self.calculer_chemin()
+        return self.chemin
+    
+    def sous_arbre(self):
+        """Le commentaire et toutes ses réponses (un seul parcours d'intervalle sur l'index)"""
+        if not self.chemin:
+            # Chemin pas encore calculé : parcours récursif
+            from .comment_tree import filtre_descendants
+            return Commentaire.objects.filter(models.Q(pk=self.pk) | filtre_descendants([self]))
+        return Commentaire.objects.filter(
+            post_id=self.post_id,
+            chemin__gte=self.chemin,
+            chemin__lt=borne_chemin(self.chemin),
+        )
+    
+    def desactiver_fil(self):
+        """Modération : désactive le commentaire et toutes ses réponses en un seul UPDATE"""
+        nombre = self.sous_arbre().update(est_actif=False)
+        self.est_actif = False
+        # Pas de post_save sur un UPDATE groupé : retrait direct de l'index de recherche
+        DocumentRecherche.objects.filter(commentaire__in=self.sous_arbre()).delete()
+        self.post.update_comment_count()
+        return nombre
+    
     def delete(self, *args, **kwargs):
         post = self.post
         super().delete(*args, **kwargs)
@@ -224,6 +349,11 @@ class Notification(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications')
     commentaire = models.ForeignKey(Commentaire, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications')
     
+    # Regroupement (voir forum/notifications.py)
+    cle_regroupement = models.CharField(max_length=100, blank=True, default='', help_text="type:cible:id des notifications fusionnées")
+    nombre = models.PositiveIntegerField(default=1, help_text="Nombre d'événements regroupés")
+    dernier_acteur = models.ForeignKey(Utilisateur, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    
     # Statut
     lu = models.BooleanField(default=False)
     date_creation = models.DateTimeField(auto_now_add=True)
@@ -233,13 +363,170 @@ class Notification(models.Model):
         verbose_name_plural = "Notifications"
         ordering = ['-date_creation']
         indexes = [
-            models.Index(fields=['utilisateur', '-date_creation', 'lu']),
+            # Page de notifications : même ordre que le tri keyset (-date_creation, id)
+            models.Index(fields=['utilisateur', '-date_creation', 'id']),
+            # "Tout marquer comme lu" par lots : seulement les non lues
+            models.Index(fields=['utilisateur', 'id'], condition=models.Q(lu=False), name='notification_non_lue_idx'),
+            # Purge des notifications lues anciennes
+            models.Index(fields=['lu', 'date_creation']),
         ]
+        constraints = [
+            # Au plus une notification non lue par cible regroupée : la base garantit la fusion
+            models.UniqueConstraint(
+                fields=['utilisateur', 'cle_regroupement'],
+                condition=models.Q(lu=False) & ~models.Q(cle_regroupement=''),
+                name='notification_non_lue_unique',
+            ),
+        ]
+    
+    @property
+    def autres(self):
+        """Nombre d'événements regroupés en plus du dernier"""
+        return self.nombre - 1
     
     def __str__(self):
         return f"{self.titre} - {self.utilisateur.nom}"
     
     def marquer_comme_lu(self):
-        """Marque la notification comme lue"""
+        """Marque la notification comme lue (et décrémente le compteur si elle ne l'était pas)"""
+        if Notification.objects.filter(pk=self.pk, lu=False).update(lu=True):
+            CompteurNotifications.ajuster([self.utilisateur_id], -1)
         self.lu = True
-        self.save(update_fields=['lu'])
+
+
+class CompteurNotifications(models.Model):
+    """Nombre de notifications non lues d'un utilisateur, tenu à jour à chaque changement (pas de COUNT)"""
+    utilisateur = models.OneToOneField(Utilisateur, on_delete=models.CASCADE, primary_key=True, related_name='compteur_notifications')
+    non_lues = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Compteur de notifications"
+        verbose_name_plural = "Compteurs de notifications"
+    
+    def __str__(self):
+        return f"{self.utilisateur_id} : {self.non_lues} non lue(s)"
+    
+    @staticmethod
+    def ajuster(utilisateur_ids, delta):
+        """Delta sur les compteurs des utilisateurs (créés à la volée) : 2 requêtes quel que soit leur nombre"""
+        utilisateur_ids = list(utilisateur_ids)
+        if not utilisateur_ids or not delta:
+            return
+        if delta > 0:
+            CompteurNotifications.objects.bulk_create(
+                [CompteurNotifications(utilisateur_id=utilisateur_id) for utilisateur_id in utilisateur_ids],
+                ignore_conflicts=True,
+            )
+        CompteurNotifications.objects.filter(utilisateur_id__in=utilisateur_ids).update(
+            non_lues=Greatest(F('non_lues') + delta, 0)
+        )
+        # Les onglets connectés relisent leur compteur (flux SSE, voir forum/views.py)
+        publier_apres_commit(
+            [CompteurNotifications.canal(utilisateur_id) for utilisateur_id in utilisateur_ids],
+            {'type': 'compteur'},
+        )
+    
+    @staticmethod
+    def ajuster_lot(deltas):
+        """{utilisateur_id: delta} → compteurs ajustés en 2 requêtes, même si les deltas diffèrent"""
+        deltas = {utilisateur_id: delta for utilisateur_id, delta in deltas.items() if delta}
+        if len(set(deltas.values())) <= 1:
+            for delta in set(deltas.values()):
+                CompteurNotifications.ajuster(deltas, delta)
+            return
+        positifs = [utilisateur_id for utilisateur_id, delta in deltas.items() if delta > 0]
+        CompteurNotifications.objects.bulk_create(
+            [CompteurNotifications(utilisateur_id=utilisateur_id) for utilisateur_id in positifs],
+            ignore_conflicts=True,
+        )
+        variation = models.Case(
+            *[models.When(utilisateur_id=utilisateur_id, then=models.Value(delta)) for utilisateur_id, delta in deltas.items()],
+            default=models.Value(0),
+        )
+        CompteurNotifications.objects.filter(utilisateur_id__in=deltas).update(
+            non_lues=Greatest(F('non_lues') + variation, 0)
+        )
+        publier_apres_commit(
+            [CompteurNotifications.canal(utilisateur_id) for utilisateur_id in deltas],
+            {'type': 'compteur'},
+        )
+
+    @staticmethod
+    def decompter(notifications):
+        """Retire des compteurs les non lues de `notifications` (avant leur suppression en cascade).
+
+        Un COUNT groupé par utilisateur, puis un UPDATE par valeur de delta : pas de
+        chargement ligne à ligne, la cascade garde la suppression rapide de Django.
+        """
+        par_delta = defaultdict(list)
+        for utilisateur_id, total in (
+            notifications.filter(lu=False).order_by()
+            .values('utilisateur_id').annotate(total=models.Count('id'))
+            .values_list('utilisateur_id', 'total')
+        ):
+            par_delta[total].append(utilisateur_id)
+        for total, utilisateur_ids in par_delta.items():
+            CompteurNotifications.ajuster(utilisateur_ids, -total)
+
+    @staticmethod
+    def canal(utilisateur_id):
+        """Canal du bus temps réel des notifications d'un utilisateur"""
+        return f'notifications:{utilisateur_id}'
+    
+    @staticmethod
+    def recalculer(utilisateur):
+        """Recompte les non lues (correction de dérive, appelé hors du chemin de lecture)"""
+        return CompteurNotifications.recalculer_lot([utilisateur.pk])[utilisateur.pk]
+
+    @staticmethod
+    def recalculer_lot(utilisateur_ids):
+        """Recompte les non lues d'un lot d'utilisateurs : 1 COUNT groupé, 1 INSERT, 1 UPDATE groupé"""
+        utilisateur_ids = list(utilisateur_ids)
+        if not utilisateur_ids:
+            return {}
+        totaux = dict.fromkeys(utilisateur_ids, 0)
+        totaux.update(
+            Notification.objects.filter(utilisateur_id__in=utilisateur_ids, lu=False)
+            .values('utilisateur_id').annotate(total=models.Count('id'))
+            .values_list('utilisateur_id', 'total')
+        )
+        compteurs = [
+            CompteurNotifications(utilisateur_id=utilisateur_id, non_lues=non_lues)
+            for utilisateur_id, non_lues in totaux.items()
+        ]
+        CompteurNotifications.objects.bulk_create(compteurs, ignore_conflicts=True)
+        CompteurNotifications.objects.bulk_update(compteurs, ['non_lues'])
+        publier_apres_commit(
+            [CompteurNotifications.canal(utilisateur_id) for utilisateur_id in utilisateur_ids],
+            {'type': 'compteur'},
+        )
+        return totaux
+
+
+class DocumentRecherche(models.Model):
+    """Texte indexé d'un post ou d'un commentaire actif (voir forum/search.py)"""
+    TYPES = [
+        ('post', 'Post'),
+        ('commentaire', 'Commentaire'),
+    ]
+    
+    cle = models.CharField(max_length=40, unique=True, help_text="type:id de l'objet indexé")
+    type_document = models.CharField(max_length=20, choices=TYPES)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    commentaire = models.ForeignKey(Commentaire, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    communaute = models.ForeignKey(Communaute, on_delete=models.CASCADE, related_name='+')
+    
+    # Termes normalisés (minuscules, sans accents, racinisés) : seule colonne indexée en plein texte
+    contenu_index = models.TextField()
+    date_creation = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = "Document de recherche"
+        verbose_name_plural = "Documents de recherche"
+        indexes = [
+            models.Index(fields=['communaute', '-date_creation', 'id']),
+            models.Index(fields=['-date_creation', 'id']),
+        ]
+    
+    def __str__(self):
+        return self.cle
@@ -0,0 +1,190 @@
+# forum/notifications.py
+# Notifications regroupées : un seul rouleau "X et 41 autres ont aimé votre post" par cible
+from collections import Counter
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from CODMTracker.pubsub import publier_apres_commit
+from .models import CompteurNotifications, Notification
+
+# Taille des lots de "Tout marquer comme lu" (verrous courts sur la table)
+TAILLE_LOT_LECTURE = 500
+
+# Types regroupés tant que la notification n'est pas lue, et la cible qui sert de clé
+TYPES_REGROUPES = {
+    'like_post': 'post',
+    'like_commentaire': 'commentaire',
+    'nouveau_commentaire': 'post',
+    'reponse_commentaire': 'parent',
+    'nouveau_post_communaute': 'communaute',
+}
+
+
+def cle_regroupement(type_notif, post=None, commentaire=None):
+    """Clé "type:cible:id" des notifications fusionnables, '' pour les autres types"""
+    cible = TYPES_REGROUPES.get(type_notif)
+    if cible == 'post' and post is not None:
+        return f'{type_notif}:post:{post.pk}'
+    if cible == 'commentaire' and commentaire is not None:
+        return f'{type_notif}:commentaire:{commentaire.pk}'
+    if cible == 'parent' and commentaire is not None and commentaire.parent_id:
+        return f'{type_notif}:commentaire:{commentaire.parent_id}'
+    if cible == 'communaute' and post is not None:
+        return f'{type_notif}:communaute:{post.communaute_id}'
+    return ''
+
+
+# Champs réécrits quand un événement est fusionné dans une notification non lue existante
+CHAMPS_FUSION = ['nombre', 'dernier_acteur', 'titre', 'message', 'lien', 'post', 'commentaire', 'date_creation']
+
+
+def notifier(utilisateur_ids, type_notif, titre, message, lien=None, post=None, commentaire=None, acteur=None):
+    """Notifie un ou plusieurs utilisateurs ; retourne les ids qui ont reçu une nouvelle notification non lue.
+
+    Pour les types regroupés, une notification non lue existante sur la même cible
+    est mise à jour (compteur +1, dernier acteur, date) au lieu d'ajouter une ligne.
+    """
+    return notifier_lot([
+        {
+            'utilisateur_id': utilisateur_id, 'type_notif': type_notif, 'titre': titre, 'message': message,
+            'lien': lien, 'post': post, 'commentaire': commentaire, 'acteur': acteur,
+        }
+        for utilisateur_id in dict.fromkeys(utilisateur_ids)
+    ])
+
+
+def notifier_lot(evenements):
+    """Notifie un lot d'événements aux cibles et destinataires différents ; retourne les ids notifiés.
+
+    Chaque événement est un dict des arguments de `notifier` avec `utilisateur_id`.
+    Quel que soit leur nombre : 1 SELECT des non lues regroupables, 1 UPDATE des
+    notifications fusionnées, 1 INSERT des nouvelles, 2 requêtes pour les compteurs.
+    """
+    maintenant = timezone.now()
+    # (destinataire, clé) → ligne à écrire ; les types non regroupés ont une ligne par événement
+    lignes = {}
+    for rang, evenement in enumerate(evenements):
+        post, commentaire = evenement.get('post'), evenement.get('commentaire')
+        cle = cle_regroupement(evenement['type_notif'], post, commentaire)
+        ligne = Notification(
+            utilisateur_id=evenement['utilisateur_id'],
+            type_notification=evenement['type_notif'],
+            titre=evenement['titre'],
+            message=evenement['message'],
+            lien=evenement.get('lien'),
+            post=post,
+            commentaire=commentaire,
+            dernier_acteur=evenement.get('acteur'),
+            cle_regroupement=cle,
+            date_creation=maintenant,
+        )
+        position = (ligne.utilisateur_id, cle) if cle else rang
+        if position in lignes:
+            # Même cible deux fois dans le lot : un seul rouleau
+            ligne.nombre = lignes[position].nombre + 1
+        lignes[position] = ligne
+    if not lignes:
+        return []
+
+    with transaction.atomic():
+        regroupables = [ligne for ligne in lignes.values() if ligne.cle_regroupement]
+        existantes = {}
+        if regroupables:
+            existantes = {
+                (utilisateur_id, cle): notification_id
+                for notification_id, utilisateur_id, cle in Notification.objects.filter(
+                    utilisateur_id__in={ligne.utilisateur_id for ligne in regroupables},
+                    cle_regroupement__in={ligne.cle_regroupement for ligne in regroupables},
+                    lu=False,
+                ).values_list('id', 'utilisateur_id', 'cle_regroupement')
+            }
+        _fusionner([
+            (existantes[position], lignes.pop(position))
+            for position in list(lignes) if position in existantes
+        ])
+        inserees = _inserer(list(lignes.values()))
+        # Seules les lignes réellement insérées changent le nombre de non lues
+        deltas = Counter(ligne.utilisateur_id for ligne in inserees)
+        CompteurNotifications.ajuster_lot(deltas)
+        # Aperçu poussé aux onglets connectés, y compris pour les notifications regroupées
+        for evenement in evenements:
+            publier_apres_commit(
+                [CompteurNotifications.canal(evenement['utilisateur_id'])],
+                {'type': 'notification', 'donnees': {
+                    'type': evenement['type_notif'], 'titre': evenement['titre'],
+                    'message': evenement['message'], 'lien': evenement.get('lien'),
+                }},
+            )
+    return list(deltas)
+
+
+def _fusionner(fusions):
+    """[(id de la notification non lue existante, ligne de l'événement)] → un UPDATE groupé"""
+    if not fusions:
+        return
+    Notification.objects.bulk_update([
+        Notification(
+            pk=notification_id,
+            nombre=F('nombre') + ligne.nombre,
+            dernier_acteur_id=ligne.dernier_acteur_id,
+            titre=ligne.titre,
+            message=ligne.message,
+            lien=ligne.lien,
+            # Cible la plus récente : la notification suit le post qu'elle décrit (suppression en cascade)
+            post_id=ligne.post_id,
+            commentaire_id=ligne.commentaire_id,
+            date_creation=ligne.date_creation,
+        )
+        for notification_id, ligne in fusions
+    ], CHAMPS_FUSION)
+
+
+def _inserer(lignes):
+    """INSERT groupé ; retourne les lignes réellement insérées.
+
+    Si une requête concurrente a créé une notification non lue sur la même cible,
+    on repasse ligne par ligne : celles qui entrent en conflit sont fusionnées.
+    """
+    try:
+        with transaction.atomic():
+            return Notification.objects.bulk_create(lignes)
+    except IntegrityError:
+        pass
+    inserees = []
+    for ligne in lignes:
+        ligne.pk = None
+        try:
+            with transaction.atomic():
+                ligne.save(force_insert=True)
+            inserees.append(ligne)
+        except IntegrityError:
+            existante = Notification.objects.filter(
+                utilisateur_id=ligne.utilisateur_id, cle_regroupement=ligne.cle_regroupement, lu=False
+            ).values_list('id', flat=True).first()
+            if existante:
+                _fusionner([(existante, ligne)])
+    return inserees
+
+
+def non_lues(request):
+    """Nombre de non lues de l'utilisateur connecté (une lecture par clé primaire, mémorisée sur la requête)"""
+    if not request.user.is_authenticated:
+        return 0
+    if not hasattr(request, '_notifications_non_lues'):
+        request._notifications_non_lues = CompteurNotifications.objects.filter(
+            utilisateur=request.user
+        ).values_list('non_lues', flat=True).first() or 0
+    return request._notifications_non_lues
+
+
+def tout_marquer_lu(utilisateur, taille_lot=TAILLE_LOT_LECTURE):
+    """Marque toutes les notifications comme lues par lots bornés (index partiel des non lues)"""
+    total = 0
+    restantes = Notification.objects.filter(utilisateur=utilisateur, lu=False)
+    while True:
+        ids = list(restantes.order_by('id').values_list('id', flat=True)[:taille_lot])
+        if not ids:
+            break
+        total += Notification.objects.filter(id__in=ids, lu=False).update(lu=True)
+    CompteurNotifications.ajuster([utilisateur.pk], -total)
+    return total
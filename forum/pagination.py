@@ -0,0 +1,87 @@
+# forum/pagination.py
+# Pagination par curseur (keyset) : pas de COUNT(*), pas d'OFFSET
+import base64
+import json
+from django.db.models import Q
+
+
+class KeysetPage:
+    """Une page de résultats et le curseur opaque de la page suivante"""
+
+    def __init__(self, object_list, curseur_suivant):
+        self.object_list = object_list
+        self.curseur_suivant = curseur_suivant
+
+    @property
+    def has_next(self):
+        return self.curseur_suivant is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+class KeysetPaginator:
+    """Paginateur keyset sur un tri explicite, par exemple ('-date_creation', 'id').
+
+    Le dernier champ doit être unique (id) pour que le curseur soit sans ambiguïté.
+    La condition "après le curseur" est une comparaison lexicographique qui suit
+    l'index du tri : chaque page coûte le même prix, quelle que soit sa profondeur.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.champs = [champ.lstrip('-') for champ in self.ordering]
+
+    def _encoder(self, obj):
+        valeurs = []
+        for nom in self.champs:
+            valeur = getattr(obj, nom)
+            valeurs.append(valeur.isoformat() if hasattr(valeur, 'isoformat') else valeur)
+        brut = json.dumps(valeurs, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(brut).decode('ascii').rstrip('=')
+
+    def _decoder(self, curseur):
+        """Retourne les valeurs du curseur, ou None s'il est invalide (→ première page)"""
+        try:
+            brut = base64.urlsafe_b64decode(curseur + '=' * (-len(curseur) % 4))
+            valeurs = json.loads(brut)
+            if len(valeurs) != len(self.champs):
+                return None
+            modele = self.queryset.model
+            return [modele._meta.get_field(nom).to_python(v) for nom, v in zip(self.champs, valeurs)]
+        except Exception:
+            return None
+
+    def _filtre_apres(self, valeurs):
+        """(a, b, c) après (va, vb, vc) : a>va OU (a=va ET b>vb) OU (a=va ET b=vb ET c>vc)"""
+        condition = Q()
+        egalites = {}
+        for champ, nom, valeur in zip(self.ordering, self.champs, valeurs):
+            operateur = 'lt' if champ.startswith('-') else 'gt'
+            condition |= Q(**egalites, **{f'{nom}__{operateur}': valeur})
+            egalites[nom] = valeur
+        return condition
+
+    def filtre_curseur(self, curseur=None):
+        """Condition "après le curseur" (vide si le curseur est absent ou invalide)"""
+        valeurs = self._decoder(curseur) if curseur else None
+        return self._filtre_apres(valeurs) if valeurs is not None else Q()
+
+    def page(self, curseur=None):
+        queryset = self.queryset.order_by(*self.ordering).filter(self.filtre_curseur(curseur))
+
+        # Un élément de plus pour savoir s'il existe une page suivante
+        objets = list(queryset[:self.per_page + 1])
+        curseur_suivant = None
+        if len(objets) > self.per_page:
+            objets = objets[:self.per_page]
+            curseur_suivant = self._encoder(objets[-1])
+        return KeysetPage(objets, curseur_suivant)
@@ -0,0 +1,65 @@
+# forum/ranking.py
+# Classement des posts : "hot" (popularité amortie par l'âge), "new" et "top"
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.utils import timezone
+
+# Origine des scores : seul l'écart entre deux dates compte
+EPOQUE = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+# Secondes pour qu'un post gagne un "ordre de grandeur" de popularité (12h30)
+DEMI_VIE = 45000
+
+# Un commentaire pèse plus qu'un like dans l'engagement
+POIDS_COMMENTAIRE = 2
+
+TRIS = ('hot', 'new', 'top')
+PERIODES_TOP = {
+    'jour': timedelta(days=1),
+    'semaine': timedelta(weeks=1),
+    'tout': None,
+}
+
+# Tris keyset par mode (le dernier champ départage les égalités)
+ORDRES = {
+    'hot': ('-est_epingle', '-score_hot', 'id'),
+    'new': ('-est_epingle', '-date_creation', 'id'),
+    'top': ('-nombre_likes', 'id'),
+}
+
+
+def score_hot(nombre_likes, nombre_commentaires, date_creation=None):
+    """Score "hot" à la Reddit : log de l'engagement + bonus linéaire à la fraîcheur.
+
+    Le bonus de fraîcheur est fixé à la création : les scores stockés restent
+    comparables dans le temps, seul un nouvel événement (like, commentaire)
+    impose de recalculer le score d'un post.
+    """
+    engagement = nombre_likes + POIDS_COMMENTAIRE * nombre_commentaires
+    date_creation = date_creation or timezone.now()
+    age = (date_creation - EPOQUE).total_seconds()
+    return round(math.log10(max(engagement, 1)) + age / DEMI_VIE, 7)
+
+
+def lire_tri(request, defaut='new'):
+    """Tri et période demandés (valeurs inconnues → défauts)"""
+    tri = request.GET.get('tri', defaut)
+    if tri not in TRIS:
+        tri = defaut
+    periode = request.GET.get('periode', 'semaine')
+    if periode not in PERIODES_TOP:
+        periode = 'semaine'
+    return tri, periode
+
+
+def appliquer_tri(posts, tri, periode='semaine', epingles_en_tete=True):
+    """Restreint le queryset selon la période (top) et retourne (queryset, ordre keyset)"""
+    if tri == 'top':
+        duree = PERIODES_TOP[periode]
+        if duree is not None:
+            posts = posts.filter(date_creation__gte=timezone.now() - duree)
+    ordre = ORDRES[tri]
+    if not epingles_en_tete:
+        # L'épinglage n'a de sens qu'au sein d'une communauté
+        ordre = tuple(champ for champ in ordre if champ != '-est_epingle')
+    return posts, ordre
@@ -0,0 +1,199 @@
+# forum/search.py
+# Recherche plein texte dans les posts et commentaires du forum
+import re
+import unicodedata
+from django.db import connection, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from CODMTracker.taches import Regroupeur
+from .models import Commentaire, DocumentRecherche, Post
+from .pagination import KeysetPaginator
+
+ORDRE_RESULTATS = ('-date_creation', 'id')
+
+# Table FTS5 (SQLite) synchronisée par triggers sur forum_documentrecherche (migration 0006)
+TABLE_FTS = 'forum_recherche_fts'
+
+MOTS_VIDES = {
+    'le', 'la', 'les', 'un', 'une', 'des', 'du', 'de', 'd', 'l', 'et', 'ou', 'a', 'au', 'aux',
+    'en', 'pour', 'par', 'sur', 'avec', 'dans', 'ce', 'ces', 'cet', 'cette', 'est', 'sont',
+    'je', 'tu', 'il', 'elle', 'on', 'nous', 'vous', 'ils', 'elles', 'qui', 'que', 'quoi',
+    'ne', 'pas', 'plus', 'se', 'sa', 'son', 'ses', 'mon', 'ma', 'mes', 'ton', 'ta', 'tes',
+}
+
+# Suffixes retirés du plus long au plus court (racinisation légère du français)
+SUFFIXES = (
+    'issements', 'issement', 'ements', 'ement', 'ations', 'ation', 'atrices', 'atrice',
+    'ateurs', 'ateur', 'euses', 'euse', 'eurs', 'eur', 'ables', 'able', 'istes', 'iste',
+    'ives', 'ive', 'ifs', 'if', 'ees', 'ee', 'es', 'er', 'ez', 'e', 's', 'x',
+)
+LONGUEUR_RACINE_MIN = 3
+
+RE_MOT = re.compile(r'\w+')
+
+
+def sans_accents(texte):
+    return ''.join(
+        c for c in unicodedata.normalize('NFKD', texte)
+        if not unicodedata.combining(c)
+    )
+
+
+def racine(mot):
+    """Racine d'un mot déjà en minuscules et sans accents ("classes" → "class")"""
+    for suffixe in SUFFIXES:
+        if mot.endswith(suffixe) and len(mot) - len(suffixe) >= LONGUEUR_RACINE_MIN:
+            return mot[:-len(suffixe)]
+    return mot
+
+
+def termes(texte):
+    """Termes indexables d'un texte : minuscules, sans accents ni mots vides, racinisés"""
+    resultat = []
+    for mot in RE_MOT.findall(sans_accents(texte or '').lower()):
+        if mot not in MOTS_VIDES:
+            resultat.append(racine(mot))
+    return resultat
+
+
+# ---------------------------------------------------------------------------
+# Indexation incrémentale (par lots, hors du chemin d'écriture)
+# ---------------------------------------------------------------------------
+
+def _document(cle, post, texte, date_creation, commentaire=None):
+    return DocumentRecherche(
+        cle=cle,
+        type_document='commentaire' if commentaire else 'post',
+        post=post,
+        commentaire=commentaire,
+        communaute_id=post.communaute_id,
+        contenu_index=' '.join(termes(texte)),
+        date_creation=date_creation,
+    )
+
+
+def indexer(cles):
+    """(Ré)indexe un lot de clés ('post', id) / ('commentaire', id) en 3 requêtes.
+
+    Les objets inactifs ou supprimés sortent de l'index.
+    """
+    post_ids = [objet_id for type_document, objet_id in cles if type_document == 'post']
+    commentaire_ids = [objet_id for type_document, objet_id in cles if type_document == 'commentaire']
+
+    documents = []
+    for post in Post.objects.filter(id__in=post_ids, est_actif=True):
+        documents.append(_document(f'post:{post.id}', post, f'{post.titre} {post.contenu}', post.date_creation))
+    commentaires = Commentaire.objects.filter(
+        id__in=commentaire_ids,
+        est_actif=True,
+        post__est_actif=True
+    ).select_related('post')
+    for commentaire in commentaires:
+        documents.append(_document(
+            f'commentaire:{commentaire.id}', commentaire.post, commentaire.contenu,
+            commentaire.date_creation, commentaire
+        ))
+
+    indexees = {document.cle for document in documents}
+    a_retirer = [f'{type_document}:{objet_id}' for type_document, objet_id in cles]
+    DocumentRecherche.objects.filter(cle__in=[cle for cle in a_retirer if cle not in indexees]).delete()
+    if documents:
+        DocumentRecherche.objects.bulk_create(
+            documents,
+            update_conflicts=True,
+            unique_fields=['cle'],
+            update_fields=['contenu_index', 'communaute', 'date_creation'],
+        )
+    return len(documents)
+
+
+# Une rafale de commentaires ne coûte qu'une indexation, quelques secondes plus tard
+file_indexation = Regroupeur(indexer, delai=2.0, taille_max=200)
+
+
+# ---------------------------------------------------------------------------
+# Recherche
+# ---------------------------------------------------------------------------
+
+def _filtre_plein_texte(racines, alias):
+    """Condition "contient tous les termes (en préfixe)" selon le moteur de la base"""
+    vendor = connections[alias].vendor
+    if vendor == 'sqlite':
+        expression = ' AND '.join(f'"{terme}"*' for terme in racines)
+        sql = f"SELECT rowid FROM {TABLE_FTS} WHERE {TABLE_FTS} MATCH %s"
+        return Q(id__in=RawSQL(sql, [expression]))
+    if vendor == 'postgresql':
+        # Même expression que l'index GIN de la migration 0006
+        expression = ' & '.join(f'{terme}:*' for terme in racines)
+        return Q(id__in=RawSQL(
+            f"SELECT id FROM {DocumentRecherche._meta.db_table} "
+            "WHERE to_tsvector('simple', contenu_index) @@ to_tsquery('simple', %s)",
+            [expression]
+        ))
+    condition = Q()
+    for terme in racines:
+        condition &= Q(contenu_index__contains=terme)
+    return condition
+
+
+def extrait(texte, racines, longueur=200):
+    """Extrait HTML du texte centré sur la première occurrence, termes trouvés en <mark>"""
+    texte = texte or ''
+    mots = list(RE_MOT.finditer(texte))
+    trouves = [
+        mot for mot in mots
+        if any(racine(sans_accents(mot.group()).lower()).startswith(terme) for terme in racines)
+    ]
+    debut = 0
+    if trouves and trouves[0].start() > longueur // 3:
+        debut = texte.rfind(' ', 0, trouves[0].start() - longueur // 3) + 1
+    fin = min(len(texte), debut + longueur)
+
+    morceaux = ['… ' if debut else '']
+    position = debut
+    for mot in trouves:
+        if mot.start() < debut:
+            continue
+        if mot.end() > fin:
+            break
+        morceaux.append(escape(texte[position:mot.start()]))
+        morceaux.append(f'<mark>{escape(mot.group())}</mark>')
+        position = mot.end()
+    morceaux.append(escape(texte[position:fin]))
+    if fin < len(texte):
+        morceaux.append(' …')
+    return mark_safe(''.join(morceaux))
+
+
+def rechercher(requete, communaute=None, curseur=None, par_page=20):
+    """Documents contenant tous les termes de la requête, du plus récent au plus ancien.
+
+    Retourne (page, racines) ; chaque document de la page reçoit `titre_extrait`
+    et `contenu_extrait` (HTML surligné).
+    """
+    racines = list(dict.fromkeys(termes(requete)))
+    documents = DocumentRecherche.objects.select_related(
+        'post', 'post__auteur', 'commentaire', 'commentaire__auteur', 'communaute'
+    )
+    if not racines:
+        return KeysetPaginator(documents.none(), ORDRE_RESULTATS, par_page).page(), racines
+
+    if communaute is not None:
+        documents = documents.filter(communaute=communaute)
+    documents = documents.filter(_filtre_plein_texte(racines, documents.db))
+
+    page = KeysetPaginator(documents, ORDRE_RESULTATS, par_page).page(curseur)
+    for document in page:
+        document.titre_extrait = extrait(document.post.titre, racines, longueur=250)
+        source = document.commentaire or document.post
+        document.contenu_extrait = extrait(source.contenu, racines)
+    return page, racines
+
+
+def reconstruire_index_sqlite():
+    """Reconstruit la table FTS5 depuis forum_documentrecherche (SQLite uniquement)"""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {TABLE_FTS}({TABLE_FTS}) VALUES ('rebuild')")
@@ -0,0 +1,68 @@
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from CODMTracker.cache import invalider_cache
+from utilisateurs.models import Utilisateur
+from .models import Communaute, Post, Commentaire, Notification, CompteurNotifications
+from .search import file_indexation
+
+# Champs compteurs mis à jour à chaque like/commentaire : ils ne changent pas les pages en cache
+CHAMPS_COMPTEURS = {'nombre_likes', 'nombre_commentaires', 'score_hot', 'nombre_posts', 'nombre_membres'}
+
+
+@receiver([post_save, post_delete], sender=Communaute)
+@receiver([post_save, post_delete], sender=Post)
+def invalider_cache_forum(sender, update_fields=None, **kwargs):
+    """Post créé / modifié / supprimé → les pages publiques du forum sont recalculées"""
+    if update_fields and set(update_fields) <= CHAMPS_COMPTEURS:
+        return
+    invalider_cache('forum')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Commentaire)
+def indexer_recherche(sender, instance, created=False, update_fields=None, **kwargs):
+    """Texte ou statut modifié → réindexation groupée, après le commit"""
+    if update_fields and set(update_fields) <= CHAMPS_COMPTEURS | {'chemin', 'profondeur'}:
+        return
+    type_document = 'post' if sender is Post else 'commentaire'
+    file_indexation.ajouter((type_document, instance.pk))
+    if sender is Post and not created:
+        # Titre, statut ou communauté du post : ses commentaires suivent
+        file_indexation.ajouter(*(
+            ('commentaire', commentaire_id)
+            for commentaire_id in instance.commentaires.values_list('id', flat=True)
+        ))
+
+
+@receiver(post_delete, sender=Post)
+def decompter_post_supprime(sender, instance, **kwargs):
+    """Aussi appelé pour les suppressions en cascade (utilisateur supprimé...)"""
+    if instance.est_actif:
+        Communaute.ajuster_compteurs(instance.communaute_id, posts=-1)
+
+
+# Pas de receiver sur Notification : il obligerait Django à charger chaque ligne de la
+# cascade. Les non lues qui vont disparaître sont décomptées par lot depuis leur cible.
+
+@receiver(pre_delete, sender=Post)
+def decompter_notifications_post(sender, instance, **kwargs):
+    """Notifications du post et de ses commentaires (aussi en cascade d'un utilisateur)"""
+    CompteurNotifications.decompter(
+        Notification.objects.filter(Q(post=instance) | Q(commentaire__post=instance))
+    )
+
+
+@receiver(pre_delete, sender=Utilisateur)
+def decompter_notifications_utilisateur(sender, instance, **kwargs):
+    """Notifications sur ses commentaires dans les posts des autres (ses posts : receiver ci-dessus).
+
+    Les réponses des autres sous ses commentaires partent aussi en cascade : cet
+    écart reste à recalculer_compteurs_notifications.
+    """
+    CompteurNotifications.decompter(
+        Notification.objects.filter(commentaire__auteur=instance)
+        .exclude(utilisateur=instance)
+        .exclude(post__auteur=instance)
+        .exclude(commentaire__post__auteur=instance)
+    )
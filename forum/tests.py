@@ -1,3 +1,165 @@
-from django.test import TestCase
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from utilisateurs.models import Utilisateur
+from .likes import appliquer_likes
+from .models import Commentaire, Communaute, CompteurNotifications, Notification, Post
+from .notifications import non_lues, notifier, tout_marquer_lu
 
-# Create your tests here.
+
+class NotificationsTests(TestCase):
+    """Page des notifications et compteur de non lues maintenu (forum/notifications.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.utilisateur = Utilisateur.objects.create_user('joueur@test.fr', 'mdp-test-123', nom='Joueur', prenom='Test')
+        cls.auteur = Utilisateur.objects.create_user('auteur@test.fr', 'mdp-test-123', nom='Auteur', prenom='Test')
+        cls.communaute = Communaute.objects.create(nom='Tests', slug='tests', description='Communauté de test')
+
+    def creer_notifications(self, nombre):
+        for i in range(nombre):
+            post = Post.objects.create(communaute=self.communaute, auteur=self.auteur, titre=f'Post {i}', contenu='...')
+            notifier([self.utilisateur.pk], 'like_post', 'Like', f'Like {i}', post=post, acteur=self.auteur)
+
+    def nombre_requetes_page(self):
+        self.client.force_login(self.utilisateur)
+        with CaptureQueriesContext(connection) as requetes:
+            response = self.client.get(reverse('forum:notifications'))
+        self.assertEqual(response.status_code, 200)
+        return len(requetes)
+
+    def test_page_nombre_de_requetes_constant(self):
+        """Le nombre de requêtes de la page ne dépend pas du nombre de notifications (select_related, compteur)"""
+        self.creer_notifications(2)
+        avec_deux = self.nombre_requetes_page()
+        self.creer_notifications(8)
+        self.assertEqual(self.nombre_requetes_page(), avec_deux)
+
+    def test_non_lues_lues_sans_count(self):
+        """Le compteur du menu est une lecture par clé primaire, pas un COUNT"""
+        self.creer_notifications(3)
+        self.client.force_login(self.utilisateur)
+        request = self.client.get(reverse('forum:notifications')).wsgi_request
+        del request._notifications_non_lues
+        with self.assertNumQueries(1):
+            self.assertEqual(non_lues(request), 3)
+        with self.assertNumQueries(0):
+            non_lues(request)
+
+    def test_notifier_nombre_de_requetes_independant_des_destinataires(self):
+        post = Post.objects.create(communaute=self.communaute, auteur=self.auteur, titre='Annonce', contenu='...')
+        destinataires = [
+            Utilisateur.objects.create_user(f'membre{i}@test.fr', 'mdp-test-123', nom='Membre', prenom=str(i)).pk
+            for i in range(10)
+        ]
+        with CaptureQueriesContext(connection) as requetes:
+            notifier(destinataires[:2], 'nouveau_post_communaute', 'Nouveau post', 'Annonce', post=post)
+        with self.assertNumQueries(len(requetes)):
+            notifier(destinataires[2:], 'nouveau_post_communaute', 'Nouveau post', 'Annonce', post=post)
+
+    def test_regroupement_suit_le_dernier_post(self):
+        premier = Post.objects.create(communaute=self.communaute, auteur=self.auteur, titre='Premier', contenu='...')
+        second = Post.objects.create(communaute=self.communaute, auteur=self.auteur, titre='Second', contenu='...')
+        notifier([self.utilisateur.pk], 'nouveau_post_communaute', 'Nouveau post', 'Premier', post=premier)
+        nouveaux = notifier([self.utilisateur.pk], 'nouveau_post_communaute', 'Nouveau post', 'Second', post=second)
+        self.assertEqual(nouveaux, [])
+        notification = Notification.objects.get(utilisateur=self.utilisateur)
+        self.assertEqual((notification.nombre, notification.post_id), (2, second.pk))
+        self.assertEqual(CompteurNotifications.objects.get(utilisateur=self.utilisateur).non_lues, 1)
+
+    def test_tout_marquer_lu_par_lots(self):
+        self.creer_notifications(5)
+        self.assertEqual(tout_marquer_lu(self.utilisateur, taille_lot=2), 5)
+        self.assertFalse(Notification.objects.filter(utilisateur=self.utilisateur, lu=False).exists())
+        self.assertEqual(CompteurNotifications.objects.get(utilisateur=self.utilisateur).non_lues, 0)
+
+    def test_recalculer_corrige_la_derive(self):
+        self.creer_notifications(3)
+        CompteurNotifications.objects.filter(utilisateur=self.utilisateur).update(non_lues=42)
+        self.assertEqual(CompteurNotifications.recalculer(self.utilisateur), 3)
+        self.assertEqual(CompteurNotifications.objects.get(utilisateur=self.utilisateur).non_lues, 3)
+
+    def test_actions_admin_tiennent_le_compteur_a_jour(self):
+        """Les actions et l'édition en liste de l'admin passent par le compteur"""
+        self.creer_notifications(3)
+        admin_notifications = site._registry[Notification]
+        request = RequestFactory().post('/')
+        request.user = self.auteur
+        request._messages = []
+        admin_notifications.message_user = lambda *args, **kwargs: None
+        compteur = lambda: CompteurNotifications.objects.get(utilisateur=self.utilisateur).non_lues
+
+        admin_notifications.marquer_comme_lu(request, Notification.objects.filter(utilisateur=self.utilisateur))
+        self.assertEqual(compteur(), 0)
+        admin_notifications.marquer_comme_non_lu(request, Notification.objects.filter(utilisateur=self.utilisateur))
+        self.assertEqual(compteur(), 3)
+
+        notification = Notification.objects.filter(utilisateur=self.utilisateur).first()
+        notification.lu = True
+        formulaire = type('Formulaire', (), {'changed_data': ['lu']})()
+        admin_notifications.save_model(request, notification, formulaire, change=True)
+        self.assertEqual(compteur(), 2)
+
+    def test_suppression_post_decompte_par_lot(self):
+        """Supprimer un post décompte ses non lues sans charger chaque notification"""
+        membres = [
+            Utilisateur.objects.create_user(f'membre{i}@test.fr', 'mdp-test-123', nom='Membre', prenom=str(i)).pk
+            for i in range(10)
+        ]
+        requetes = []
+        for destinataires in (membres[:2], membres):
+            post = Post.objects.create(communaute=self.communaute, auteur=self.auteur, titre='Annonce', contenu='...')
+            notifier(destinataires, 'like_post', 'Like', 'Like', post=post, acteur=self.auteur)
+            with CaptureQueriesContext(connection) as capture:
+                post.delete()
+            requetes.append(len(capture))
+        self.assertEqual(requetes[0], requetes[1])
+        self.assertEqual(set(CompteurNotifications.objects.filter(utilisateur_id__in=membres).values_list('non_lues', flat=True)), {0})
+
+    def test_suppression_utilisateur_decompte_ses_commentaires(self):
+        """Commentaire d'un utilisateur supprimé sur le post d'un autre : la notification sort du compteur"""
+        commentateur = Utilisateur.objects.create_user('commentateur@test.fr', 'mdp-test-123', nom='Com', prenom='Test')
+        post = Post.objects.create(communaute=self.communaute, auteur=self.utilisateur, titre='Mon post', contenu='...')
+        commentaire = Commentaire.objects.create(post=post, auteur=commentateur, contenu='Bravo')
+        notifier([self.utilisateur.pk], 'like_commentaire', 'Like', 'Like', post=post, commentaire=commentaire)
+        notifier([self.utilisateur.pk], 'like_post', 'Like', 'Like', post=post, acteur=commentateur)
+        commentateur.delete()
+        self.assertEqual(CompteurNotifications.objects.get(utilisateur=self.utilisateur).non_lues, 1)
+
+
+class LikesTests(TestCase):
+    """Likes par lots et leurs notifications (forum/likes.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lecteur = Utilisateur.objects.create_user('lecteur@test.fr', 'mdp-test-123', nom='Lecteur', prenom='Test')
+        cls.auteurs = [
+            Utilisateur.objects.create_user(f'auteur{i}@test.fr', 'mdp-test-123', nom='Auteur', prenom=str(i))
+            for i in range(5)
+        ]
+        cls.communaute = Communaute.objects.create(nom='Tests', slug='tests', description='Communauté de test')
+        cls.posts = [
+            Post.objects.create(communaute=cls.communaute, auteur=cls.auteurs[i % 5], titre=f'Post {i}', contenu='...')
+            for i in range(21)
+        ]
+
+    def test_nombre_de_requetes_independant_du_lot(self):
+        """Liker 1 ou 19 posts coûte le même nombre de requêtes, notifications comprises"""
+        with CaptureQueriesContext(connection) as un_like:
+            appliquer_likes(self.lecteur, {'post': {self.posts[0].pk: True}, 'commentaire': {}})
+        with self.assertNumQueries(len(un_like)):
+            appliquer_likes(self.lecteur, {'post': {post.pk: True for post in self.posts[1:20]}, 'commentaire': {}})
+        # Une notification par post aimé ; deltas différents selon l'auteur (4 ou 3)
+        self.assertEqual(Notification.objects.filter(type_notification='like_post').count(), 20)
+        for auteur in self.auteurs:
+            attendu = Notification.objects.filter(utilisateur=auteur, lu=False).count()
+            self.assertEqual(CompteurNotifications.objects.get(utilisateur=auteur).non_lues, attendu)
+
+    def test_deuxieme_like_regroupe(self):
+        autre = Utilisateur.objects.create_user('autre@test.fr', 'mdp-test-123', nom='Autre', prenom='Test')
+        appliquer_likes(self.lecteur, {'post': {self.posts[0].pk: True}})
+        appliquer_likes(autre, {'post': {self.posts[0].pk: True}})
+        notification = Notification.objects.get(utilisateur=self.auteurs[0], post=self.posts[0])
+        self.assertEqual((notification.nombre, notification.dernier_acteur_id), (2, autre.pk))
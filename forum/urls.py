@@ -5,15 +5,27 @@ app_name = 'forum'
 
 urlpatterns = [
     path('', views.index_forum, name='index'),
+    path('tendances/', views.tendances, name='tendances'),
+    path('tendances/suite/', views.tendances_suite, name='tendances_suite'),
+    path('fil/', views.fil, name='fil'),
+    path('recherche/', views.recherche, name='recherche'),
+    path('recherche/suite/', views.recherche_suite, name='recherche_suite'),
+    path('fil/suite/', views.fil_suite, name='fil_suite'),
     path('communaute/<slug:slug>/', views.communaute_detail, name='communaute'),
     path('communaute/<slug:slug>/rejoindre/', views.rejoindre_communaute, name='rejoindre'),
     path('communaute/<slug:slug>/quitter/', views.quitter_communaute, name='quitter'),
+    path('communaute/<slug:slug>/posts/suite/', views.posts_suite, name='posts_suite'),
     path('communaute/<slug:slug>/creer-post/', views.creer_post, name='creer_post'),
     path('communaute/<slug:slug>/post/<slug:post_slug>/', views.post_detail, name='post_detail'),
+    path('communaute/<slug:slug>/post/<slug:post_slug>/commentaires/suite/', views.commentaires_suite, name='commentaires_suite'),
     path('post/<int:post_id>/like/', views.like_post, name='like_post'),
+    path('likes/', views.likes_lot, name='likes_lot'),
+    path('likes/etat/', views.likes_etat, name='likes_etat'),
     path('post/<int:post_id>/commenter/', views.commenter_post, name='commenter_post'),
     path('commentaire/<int:commentaire_id>/like/', views.like_commentaire, name='like_commentaire'),
     path('notifications/', views.notifications_view, name='notifications'),
+    path('notifications/suite/', views.notifications_suite, name='notifications_suite'),
+    path('notifications/flux/', views.flux_notifications, name='flux_notifications'),
     path('notifications/<int:notification_id>/marquer-lue/', views.marquer_notification_lue, name='marquer_notification_lue'),
     path('notifications/marquer-toutes-lues/', views.marquer_toutes_lues, name='marquer_toutes_lues'),
 ]
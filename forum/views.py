@@ -1,26 +1,47 @@
+import json
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.db.models import Count, Q
 from django.utils import timezone
 from django.utils.text import slugify
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+from django.template.loader import render_to_string
 from django.views.decorators.http import require_http_methods
 from django.urls import reverse
-from .models import Communaute, MembreCommunaute, Post, LikePost, Commentaire, LikeCommentaire, Notification
+from CODMTracker.cache import cache_anonyme
+from CODMTracker.limites import limiter, par_utilisateur
+from CODMTracker.sse import reponse_sse
+from CODMTracker.televersement import image_televersee
+from .models import Communaute, MembreCommunaute, Post, LikePost, Commentaire, Notification, CompteurNotifications
+from .pagination import KeysetPaginator
+from .comment_tree import charger_fil
+from .ranking import lire_tri, appliquer_tri
+from .feed import fil_utilisateur
+from .search import rechercher
+from .notifications import notifier, non_lues, tout_marquer_lu
+from .likes import CIBLES, appliquer_likes, etat_likes, lire_operations
 
+# Tris des fils paginés par curseur (le dernier champ départage les égalités)
+ORDRE_NOTIFICATIONS = ('-date_creation', 'id')
 
-def creer_notification(utilisateur, type_notif, titre, message, lien=None, post=None, commentaire=None):
-    """Fonction utilitaire pour créer une notification"""
-    Notification.objects.create(
-        utilisateur=utilisateur,
-        type_notification=type_notif,
-        titre=titre,
-        message=message,
+POSTS_PAR_PAGE = 10
+RESULTATS_PAR_PAGE = 20
+COMMENTAIRES_PAR_PAGE = 20
+NOTIFICATIONS_PAR_PAGE = 20
+
+
+def creer_notification(utilisateur, type_notif, titre, message, lien=None, post=None, commentaire=None, acteur=None):
+    """Fonction utilitaire pour créer une notification (regroupée avec la précédente si elle n'est pas lue)"""
+    notifier(
+        [utilisateur.pk],
+        type_notif,
+        titre,
+        message,
         lien=lien,
         post=post,
-        commentaire=commentaire
+        commentaire=commentaire,
+        acteur=acteur
     )
 
 
@@ -44,6 +65,7 @@ def creer_notification_match(utilisateur, gagne=True, details=None):
         )
 
 
+@cache_anonyme('forum')
 def index_forum(request):
     """Page d'accueil du forum - Liste des communautés"""
     communautes = Communaute.objects.filter(est_active=True).annotate(
@@ -68,27 +90,124 @@ def communaute_detail(request, slug):
             utilisateur=request.user
         ).exists()
     
-    # Récupérer les posts (épinglés en premier)
-    posts = Post.objects.filter(
-        communaute=communaute,
-        est_actif=True
-    ).select_related('auteur', 'communaute').annotate(
-        commentaires_count=Count('commentaires', filter=Q(commentaires__est_actif=True))
-    ).order_by('-est_epingle', '-date_creation')
-    
-    # Pagination
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    posts_page = paginator.get_page(page_number)
+    tri, periode = lire_tri(request)
     
     context = {
         'communaute': communaute,
-        'posts': posts_page,
+        'posts': page_posts(posts_communaute(communaute), request.GET.get('curseur'), tri, periode),
         'est_membre': est_membre,
+        'tri': tri,
+        'periode': periode,
     }
     return render(request, 'forum/communaute.html', context)
 
 
+def posts_communaute(communaute):
+    """Posts actifs d'une communauté"""
+    return Post.objects.filter(
+        communaute=communaute,
+        est_actif=True
+    ).select_related('auteur', 'communaute')
+
+
+def page_posts(posts, curseur=None, tri='new', periode='semaine', epingles_en_tete=True):
+    """Page de posts triés (hot/new/top), paginée par curseur sur l'index du tri"""
+    posts, ordre = appliquer_tri(posts, tri, periode, epingles_en_tete)
+    return KeysetPaginator(posts, ordre, POSTS_PAR_PAGE).page(curseur)
+
+
+def posts_suite(request, slug):
+    """Page suivante des posts d'une communauté (JSON, défilement infini)"""
+    communaute = get_object_or_404(Communaute, slug=slug, est_active=True)
+    tri, periode = lire_tri(request)
+    posts = page_posts(posts_communaute(communaute), request.GET.get('curseur'), tri, periode)
+    html = render_to_string('forum/partials/posts.html', {
+        'posts': posts,
+    }, request=request)
+    return JsonResponse({'html': html, 'curseur_suivant': posts.curseur_suivant})
+
+
+def posts_tendances():
+    """Posts actifs de toutes les communautés actives"""
+    return Post.objects.filter(
+        est_actif=True,
+        communaute__est_active=True
+    ).select_related('auteur', 'communaute')
+
+
+def tendances(request):
+    """Page d'accueil multi-communautés : posts triés par popularité"""
+    tri, periode = lire_tri(request, defaut='hot')
+    context = {
+        'posts': page_posts(posts_tendances(), request.GET.get('curseur'), tri, periode, epingles_en_tete=False),
+        'tri': tri,
+        'periode': periode,
+    }
+    return render(request, 'forum/tendances.html', context)
+
+
+def tendances_suite(request):
+    """Page suivante des tendances (JSON, défilement infini)"""
+    tri, periode = lire_tri(request, defaut='hot')
+    posts = page_posts(posts_tendances(), request.GET.get('curseur'), tri, periode, epingles_en_tete=False)
+    html = render_to_string('forum/partials/posts.html', {
+        'posts': posts,
+        'afficher_communaute': True,
+    }, request=request)
+    return JsonResponse({'html': html, 'curseur_suivant': posts.curseur_suivant})
+
+
+def resultats_recherche(request):
+    """Requête, communauté ciblée (facultative) et page de résultats correspondante"""
+    requete = request.GET.get('q', '').strip()
+    communaute = None
+    slug = request.GET.get('communaute')
+    if slug:
+        communaute = get_object_or_404(Communaute, slug=slug, est_active=True)
+    resultats, _ = rechercher(requete, communaute, request.GET.get('curseur'), RESULTATS_PAR_PAGE)
+    return requete, communaute, resultats
+
+
+def recherche(request):
+    """Recherche plein texte dans les posts et commentaires (toutes communautés ou une seule)"""
+    requete, communaute, resultats = resultats_recherche(request)
+    context = {
+        'requete': requete,
+        'communaute': communaute,
+        'resultats': resultats,
+    }
+    return render(request, 'forum/recherche.html', context)
+
+
+def recherche_suite(request):
+    """Page suivante des résultats de recherche (JSON, défilement infini)"""
+    _, _, resultats = resultats_recherche(request)
+    html = render_to_string('forum/partials/resultats.html', {
+        'resultats': resultats,
+    }, request=request)
+    return JsonResponse({'html': html, 'curseur_suivant': resultats.curseur_suivant})
+
+
+@login_required
+def fil(request):
+    """Fil personnalisé : posts récents de toutes les communautés rejointes"""
+    context = {
+        'posts': fil_utilisateur(request.user, request.GET.get('curseur'), POSTS_PAR_PAGE),
+    }
+    return render(request, 'forum/fil.html', context)
+
+
+@login_required
+def fil_suite(request):
+    """Page suivante du fil personnalisé (JSON, défilement infini)"""
+    posts = fil_utilisateur(request.user, request.GET.get('curseur'), POSTS_PAR_PAGE)
+    html = render_to_string('forum/partials/posts.html', {
+        'posts': posts,
+        'afficher_communaute': True,
+    }, request=request)
+    return JsonResponse({'html': html, 'curseur_suivant': posts.curseur_suivant})
+
+
 @login_required
 def rejoindre_communaute(request, slug):
     """Rejoindre une communauté"""
@@ -100,7 +219,7 @@ def rejoindre_communaute(request, slug):
     )
     
     if created:
-        communaute.update_stats()
+        Communaute.ajuster_compteurs(communaute.pk, membres=1)
         messages.success(request, f"Vous avez rejoint la communauté {communaute.nom} !")
     else:
         messages.info(request, f"Vous êtes déjà membre de {communaute.nom}.")
@@ -113,12 +232,13 @@ def quitter_communaute(request, slug):
     """Quitter une communauté"""
     communaute = get_object_or_404(Communaute, slug=slug)
     
-    MembreCommunaute.objects.filter(
+    supprimes, _ = MembreCommunaute.objects.filter(
         communaute=communaute,
         utilisateur=request.user
     ).delete()
     
-    communaute.update_stats()
+    if supprimes:
+        Communaute.ajuster_compteurs(communaute.pk, membres=-1)
     messages.success(request, f"Vous avez quitté la communauté {communaute.nom}.")
     
     return redirect('forum:communaute', slug=slug)
@@ -143,13 +263,17 @@ def creer_post(request, slug):
         titre = request.POST.get('titre', '').strip()
         contenu = request.POST.get('contenu', '').strip()
         type_post = request.POST.get('type_post', 'texte')
-        image = request.FILES.get('image')
+        image, erreur_image = image_televersee(request, 'image')
         lien_url = request.POST.get('lien_url', '').strip()
         
         if not titre or not contenu:
             messages.error(request, "Le titre et le contenu sont obligatoires.")
             return render(request, 'forum/creer_post.html', {'communaute': communaute})
         
+        if erreur_image:
+            messages.error(request, erreur_image)
+            return render(request, 'forum/creer_post.html', {'communaute': communaute})
+        
         post = Post.objects.create(
             communaute=communaute,
             auteur=request.user,
@@ -160,19 +284,19 @@ def creer_post(request, slug):
             lien_url=lien_url if lien_url else None
         )
         
-        # Notifier les membres de la communauté (sauf l'auteur)
+        # Notifier les membres de la communauté (sauf l'auteur), en une passe groupée
         membres = MembreCommunaute.objects.filter(communaute=communaute).exclude(utilisateur=request.user)
         lien_post = request.build_absolute_uri(reverse('forum:post_detail', args=[communaute.slug, post.slug]))
         
-        for membre in membres:
-            creer_notification(
-                utilisateur=membre.utilisateur,
-                type_notif='nouveau_post_communaute',
-                titre=f'Nouveau post dans {communaute.nom}',
-                message=f'{request.user.nom} {request.user.prenom} a créé un nouveau post: "{titre}"',
-                lien=lien_post,
-                post=post
-            )
+        notifier(
+            membres.values_list('utilisateur_id', flat=True),
+            'nouveau_post_communaute',
+            f'Nouveau post dans {communaute.nom}',
+            f'{request.user.nom} {request.user.prenom} a créé un nouveau post: "{titre}"',
+            lien=lien_post,
+            post=post,
+            acteur=request.user
+        )
         
         messages.success(request, "Post créé avec succès !")
         return redirect('forum:post_detail', slug=communaute.slug, post_slug=post.slug)
@@ -193,73 +317,39 @@ def post_detail(request, slug, post_slug):
     if request.user.is_authenticated:
         a_like = LikePost.objects.filter(post=post, utilisateur=request.user).exists()
     
-    # Récupérer les commentaires (sans réponses pour l'instant)
-    commentaires = Commentaire.objects.filter(
-        post=post,
-        est_actif=True,
-        parent__isnull=True  # Seulement les commentaires de premier niveau
-    ).select_related('auteur').prefetch_related('likes_commentaire__utilisateur').order_by('date_creation')
-    
-    # Vérifier quels commentaires sont likés par l'utilisateur
-    commentaires_likes = set()
-    if request.user.is_authenticated:
-        likes = LikeCommentaire.objects.filter(
-            commentaire__in=commentaires,
-            utilisateur=request.user
-        ).values_list('commentaire_id', flat=True)
-        commentaires_likes = set(likes)
-    
-    # Pagination des commentaires
-    paginator = Paginator(commentaires, 20)
-    page_number = request.GET.get('page')
-    commentaires_page = paginator.get_page(page_number)
+    commentaires, commentaires_likes = charger_fil(
+        post, request.user, request.GET.get('curseur'), COMMENTAIRES_PAR_PAGE
+    )
     
     context = {
         'communaute': communaute,
         'post': post,
-        'commentaires': commentaires_page,
+        'commentaires': commentaires,
         'a_like': a_like,
         'commentaires_likes': commentaires_likes,
     }
     return render(request, 'forum/post_detail.html', context)
 
 
+def commentaires_suite(request, slug, post_slug):
+    """Page suivante des commentaires d'un post (JSON, défilement infini)"""
+    post = get_object_or_404(Post, slug=post_slug, communaute__slug=slug, est_actif=True)
+    commentaires, commentaires_likes = charger_fil(
+        post, request.user, request.GET.get('curseur'), COMMENTAIRES_PAR_PAGE
+    )
+    html = render_to_string('forum/partials/commentaires.html', {
+        'commentaires': commentaires,
+        'commentaires_likes': commentaires_likes,
+    }, request=request)
+    return JsonResponse({'html': html, 'curseur_suivant': commentaires.curseur_suivant})
+
+
 @login_required
 @require_http_methods(["POST"])
+@limiter('api', cle=par_utilisateur, json=True)
 def like_post(request, post_id):
     """Like/Unlike un post (AJAX)"""
-    post = get_object_or_404(Post, id=post_id, est_actif=True)
-    
-    like, created = LikePost.objects.get_or_create(
-        post=post,
-        utilisateur=request.user
-    )
-    
-    if created:
-        action = 'liked'
-        # Notifier l'auteur du post (sauf si c'est lui qui a liké)
-        if post.auteur != request.user:
-            lien_post = request.build_absolute_uri(reverse('forum:post_detail', args=[post.communaute.slug, post.slug]))
-            creer_notification(
-                utilisateur=post.auteur,
-                type_notif='like_post',
-                titre='Quelqu\'un a aimé votre post',
-                message=f'{request.user.nom} {request.user.prenom} a aimé votre post "{post.titre}"',
-                lien=lien_post,
-                post=post
-            )
-    else:
-        like.delete()
-        action = 'unliked'
-    
-    # Recharger le post pour avoir le bon nombre de likes
-    post.refresh_from_db()
-    
-    return JsonResponse({
-        'success': True,
-        'action': action,
-        'likes_count': post.nombre_likes
-    })
+    return basculer_like(request, 'post', get_object_or_404(Post, id=post_id, est_actif=True))
 
 
 @login_required
@@ -302,7 +392,8 @@ def commenter_post(request, post_id):
                     message=f'{request.user.nom} {request.user.prenom} a répondu à votre commentaire',
                     lien=lien_post,
                     post=post,
-                    commentaire=commentaire
+                    commentaire=commentaire,
+                    acteur=request.user
                 )
         else:
             # Nouveau commentaire - notifier l'auteur du post
@@ -314,7 +405,8 @@ def commenter_post(request, post_id):
                     message=f'{request.user.nom} {request.user.prenom} a commenté votre post "{post.titre}"',
                     lien=lien_post,
                     post=post,
-                    commentaire=commentaire
+                    commentaire=commentaire,
+                    acteur=request.user
                 )
         
         messages.success(request, "Commentaire ajouté avec succès !")
@@ -325,60 +417,109 @@ def commenter_post(request, post_id):
 
 @login_required
 @require_http_methods(["POST"])
+@limiter('api', cle=par_utilisateur, json=True)
 def like_commentaire(request, commentaire_id):
     """Like/Unlike un commentaire (AJAX)"""
-    commentaire = get_object_or_404(Commentaire, id=commentaire_id, est_actif=True)
-    
-    like, created = LikeCommentaire.objects.get_or_create(
-        commentaire=commentaire,
-        utilisateur=request.user
-    )
-    
-    if created:
-        action = 'liked'
-        # Notifier l'auteur du commentaire (sauf si c'est lui qui a liké)
-        if commentaire.auteur != request.user:
-            lien_post = request.build_absolute_uri(reverse('forum:post_detail', args=[commentaire.post.communaute.slug, commentaire.post.slug]))
-            creer_notification(
-                utilisateur=commentaire.auteur,
-                type_notif='like_commentaire',
-                titre='Quelqu\'un a aimé votre commentaire',
-                message=f'{request.user.nom} {request.user.prenom} a aimé votre commentaire',
-                lien=lien_post,
-                post=commentaire.post,
-                commentaire=commentaire
-            )
-    else:
-        like.delete()
-        action = 'unliked'
-    
-    # Recharger le commentaire pour avoir le bon nombre de likes
-    commentaire.refresh_from_db()
-    
+    return basculer_like(request, 'commentaire', get_object_or_404(Commentaire, id=commentaire_id, est_actif=True))
+
+
+def basculer_like(request, type_cible, cible):
+    """Inverse le like de l'utilisateur sur une cible (endpoint unitaire historique)"""
+    etat = etat_likes(request.user, {type_cible: [cible.id]})[type_cible][cible.id]
+    etat = appliquer_likes(request.user, {type_cible: {cible.id: not etat['like']}}, request)[type_cible][cible.id]
     return JsonResponse({
         'success': True,
-        'action': action,
-        'likes_count': commentaire.nombre_likes
+        'action': 'liked' if etat['like'] else 'unliked',
+        'likes_count': etat['likes_count']
     })
 
 
+@login_required
+@require_http_methods(["POST"])
+@limiter('api', cle=par_utilisateur, json=True)
+def likes_lot(request):
+    """Applique plusieurs likes/unlikes en une requête.
+
+    Corps JSON : {"operations": [{"type": "post", "id": 12, "like": true}, ...]}
+    """
+    try:
+        operations = json.loads(request.body or b'{}').get('operations', [])
+    except (ValueError, AttributeError):
+        return JsonResponse({'success': False, 'erreur': 'JSON invalide'}, status=400)
+    if not isinstance(operations, list):
+        return JsonResponse({'success': False, 'erreur': 'operations doit être une liste'}, status=400)
+
+    etats = appliquer_likes(request.user, lire_operations(operations), request)
+    return JsonResponse({'success': True, 'etats': etats})
+
+
+@limiter('api', cle=par_utilisateur, methodes=('GET',), json=True)
+def likes_etat(request):
+    """État des likes de l'utilisateur et compteurs pour les cibles demandées (?post=1,2&commentaire=3)"""
+    ids_par_type = {}
+    for type_cible in CIBLES:
+        ids = [valeur for valeur in request.GET.get(type_cible, '').split(',') if valeur.isdigit()]
+        ids_par_type[type_cible] = [int(valeur) for valeur in ids]
+    return JsonResponse({'success': True, 'etats': etat_likes(request.user, ids_par_type)})
+
+
 @login_required
 def notifications_view(request):
     """Vue pour afficher les notifications de l'utilisateur"""
-    notifications = Notification.objects.filter(utilisateur=request.user).order_by('-date_creation')
-    non_lues = notifications.filter(lu=False).count()
-    
-    # Pagination
-    paginator = Paginator(notifications, 20)
-    page_number = request.GET.get('page')
-    notifications_page = paginator.get_page(page_number)
-    
     return render(request, 'forum/notifications.html', {
-        'notifications': notifications_page,
-        'non_lues': non_lues,
+        'notifications': page_notifications(request.user, request.GET.get('curseur')),
+        'non_lues': non_lues(request),
     })
 
 
+def page_notifications(utilisateur, curseur=None):
+    """Page de notifications d'un utilisateur (plus récentes d'abord), paginée par curseur.
+
+    Une seule requête sur l'index (utilisateur, -date_creation, id), relations optionnelles jointes.
+    """
+    notifications = Notification.objects.filter(utilisateur=utilisateur).select_related(
+        'post', 'commentaire', 'dernier_acteur'
+    )
+    return KeysetPaginator(notifications, ORDRE_NOTIFICATIONS, NOTIFICATIONS_PAR_PAGE).page(curseur)
+
+
+@login_required
+def notifications_suite(request):
+    """Page suivante des notifications (JSON, défilement infini)"""
+    notifications = page_notifications(request.user, request.GET.get('curseur'))
+    html = render_to_string('forum/partials/notifications.html', {
+        'notifications': notifications,
+    }, request=request)
+    return JsonResponse({'html': html, 'curseur_suivant': notifications.curseur_suivant})
+
+
+async def flux_notifications(request):
+    """Flux SSE : compteur de non lues et aperçu des nouvelles notifications (servi par l'application ASGI)"""
+    utilisateur = await request.auser()
+    if not utilisateur.is_authenticated:
+        # 204 : EventSource abandonne au lieu de se reconnecter en boucle
+        return HttpResponse(status=204)
+
+    async def compteur():
+        nombre = await CompteurNotifications.objects.filter(
+            utilisateur_id=utilisateur.pk
+        ).values_list('non_lues', flat=True).afirst()
+        return [('compteur', {'non_lues': nombre or 0})]
+
+    async def transformer(message):
+        if message['type'] == 'compteur':
+            return await compteur()
+        return [('notification', message['donnees'])]
+
+    return reponse_sse(
+        request,
+        [CompteurNotifications.canal(utilisateur.pk)],
+        cle=f'utilisateur:{utilisateur.pk}',
+        initial=compteur,
+        transformer=transformer,
+    )
+
+
 @login_required
 @require_http_methods(["POST"])
 def marquer_notification_lue(request, notification_id):
@@ -393,5 +534,5 @@ def marquer_notification_lue(request, notification_id):
 @require_http_methods(["POST"])
 def marquer_toutes_lues(request):
     """Marquer toutes les notifications comme lues"""
-    Notification.objects.filter(utilisateur=request.user, lu=False).update(lu=True)
-    return JsonResponse({'success': True})
+    total = tout_marquer_lu(request.user)
+    return JsonResponse({'success': True, 'marquees': total})
@@ -1,6 +1,7 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from CODMTracker.televersement import image_televersee
 from .models import ProfilJoueur
 from boutique.models import Commande
 
@@ -13,13 +14,17 @@ def create_profil_view(request):
     
     if request.method == 'POST':
         uid_codm = request.POST.get('uid_codm', '').strip()
-        avatar_file = request.FILES.get('avatar')
+        avatar_file, erreur_avatar = image_televersee(request, 'avatar')
         bio = request.POST.get('bio', '').strip()
         niveau = request.POST.get('niveau', '1')
         rang_mj = request.POST.get('rang_mj', '').strip()
         rang_br = request.POST.get('rang_br', '').strip()
         
         # Validations
+        if erreur_avatar:
+            messages.error(request, erreur_avatar)
+            return render(request, 'profils/create_profil.html')
+        
         if not rang_mj or not rang_br:
             messages.error(request, "Les rangs Multijoueur et Battle Royale sont obligatoires.")
             return render(request, 'profils/create_profil.html')
@@ -78,8 +83,11 @@ def edit_profil_view(request):
         profil.uid_codm = request.POST.get('uid_codm', '').strip() or None
         profil.bio = request.POST.get('bio', '').strip()
         
-        # Gestion de l'upload d'image
-        avatar_file = request.FILES.get('avatar')
+        # Gestion de l'upload d'image (taille et en-tête vérifiés avant tout décodage)
+        avatar_file, erreur_avatar = image_televersee(request, 'avatar')
+        if erreur_avatar:
+            messages.error(request, erreur_avatar)
+            return render(request, 'profils/edit_profil.html', {'profil': profil})
         if avatar_file:
             profil.avatar = avatar_file
         
@@ -220,4 +220,152 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     `;
     document.head.appendChild(style);
+
+    // Pagination par curseur : "Voir plus" charge la page suivante en JSON (défilement infini)
+    document.querySelectorAll('[data-charger-plus]').forEach(bouton => {
+        let enCours = false;
+
+        function chargerPlus() {
+            if (enCours || !bouton.dataset.curseur) return;
+            enCours = true;
+            const url = new URL(bouton.dataset.url, window.location.origin);
+            url.searchParams.set('curseur', bouton.dataset.curseur);
+            fetch(url, { headers: { 'Accept': 'application/json' } })
+                .then(response => response.json())
+                .then(data => {
+                    const cible = document.getElementById(bouton.dataset.cible);
+                    if (cible) {
+                        cible.insertAdjacentHTML('beforeend', data.html);
+                    }
+                    if (data.curseur_suivant) {
+                        bouton.dataset.curseur = data.curseur_suivant;
+                        const lien = new URL(bouton.href);
+                        lien.searchParams.set('curseur', data.curseur_suivant);
+                        bouton.href = lien;
+                    } else {
+                        bouton.closest('.pagination').remove();
+                        chargementAuto.disconnect();
+                    }
+                })
+                .catch(error => console.error('Error:', error))
+                .finally(() => { enCours = false; });
+        }
+
+        bouton.addEventListener('click', function(e) {
+            e.preventDefault();
+            chargerPlus();
+        });
+
+        // Chargement automatique quand le bouton arrive à l'écran
+        const chargementAuto = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                chargerPlus();
+            }
+        }, { rootMargin: '200px' });
+        chargementAuto.observe(bouton);
+    });
+
+    // Likes : l'interface change tout de suite, les changements partent groupés
+    const likesEnAttente = new Map();
+    let minuteurLikes = null;
+
+    function csrfToken() {
+        const cookie = document.cookie.split('; ').find(c => c.startsWith('csrftoken='));
+        return cookie ? decodeURIComponent(cookie.split('=')[1]) : '';
+    }
+
+    function appliquerEtatsLikes(etats) {
+        Object.entries(etats).forEach(([type, cibles]) => {
+            Object.entries(cibles).forEach(([id, etat]) => {
+                if (likesEnAttente.has(`${type}:${id}`)) return;
+                document.querySelectorAll(`[data-like="${type}"][data-like-id="${id}"]`).forEach(bouton => {
+                    bouton.classList.toggle('liked', etat.like);
+                    const compteur = bouton.querySelector('.likes-count');
+                    if (compteur) compteur.textContent = etat.likes_count;
+                });
+            });
+        });
+    }
+
+    function envoyerLikes() {
+        clearTimeout(minuteurLikes);
+        if (!likesEnAttente.size) return;
+        const operations = [...likesEnAttente].map(([cle, like]) => {
+            const [type, id] = cle.split(':');
+            return { type: type, id: Number(id), like: like };
+        });
+        likesEnAttente.clear();
+        fetch('/forum/likes/', {
+            method: 'POST',
+            keepalive: true,
+            headers: {
+                'X-CSRFToken': csrfToken(),
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ operations: operations }),
+        })
+            .then(response => response.json())
+            .then(data => { if (data.success) appliquerEtatsLikes(data.etats); })
+            .catch(error => console.error('Error:', error));
+    }
+
+    document.addEventListener('click', function(e) {
+        const bouton = e.target.closest('[data-like]');
+        if (!bouton) return;
+        e.preventDefault();
+        const like = !bouton.classList.contains('liked');
+        bouton.classList.toggle('liked', like);
+        const compteur = bouton.querySelector('.likes-count');
+        if (compteur) compteur.textContent = Math.max(0, Number(compteur.textContent) + (like ? 1 : -1));
+        likesEnAttente.set(`${bouton.dataset.like}:${bouton.dataset.likeId}`, like);
+        clearTimeout(minuteurLikes);
+        minuteurLikes = setTimeout(envoyerLikes, 500);
+    });
+
+    // Ne pas perdre les derniers clics en quittant la page
+    window.addEventListener('pagehide', envoyerLikes);
+
+    // Retour arrière (page restaurée depuis le cache du navigateur) : resynchroniser l'état
+    window.addEventListener('pageshow', function(e) {
+        if (!e.persisted) return;
+        const ids = {};
+        document.querySelectorAll('[data-like]').forEach(bouton => {
+            (ids[bouton.dataset.like] = ids[bouton.dataset.like] || []).push(bouton.dataset.likeId);
+        });
+        const params = new URLSearchParams(Object.entries(ids).map(([type, liste]) => [type, liste.join(',')]));
+        if (![...params].length) return;
+        fetch(`/forum/likes/etat/?${params}`, { headers: { 'Accept': 'application/json' } })
+            .then(response => response.json())
+            .then(data => { if (data.success) appliquerEtatsLikes(data.etats); })
+            .catch(error => console.error('Error:', error));
+    });
+
+    // Notifications en temps réel (flux SSE, attribut présent seulement si FLUX_TEMPS_REEL est activé)
+    const cloche = document.querySelector('[data-flux-notifications]');
+    if (cloche && window.EventSource) {
+        const badge = cloche.querySelector('.notifications-count');
+        let flux = null;
+
+        function ouvrirFlux() {
+            flux = new EventSource(cloche.dataset.fluxNotifications);
+
+            flux.addEventListener('compteur', function(e) {
+                const nombre = JSON.parse(e.data).non_lues;
+                badge.textContent = nombre;
+                badge.style.display = nombre > 0 ? 'flex' : 'none';
+            });
+
+            flux.addEventListener('notification', function(e) {
+                const notification = JSON.parse(e.data);
+                cloche.title = notification.titre;
+                // Les pages intéressées (liste des notifications...) peuvent réagir
+                document.dispatchEvent(new CustomEvent('notification-recue', { detail: notification }));
+            });
+        }
+
+        ouvrirFlux();
+        // Libère la connexion (et la place dans la limite par utilisateur) en quittant la page
+        window.addEventListener('pagehide', () => flux.close());
+        window.addEventListener('pageshow', e => { if (e.persisted) ouvrirFlux(); });
+    }
 });
@@ -3,6 +3,7 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
 from django.utils import timezone
+from CODMTracker.limites import limiter, par_utilisateur
 from .models import StatistiquesJoueur
 from profils.models import ProfilJoueur
 from tournois.models import Tournoi, ParticipantTournoi
@@ -100,6 +101,7 @@ def classements_view(request):
     })
 
 @login_required
+@limiter('api', cle=par_utilisateur, json=True)
 def add_stats_view(request):
     """Vue pour ajouter/modifier des statistiques (AJAX)"""
     if request.method != 'POST':
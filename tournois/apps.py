@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class TournoisConfig(AppConfig):
     name = 'tournois'
+
+    def ready(self):
+        from . import signals  # Connexion des receivers (invalidation du cache)
@@ -0,0 +1,69 @@
+"""
+Envoie un email de rappel aux participants des tournois qui commencent bientôt (une fois par tournoi)
+Usage: python manage.py rappeler_tournois --heures 24 --taille-lot 500
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+from django.utils import timezone
+from CODMTracker.courriels import envoyer_modele_en_masse
+from tournois.models import ParticipantTournoi, Tournoi
+
+
+class Command(BaseCommand):
+    help = 'Met en file les rappels des tournois qui commencent dans les prochaines heures'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--heures',
+            type=int,
+            default=24,
+            help='Fenêtre avant le début du tournoi',
+        )
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=500,
+            help='Nombre de participants lus par requête',
+        )
+
+    def handle(self, *args, **options):
+        maintenant = timezone.now()
+        tournois = Tournoi.objects.filter(
+            date_debut__gt=maintenant,
+            date_debut__lte=maintenant + timedelta(hours=options['heures']),
+            rappel_envoye_le__isnull=True,
+        )
+        lien = settings.SITE_URL.rstrip('/') + reverse('tournois:tournaments')
+        total = 0
+
+        for tournoi in tournois:
+            contexte_tournoi = {
+                'tournoi': tournoi.titre,
+                'mode': tournoi.get_mode_display(),
+                'date_debut': tournoi.date_debut,
+                'recompense': tournoi.recompense,
+                'lien': lien,
+            }
+
+            def envois():
+                dernier_id = 0
+                # Parcours keyset sur l'id : mémoire bornée même pour un gros tournoi
+                while True:
+                    lignes = list(
+                        ParticipantTournoi.objects.filter(tournoi=tournoi, pk__gt=dernier_id)
+                        .order_by('pk')
+                        .values_list('pk', 'profil__utilisateur__email', 'profil__utilisateur__prenom')[:options['taille_lot']]
+                    )
+                    if not lignes:
+                        return
+                    for dernier_id, email, prenom in lignes:
+                        yield email, {**contexte_tournoi, 'prenom': prenom}
+
+            envoyes = envoyer_modele_en_masse('rappel_tournoi', f"Rappel : {tournoi.titre} commence bientôt", envois())
+            Tournoi.objects.filter(pk=tournoi.pk).update(rappel_envoye_le=maintenant)
+            total += envoyes
+            self.stdout.write(f"📣 {tournoi.titre} : {envoyes} rappel(s) mis en file")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {total} rappel(s) mis en file"))
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournois', '0005_alter_tournoi_type_tournoi'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournoi',
+            name='rappel_envoye_le',
+            field=models.DateTimeField(blank=True, help_text="Date d'envoi du rappel aux participants (commande rappeler_tournois)", null=True),
+        ),
+    ]
@@ -19,6 +19,7 @@ class Tournoi(models.Model):
     recompense = models.CharField(max_length=100)
     image = models.ImageField(upload_to='tournois/', blank=True, null=True, help_text="Image du tournoi")
     prix_participation = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, help_text="Prix total de participation en FCFA")
+    rappel_envoye_le = models.DateTimeField(blank=True, null=True, help_text="Date d'envoi du rappel aux participants (commande rappeler_tournois)")
 
     def __str__(self):
         return f"{self.titre} - {self.get_mode_display()}"
@@ -0,0 +1,74 @@
+# tournois/salon.py
+# Salon d'équipe en temps réel : les membres voient arriver leurs coéquipiers sans recharger
+from django.db import transaction
+from CODMTracker.pubsub import a_des_abonnes, publier
+from .models import EquipeTournoi
+
+
+def canal(equipe_id):
+    return f'salon:{equipe_id}'
+
+
+def etat_equipe(equipe):
+    """État complet de l'équipe, commun à tous les membres (diffusé tel quel sur le canal)"""
+    membres = equipe.membres.select_related('profil__utilisateur').order_by('rejoint_le')
+    return {
+        'id': equipe.id,
+        'code': equipe.code_invitation,
+        'createur_id': equipe.createur_id,
+        'nb_requis': equipe.get_nb_membres_requis(),
+        'complete': equipe.complete,
+        'membres': [
+            {
+                'profil_id': m.profil_id,
+                'nom': m.profil.utilisateur.nom,
+                'prenom': m.profil.utilisateur.prenom,
+                'email': m.profil.utilisateur.email,
+            }
+            for m in membres
+        ],
+    }
+
+
+def charger_etat(equipe_id):
+    equipe = EquipeTournoi.objects.select_related('tournoi').get(pk=equipe_id)
+    return etat_equipe(equipe)
+
+
+def vue_equipe(etat, profil_id):
+    """État vu par un membre (format de check_registration_view : is_me, is_createur)"""
+    return {
+        'id': etat['id'],
+        'code': etat['code'],
+        'is_createur': etat['createur_id'] == profil_id,
+        'nb_membres': len(etat['membres']),
+        'nb_requis': etat['nb_requis'],
+        'complete': etat['complete'],
+        'membres': [
+            {
+                'nom': m['nom'],
+                'prenom': m['prenom'],
+                'email': m['email'],
+                'is_me': m['profil_id'] == profil_id,
+                'is_createur': m['profil_id'] == etat['createur_id'],
+            }
+            for m in etat['membres']
+        ],
+    }
+
+
+def diffuser(equipe_id):
+    """Après validation de l'inscription, pousse le nouvel état aux membres connectés au salon.
+
+    L'état n'est relu en base que si quelqu'un écoute le canal.
+    """
+    def _diffuser():
+        if not a_des_abonnes(canal(equipe_id)):
+            return
+        etat = charger_etat(equipe_id)
+        publier(canal(equipe_id), {
+            'evenement': 'equipe_complete' if etat['complete'] else 'membre_rejoint',
+            'etat': etat,
+        })
+
+    transaction.on_commit(_diffuser)
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from CODMTracker.cache import invalider_cache
+from .models import Tournoi
+
+
+@receiver([post_save, post_delete], sender=Tournoi)
+def invalider_cache_tournois(sender, **kwargs):
+    """Tournoi créé / modifié / supprimé → la liste publique est recalculée"""
+    invalider_cache('tournois')
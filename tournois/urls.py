@@ -7,4 +7,5 @@ urlpatterns = [
     path('', views.tournaments_view, name='tournaments'),
     path('register/<int:tournoi_id>/', views.register_tournament_view, name='register'),
     path('check/<int:tournoi_id>/', views.check_registration_view, name='check_registration'),
+    path('equipe/<int:equipe_id>/salon/', views.salon_equipe, name='salon_equipe'),
 ]
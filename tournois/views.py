@@ -2,12 +2,18 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+from asgiref.sync import sync_to_async
 from decimal import Decimal
 import secrets
 from .models import Tournoi, ParticipantTournoi, EquipeTournoi
 from profils.models import ProfilJoueur
+from CODMTracker.cache import cache_anonyme
+from CODMTracker.limites import limiter, par_utilisateur
+from CODMTracker.sse import reponse_sse
+from . import salon
 
+@cache_anonyme('tournois', timeout=60)
 def tournaments_view(request):
     """Vue pour la page des tournois avec distinction en cours/à venir (automatique via dates)"""
     now = timezone.now()
@@ -39,23 +45,7 @@ def tournaments_view(request):
                 if participant:
                     equipe_info = None
                     if participant.equipe:
-                        equipe_info = {
-                            'code': participant.equipe.code_invitation,
-                            'is_createur': participant.equipe.createur == profil,
-                            'nb_membres': participant.equipe.get_nb_membres(),
-                            'nb_requis': participant.equipe.get_nb_membres_requis(),
-                            'complete': participant.equipe.complete,
-                            'membres': [
-                                {
-                                    'nom': m.profil.utilisateur.nom,
-                                    'prenom': m.profil.utilisateur.prenom,
-                                    'email': m.profil.utilisateur.email,
-                                    'is_me': m.profil == profil,
-                                    'is_createur': m.profil == participant.equipe.createur
-                                }
-                                for m in participant.equipe.membres.all()
-                            ]
-                        }
+                        equipe_info = salon.vue_equipe(salon.etat_equipe(participant.equipe), profil.id)
                     user_registrations[tournoi.id] = {
                         'is_registered': True,
                         'equipe': equipe_info
@@ -108,6 +98,7 @@ def generate_invitation_code():
             return code
 
 @login_required
+@limiter('api', cle=par_utilisateur, json=True)
 def register_tournament_view(request, tournoi_id):
     """Vue pour s'inscrire à un tournoi avec paiement (gère solo/duo/escouade/MJ)"""
     if request.method != 'POST':
@@ -183,6 +174,7 @@ def register_tournament_view(request, tournoi_id):
                         equipe=equipe,
                         paiement_effectue=True
                     )
+                    salon.diffuser(equipe.id)
                     return JsonResponse({
                         'success': True,
                         'message': f'Équipe créée ! Code d\'invitation: {code}. Partagez ce code avec vos coéquipiers.',
@@ -213,6 +205,7 @@ def register_tournament_view(request, tournoi_id):
                     if nb_membres >= nb_requis:
                         equipe.complete = True
                         equipe.save()
+                        salon.diffuser(equipe.id)
                         return JsonResponse({'success': False, 'error': 'Cette équipe est complète'}, status=400)
                     
                     # Calculer le prix à payer (prix par personne)
@@ -235,6 +228,8 @@ def register_tournament_view(request, tournoi_id):
                         if nb_membres_apres >= nb_requis:
                             equipe.complete = True
                             equipe.save()
+                        # Les coéquipiers connectés au salon voient l'arrivée (et la complétion) en direct
+                        salon.diffuser(equipe.id)
                         
                         return JsonResponse({
                             'success': True,
@@ -254,6 +249,7 @@ def register_tournament_view(request, tournoi_id):
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 @login_required
+@limiter('api', cle=par_utilisateur, methodes=('GET', 'POST'), json=True)
 def check_registration_view(request, tournoi_id):
     """Vérifier si l'utilisateur est inscrit au tournoi et retourner les détails"""
     try:
@@ -264,22 +260,7 @@ def check_registration_view(request, tournoi_id):
         if participant:
             equipe_info = None
             if participant.equipe:
-                equipe_info = {
-                    'code': participant.equipe.code_invitation,
-                    'is_createur': participant.equipe.createur == profil,
-                    'nb_membres': participant.equipe.get_nb_membres(),
-                    'nb_requis': participant.equipe.get_nb_membres_requis(),
-                    'complete': participant.equipe.complete,
-                    'membres': [
-                        {
-                            'nom': m.profil.utilisateur.nom,
-                            'prenom': m.profil.utilisateur.prenom,
-                            'email': m.profil.utilisateur.email,
-                            'is_me': m.profil == profil
-                        }
-                        for m in participant.equipe.membres.all()
-                    ]
-                }
+                equipe_info = salon.vue_equipe(salon.etat_equipe(participant.equipe), profil.id)
             
             return JsonResponse({
                 'is_registered': True,
@@ -290,3 +271,29 @@ def check_registration_view(request, tournoi_id):
         return JsonResponse({'is_registered': False})
     except Exception as e:
         return JsonResponse({'is_registered': False, 'error': str(e)})
+
+
+async def salon_equipe(request, equipe_id):
+    """Flux SSE du salon d'une équipe : arrivées des membres et complétion (servi par l'application ASGI)"""
+    utilisateur = await request.auser()
+    if not utilisateur.is_authenticated:
+        return HttpResponse(status=204)
+    profil = await ProfilJoueur.objects.filter(utilisateur=utilisateur).only('id').afirst()
+    # Seuls les membres de l'équipe écoutent son salon ; 204 pour que EventSource ne réessaie pas
+    if profil is None or not await ParticipantTournoi.objects.filter(equipe_id=equipe_id, profil=profil).aexists():
+        return HttpResponse(status=204)
+
+    async def initial():
+        etat = await sync_to_async(salon.charger_etat)(equipe_id)
+        return [('equipe', salon.vue_equipe(etat, profil.id))]
+
+    async def transformer(message):
+        return [(message['evenement'], salon.vue_equipe(message['etat'], profil.id))]
+
+    return reponse_sse(
+        request,
+        [salon.canal(equipe_id)],
+        cle=f'salon:{utilisateur.pk}',
+        initial=initial,
+        transformer=transformer,
+    )
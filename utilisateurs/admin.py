@@ -31,7 +31,7 @@ class UtilisateurAdmin(BaseUserAdmin):
 @admin.register(OtpCode)
 class OtpCodeAdmin(admin.ModelAdmin):
     """Configuration admin pour le modèle OtpCode"""
-    list_display = ('code', 'get_identifier', 'utilisateur', 'created_at', 'is_valid_display')
+    list_display = ('code', 'get_identifier', 'utilisateur', 'created_at', 'tentatives', 'is_valid_display')
     list_filter = ('created_at',)
     search_fields = ('code', 'numero', 'utilisateur__email', 'utilisateur__nom', 'utilisateur__prenom')
     readonly_fields = ('created_at', 'is_valid_display')
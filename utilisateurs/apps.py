@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class UtilisateursConfig(AppConfig):
     name = 'utilisateurs'
+
+    def ready(self):
+        from . import signals  # Connexion des receivers (cache des identifiants inconnus)
@@ -0,0 +1,88 @@
+# utilisateurs/backends.py
+# Connexion par email ou numéro : une requête indexée et un seul hachage du mot de passe
+import hashlib
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+from django.core.cache import cache
+from CODMTracker.limites import prendre_hachage
+from .models import Utilisateur
+from .utils.valider_numero import valider_et_normaliser_numero
+
+PREFIXE_INCONNU = 'auth_inconnu'
+
+
+def normaliser_identifiant(identifiant):
+    """('email', adresse en minuscules) ou ('numero', +225...) ; None si l'identifiant est invalide"""
+    identifiant = (identifiant or '').strip()
+    if '@' in identifiant:
+        return 'email', identifiant.lower()
+    numero = valider_et_normaliser_numero(identifiant)
+    if numero:
+        return 'numero', numero
+    return None
+
+
+def _cle_inconnu(champ, valeur):
+    return f"{PREFIXE_INCONNU}:{champ}:{hashlib.md5(valeur.encode('utf-8')).hexdigest()}"
+
+
+def oublier_inconnu(utilisateur):
+    """Compte créé ou modifié : ses identifiants ne sont plus inconnus"""
+    cles = [_cle_inconnu('email', utilisateur.email.lower())]
+    if utilisateur.numero:
+        cles.append(_cle_inconnu('numero', utilisateur.numero))
+    cache.delete_many(cles)
+
+
+class EmailOuNumeroBackend(ModelBackend):
+    """Authentifie avec l'email (insensible à la casse) ou le numéro de téléphone.
+
+    - Une seule requête : LOWER(email) ou numero, tous deux indexés.
+    - Un seul hachage, seulement si le compte existe, dans la limite du seau
+      global 'hachage' : au-delà, échec et attente notée dans request._hachage_refuse.
+    - Un identifiant sans compte est mémorisé AUTH_INCONNU_DUREE secondes :
+      les essais répétés ne touchent plus la base. L'effacement à la création du
+      compte (signals.py) suppose le cache commun aux workers : avec LocMem, seul
+      le worker qui a créé le compte l'oublie, les autres refusent la connexion
+      jusqu'à expiration (d'où CODMTracker.E001 hors DEBUG).
+
+    Appelé avec `identifiant=` (formulaire de connexion), un échec est définitif :
+    le backend allauth suivant referait la recherche et un hachage factice.
+    """
+
+    def authenticate(self, request, username=None, password=None, identifiant=None, **kwargs):
+        definitif = identifiant is not None
+        utilisateur = self._authentifier(request, identifiant or username or kwargs.get(Utilisateur.USERNAME_FIELD), password)
+        if utilisateur is None and definitif:
+            raise PermissionDenied
+        return utilisateur
+
+    def _authentifier(self, request, identifiant, password):
+        if not identifiant or password is None:
+            return None
+        resolu = normaliser_identifiant(identifiant)
+        if resolu is None:
+            return None
+        champ, valeur = resolu
+
+        cle = _cle_inconnu(champ, valeur)
+        if cache.get(cle):
+            return None
+        if champ == 'email':
+            utilisateurs = Utilisateur.objects.par_email(valeur)
+        else:
+            utilisateurs = Utilisateur.objects.filter(numero=valeur)
+        utilisateur = utilisateurs.order_by('pk').first()
+        if utilisateur is None:
+            cache.set(cle, 1, getattr(settings, 'AUTH_INCONNU_DUREE', 60))
+            return None
+
+        autorise, attente = prendre_hachage()
+        if not autorise:
+            if request is not None:
+                request._hachage_refuse = attente
+            return None
+        if utilisateur.check_password(password) and self.user_can_authenticate(utilisateur):
+            return utilisateur
+        return None
@@ -0,0 +1,26 @@
+"""
+Supprime les codes OTP expirés, par lots
+Usage: python manage.py purger_otp --taille-lot 1000
+"""
+from django.core.management.base import BaseCommand
+from utilisateurs.otp import purger
+
+
+class Command(BaseCommand):
+    help = 'Supprime les codes OTP sortis de leur fenêtre de validité'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=1000,
+            help='Nombre de codes supprimés par requête',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        # Lots courts sur l'index created_at : pas de long verrou sur la table
+        for total in purger(taille_lot=options['taille_lot']):
+            self.stdout.write(f'→ {total} code(s) supprimé(s)')
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ {total} code(s) OTP expiré(s) supprimé(s)'))
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('utilisateurs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='otpcode',
+            name='tentatives',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Codes erronés saisis pour cet identifiant'),
+        ),
+        migrations.AddIndex(
+            model_name='otpcode',
+            index=models.Index(fields=['numero', 'created_at'], name='otp_numero_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='otpcode',
+            index=models.Index(fields=['created_at'], name='otp_date_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:19
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('utilisateurs', '0002_otp_tentatives_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='utilisateur',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='utilisateur_email_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='utilisateur',
+            index=models.Index(fields=['numero'], name='utilisateur_numero_idx'),
+        ),
+    ]
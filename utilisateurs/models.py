@@ -1,6 +1,7 @@
 # utilisateurs/models.py
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.db.models.functions import Lower
 from django.utils import timezone
 import datetime
 
@@ -23,6 +24,10 @@ class UserManager(BaseUserManager):
 
         return self.create_user(email, password, **extra_fields)
 
+    def par_email(self, email):
+        """Recherche insensible à la casse servie par l'index LOWER(email) (email__iexact ne l'utilise pas)"""
+        return self.alias(email_minuscule=Lower('email')).filter(email_minuscule=email.strip().lower())
+
 
 
 # Modèle pour l'utilisateur
@@ -46,10 +51,21 @@ class Utilisateur(AbstractUser):
 
     objects = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Connexion et inscription : email insensible à la casse, numéro de téléphone
+            models.Index(Lower('email'), name='utilisateur_email_lower_idx'),
+            models.Index(fields=['numero'], name='utilisateur_numero_idx'),
+        ]
+
     def __str__(self):
         return f"{self.nom} {self.prenom}"
 
 
+# Durée de validité d'un code OTP (voir utilisateurs/otp.py)
+DUREE_VALIDITE_OTP = datetime.timedelta(minutes=10)
+
+
 # Modèle pour les codes OTP
 class OtpCode(models.Model):
     utilisateur = models.ForeignKey(
@@ -61,9 +77,18 @@ class OtpCode(models.Model):
     numero = models.CharField(max_length=20, blank=True, null=True)  # Peut être un numéro ou un email
     code = models.CharField(max_length=6)
     created_at = models.DateTimeField(auto_now_add=True)
+    tentatives = models.PositiveSmallIntegerField(default=0, help_text="Codes erronés saisis pour cet identifiant")
+
+    class Meta:
+        indexes = [
+            # Dernier code d'un identifiant dans la fenêtre de validité
+            models.Index(fields=['numero', 'created_at'], name='otp_numero_date_idx'),
+            # Purge des codes expirés
+            models.Index(fields=['created_at'], name='otp_date_idx'),
+        ]
 
     def is_valid(self):
-        return timezone.now() - self.created_at < datetime.timedelta(minutes=10)
+        return timezone.now() - self.created_at < DUREE_VALIDITE_OTP
 
     def __str__(self):
         identifier = self.numero or (self.utilisateur.numero if self.utilisateur else "N/A")
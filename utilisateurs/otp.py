@@ -0,0 +1,106 @@
+# utilisateurs/otp.py
+# Codes OTP : un seul code actif par identifiant, usage unique, tentatives limitées
+import math
+import secrets
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from .models import DUREE_VALIDITE_OTP, OtpCode
+
+# Codes erronés acceptés avant verrouillage (jusqu'à expiration du dernier code)
+TENTATIVES_MAX = 5
+
+VALIDE = 'valide'
+INVALIDE = 'invalide'
+EXPIRE = 'expire'
+VERROUILLE = 'verrouille'
+
+MESSAGES = {
+    INVALIDE: "Code incorrect.",
+    EXPIRE: "Code expiré. Demandez un nouveau code.",
+    VERROUILLE: "Trop de tentatives. Demandez un nouveau code dans {minutes} minute(s).",
+}
+
+
+def generer_code():
+    return f"{secrets.randbelow(1_000_000):06d}"
+
+
+def _codes_valides(identifiant):
+    """Codes de l'identifiant encore dans la fenêtre de validité (index numero, created_at)"""
+    return OtpCode.objects.filter(
+        numero=identifiant,
+        created_at__gte=timezone.now() - DUREE_VALIDITE_OTP,
+    )
+
+
+def attente_verrouillage(identifiant):
+    """Secondes avant de pouvoir demander un nouveau code, 0 si l'identifiant n'est pas verrouillé.
+
+    Le verrouillage dure jusqu'à l'expiration du code verrouillé : un renvoi ne le prolonge pas.
+    """
+    verrouille_le = _codes_valides(identifiant).filter(
+        tentatives__gte=TENTATIVES_MAX
+    ).order_by('-created_at').values_list('created_at', flat=True).first()
+    if verrouille_le is None:
+        return 0
+    return max(0, math.ceil((verrouille_le + DUREE_VALIDITE_OTP - timezone.now()).total_seconds()))
+
+
+def message(resultat, identifiant):
+    """Message d'erreur d'un résultat, avec l'attente restante pour VERROUILLE"""
+    if resultat == VERROUILLE:
+        return MESSAGES[VERROUILLE].format(minutes=max(1, math.ceil(attente_verrouillage(identifiant) / 60)))
+    return MESSAGES[resultat]
+
+
+def emettre(identifiant):
+    """Crée le code actif de l'identifiant (email ou numéro) et retourne sa valeur.
+
+    Les codes précédents sont supprimés ; leurs tentatives sont reportées sur le
+    nouveau code, un renvoi ne remet donc pas le compteur à zéro. Si le code actif
+    est verrouillé, aucun code n'est émis (None) : il reste en place jusqu'à son
+    expiration, qui met fin au verrouillage.
+    """
+    with transaction.atomic():
+        tentatives = _codes_valides(identifiant).order_by('-created_at').values_list('tentatives', flat=True).first() or 0
+        if tentatives >= TENTATIVES_MAX:
+            return None
+        OtpCode.objects.filter(numero=identifiant).delete()
+        otp = OtpCode.objects.create(numero=identifiant, code=generer_code(), tentatives=tentatives)
+    return otp.code
+
+
+def verifier(identifiant, code):
+    """Vérifie et consomme le code actif : VALIDE, INVALIDE, EXPIRE ou VERROUILLE.
+
+    La tentative est prise avant la comparaison par un UPDATE conditionnel : des
+    requêtes simultanées ne peuvent pas dépasser TENTATIVES_MAX comparaisons.
+    La consommation est un DELETE : de deux vérifications simultanées du même
+    code, une seule supprime la ligne et réussit.
+    """
+    otp = _codes_valides(identifiant).order_by('-created_at').only('id', 'code', 'tentatives').first()
+    if otp is None:
+        return EXPIRE
+    prise = OtpCode.objects.filter(pk=otp.pk, tentatives__lt=TENTATIVES_MAX).update(tentatives=F('tentatives') + 1)
+    if not prise:
+        return VERROUILLE
+    if not constant_time_compare(otp.code, code):
+        return VERROUILLE if otp.tentatives + 1 >= TENTATIVES_MAX else INVALIDE
+    supprimes, _ = OtpCode.objects.filter(pk=otp.pk).delete()
+    return VALIDE if supprimes else INVALIDE
+
+
+def purger(avant=None, taille_lot=1000):
+    """Supprime les codes expirés par lots (index created_at) ; générateur du total cumulé"""
+    limite = avant or timezone.now() - DUREE_VALIDITE_OTP
+    expires = OtpCode.objects.filter(created_at__lt=limite)
+    total = 0
+    while True:
+        ids = list(expires.order_by('created_at').values_list('id', flat=True)[:taille_lot])
+        if not ids:
+            break
+        OtpCode.objects.filter(id__in=ids).delete()
+        total += len(ids)
+        yield total
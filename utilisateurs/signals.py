@@ -0,0 +1,12 @@
+# utilisateurs/signals.py
+# Invalide le cache des identifiants inconnus de la connexion quand un compte est enregistré
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .backends import oublier_inconnu
+from .models import Utilisateur
+
+
+@receiver(post_save, sender=Utilisateur)
+def oublier_identifiants_inconnus(sender, instance, **kwargs):
+    """Compte créé / modifié → la connexion ne doit plus le croire inexistant"""
+    oublier_inconnu(instance)
@@ -1,3 +1,133 @@
-from django.test import TestCase
+from django.contrib.auth import authenticate
+from django.utils import timezone
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from utilisateurs import otp
+from utilisateurs.models import DUREE_VALIDITE_OTP, OtpCode, Utilisateur
 
-# Create your tests here.
+CACHE_LOCAL = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=CACHE_LOCAL)
+class LimitesTests(TestCase):
+    """Limitation de débit des vues de connexion et d'inscription (CODMTracker/limites.py)"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_identifiant_normalise_partage_le_seau(self):
+        """« 07... » et « +225 07... » comptent dans le même seau connexion_identifiant"""
+        url = reverse('utilisateurs:login')
+        codes = [
+            self.client.post(url, {'identifiant': '+2250701020304' if i % 2 else '0701020304', 'password': 'x'}).status_code
+            for i in range(6)
+        ]
+        self.assertEqual(codes, [200] * 5 + [302])
+
+    @override_settings(LIMITES={'hachage': (2, 60)})
+    def test_etapes_sans_hachage_ne_consomment_pas_le_seau_global(self):
+        """L'étape 1 de l'inscription et les identifiants inconnus ne hachent rien"""
+        for i in range(5):
+            response = self.client.post(
+                reverse('utilisateurs:signup'),
+                {'action': 'step1', 'nom': 'N', 'prenom': 'P', 'email': f'nouveau{i}@test.fr', 'numero': 'x'},
+                REMOTE_ADDR=f'10.0.0.{i}',
+            )
+            self.assertEqual(response.status_code, 200)
+        for i in range(5):
+            response = self.client.post(
+                reverse('utilisateurs:login'), {'identifiant': f'inconnu{i}@test.fr', 'password': 'x'},
+                REMOTE_ADDR=f'10.0.1.{i}',
+            )
+            self.assertEqual(response.status_code, 200)
+
+    @override_settings(LIMITES={'hachage': (2, 60)})
+    def test_hachages_bornes_pour_tout_le_site(self):
+        Utilisateur.objects.create_user('joueur@test.fr', 'mdp-test-123', nom='Joueur', prenom='Test')
+        codes = [
+            self.client.post(
+                reverse('utilisateurs:login'), {'identifiant': 'joueur@test.fr', 'password': 'faux'},
+                REMOTE_ADDR=f'10.0.2.{i}',
+            ).status_code
+            for i in range(3)
+        ]
+        self.assertEqual(codes, [200, 200, 302])
+
+
+class OtpTests(TestCase):
+    """Codes OTP : usage unique et verrouillage après TENTATIVES_MAX erreurs (utilisateurs/otp.py)"""
+
+    def code_faux(self, code):
+        return '000000' if code != '000000' else '111111'
+
+    def test_code_a_usage_unique(self):
+        code = otp.emettre('joueur@test.fr')
+        self.assertEqual(otp.verifier('joueur@test.fr', code), otp.VALIDE)
+        self.assertEqual(otp.verifier('joueur@test.fr', code), otp.EXPIRE)
+
+    def test_verrouillage_apres_tentatives_max(self):
+        code = otp.emettre('joueur@test.fr')
+        resultats = [otp.verifier('joueur@test.fr', self.code_faux(code)) for _ in range(otp.TENTATIVES_MAX)]
+        self.assertEqual(resultats, [otp.INVALIDE] * (otp.TENTATIVES_MAX - 1) + [otp.VERROUILLE])
+        # Le bon code ne passe plus et la tentative n'est pas comptée au-delà du maximum
+        self.assertEqual(otp.verifier('joueur@test.fr', code), otp.VERROUILLE)
+        self.assertEqual(OtpCode.objects.get(numero='joueur@test.fr').tentatives, otp.TENTATIVES_MAX)
+
+    def test_renvoi_ne_prolonge_pas_le_verrouillage(self):
+        code = otp.emettre('joueur@test.fr')
+        for _ in range(otp.TENTATIVES_MAX):
+            otp.verifier('joueur@test.fr', self.code_faux(code))
+        # Verrouillé : pas de nouveau code, le message donne l'attente restante
+        self.assertIsNone(otp.emettre('joueur@test.fr'))
+        self.assertEqual(
+            otp.message(otp.VERROUILLE, 'joueur@test.fr'),
+            otp.MESSAGES[otp.VERROUILLE].format(minutes=int(DUREE_VALIDITE_OTP.total_seconds() // 60)),
+        )
+        # Le code verrouillé expire : le suivant repart de zéro tentative
+        OtpCode.objects.filter(numero='joueur@test.fr').update(created_at=timezone.now() - DUREE_VALIDITE_OTP)
+        self.assertEqual(otp.attente_verrouillage('joueur@test.fr'), 0)
+        code = otp.emettre('joueur@test.fr')
+        self.assertEqual(OtpCode.objects.get(numero='joueur@test.fr').tentatives, 0)
+        self.assertEqual(otp.verifier('joueur@test.fr', code), otp.VALIDE)
+
+    def test_renvoi_avant_verrouillage_garde_les_tentatives(self):
+        code = otp.emettre('joueur@test.fr')
+        otp.verifier('joueur@test.fr', self.code_faux(code))
+        otp.emettre('joueur@test.fr')
+        self.assertEqual(OtpCode.objects.get(numero='joueur@test.fr').tentatives, 1)
+
+
+@override_settings(CACHES=CACHE_LOCAL)
+class BackendTests(TestCase):
+    """Connexion par email ou numéro (utilisateurs/backends.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.utilisateur = Utilisateur.objects.create_user(
+            'Joueur@Test.fr', 'mdp-test-123', nom='Joueur', prenom='Test', numero='+2250701020304'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().post('/')
+
+    def test_email_insensible_a_la_casse_et_numero(self):
+        self.assertEqual(authenticate(self.request, identifiant='joueur@TEST.fr', password='mdp-test-123'), self.utilisateur)
+        self.assertEqual(authenticate(self.request, identifiant='0701020304', password='mdp-test-123'), self.utilisateur)
+        self.assertIsNone(authenticate(self.request, identifiant='joueur@test.fr', password='faux'))
+
+    def test_identifiant_inconnu_memorise_puis_oublie_a_l_inscription(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(authenticate(self.request, identifiant='nouveau@test.fr', password='mdp-test-123'))
+        with self.assertNumQueries(0):
+            self.assertIsNone(authenticate(self.request, identifiant='nouveau@test.fr', password='mdp-test-123'))
+        nouveau = Utilisateur.objects.create_user('nouveau@test.fr', 'mdp-test-123', nom='Nouveau', prenom='Test')
+        self.assertEqual(authenticate(self.request, identifiant='nouveau@test.fr', password='mdp-test-123'), nouveau)
+
+    @override_settings(LIMITES={'hachage': (1, 60)})
+    def test_hachage_refuse_note_sur_la_requete(self):
+        self.assertIsNone(authenticate(self.request, identifiant='joueur@test.fr', password='faux'))
+        self.assertFalse(hasattr(self.request, '_hachage_refuse'))
+        self.assertIsNone(authenticate(self.request, identifiant='joueur@test.fr', password='mdp-test-123'))
+        self.assertGreater(self.request._hachage_refuse, 0)
@@ -1,19 +1,40 @@
 from django.shortcuts import render
 from .utils.valider_numero import valider_et_normaliser_numero
 from .utils.sendmail import send_otp_email
-import random
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.shortcuts import redirect
 from django.utils import timezone
 from datetime import timedelta
-from .models import Utilisateur, OtpCode
+from .models import Utilisateur
+from .backends import normaliser_identifiant
+from . import otp
+from CODMTracker.limites import limiter, par_champ, prendre_hachage, reponse_refus
 
 
-def generate_otp():
-    return str(random.randint(100000, 999999))
+def _identifiant_connexion(request):
+    """Identifiant normalisé comme par le backend : « +225 07... » et « 07... » partagent un seau"""
+    normalise = normaliser_identifiant(request.POST.get('identifiant'))
+    return ':'.join(normalise) if normalise else None
+
+
+def _email_inscription(request):
+    """Email de l'inscription en cours (renvoi du code)"""
+    return (request.session.get('signup_data') or {}).get('email')
+
+
+def _email_mot_de_passe_oublie(request):
+    """Email qui reçoit un code (étape email ou renvoi) ; les autres étapes n'envoient rien"""
+    action = request.POST.get('action')
+    if action == 'email':
+        return request.POST.get('email', '').strip().lower() or None
+    if action == 'resend':
+        return request.session.get('fp_email')
+    return None
 
 # Create your views here.
+@limiter('connexion_ip')
+@limiter('connexion_identifiant', cle=_identifiant_connexion)
 def login_view(request):
     """
     Connexion de l'utilisateur.
@@ -32,41 +53,25 @@ def login_view(request):
             messages.error(request, "Veuillez remplir tous les champs.")
             return render(request, 'utilisateurs/login.html')
 
-        # Essayer d'abord avec l'email
-        try:
-            user = Utilisateur.objects.get(email__iexact=raw_identifiant)
-            authenticated_user = authenticate(request, username=user.email, password=password)
+        if normaliser_identifiant(raw_identifiant) is None:
+            messages.error(request, "Identifiant invalide. Utilisez votre email ou numéro de téléphone.")
+        else:
+            # Email ou numéro résolu par EmailOuNumeroBackend : une requête, un hachage
+            authenticated_user = authenticate(request, identifiant=raw_identifiant, password=password)
             if authenticated_user:
                 login(request, authenticated_user)
                 next_url = request.POST.get('next') or request.GET.get('next') or '/'
                 return redirect(next_url)
-            else:
-                messages.error(request, "Mot de passe incorrect.")
-                return render(request, 'utilisateurs/login.html')
-        except Utilisateur.DoesNotExist:
-            pass
-
-        # Si pas trouvé par email, essayer avec le numéro
-        numero = valider_et_normaliser_numero(raw_identifiant)
-        if numero:
-            try:
-                user_obj = Utilisateur.objects.get(numero=numero)
-                authenticated_user = authenticate(request, username=user_obj.email, password=password)
-                if authenticated_user:
-                    login(request, authenticated_user)
-                    next_url = request.POST.get('next') or request.GET.get('next') or '/'
-                    return redirect(next_url)
-                else:
-                    messages.error(request, "Mot de passe incorrect.")
-            except Utilisateur.DoesNotExist:
-                messages.error(request, "Aucun compte trouvé pour cet identifiant.")
-        else:
-            messages.error(request, "Identifiant invalide. Utilisez votre email ou numéro de téléphone.")
+            if getattr(request, '_hachage_refuse', None) is not None:
+                return reponse_refus(request, request._hachage_refuse)
+            messages.error(request, "Identifiant ou mot de passe incorrect.")
 
     return render(request, 'utilisateurs/login.html', {
         'next': request.GET.get('next', ''),
     })
     
+@limiter('inscription_ip')
+@limiter('otp_identifiant', cle=par_champ('email'))
 def signup_view(request):
     """
     Inscription de l'utilisateur en 2 étapes.
@@ -110,7 +115,7 @@ def signup_view(request):
                 return render(request, 'utilisateurs/signup.html', {'show_otp_form': False})
 
             # Vérifier si l'email existe déjà
-            if Utilisateur.objects.filter(email__iexact=email).exists():
+            if Utilisateur.objects.par_email(email).exists():
                 messages.error(request, "Cet email est déjà utilisé.")
                 return render(request, 'utilisateurs/signup.html', {'show_otp_form': False})
 
@@ -119,8 +124,11 @@ def signup_view(request):
                 messages.error(request, "Ce numéro est déjà utilisé.")
                 return render(request, 'utilisateurs/signup.html', {'show_otp_form': False})
 
-            # Générer et envoyer le code OTP
-            code = generate_otp()
+            # Générer et envoyer le code OTP (remplace un éventuel code précédent)
+            code = otp.emettre(numero)
+            if code is None:
+                messages.error(request, otp.message(otp.VERROUILLE, numero))
+                return render(request, 'utilisateurs/signup.html', {'show_otp_form': False})
             email_envoye = send_otp_email(email, code)
 
             if not email_envoye:
@@ -138,9 +146,6 @@ def signup_view(request):
             request.session.set_expiry(900)  # 15 minutes
             request.session.modified = True
 
-            # Créer le code OTP
-            OtpCode.objects.create(numero=numero, code=code)
-
             messages.success(request, f"Code de vérification envoyé à {email} !")
             return render(request, 'utilisateurs/signup.html', {
                 'show_otp_form': True,
@@ -166,16 +171,7 @@ def signup_view(request):
                     'signup_data': data
                 })
 
-            # Vérifier le code OTP
-            otp_exists = OtpCode.objects.filter(numero=data['numero'], code=code).exists()
-            if not otp_exists:
-                messages.error(request, "Code incorrect ou expiré.")
-                return render(request, 'utilisateurs/signup.html', {
-                    'show_otp_form': True,
-                    'signup_data': data
-                })
-
-            # Validation des mots de passe
+            # Validation des mots de passe (avant le code, qui est consommé à la vérification)
             if not password1 or not password2:
                 messages.error(request, "Les mots de passe sont obligatoires.")
                 return render(request, 'utilisateurs/signup.html', {
@@ -197,6 +193,20 @@ def signup_view(request):
                     'signup_data': data
                 })
 
+            # Jeton de hachage pris avant de consommer le code : un refus ne le fait pas perdre
+            autorise, attente = prendre_hachage()
+            if not autorise:
+                return reponse_refus(request, attente)
+
+            # Vérifier et consommer le code OTP
+            resultat = otp.verifier(data['numero'], code)
+            if resultat != otp.VALIDE:
+                messages.error(request, otp.message(resultat, data['numero']))
+                return render(request, 'utilisateurs/signup.html', {
+                    'show_otp_form': True,
+                    'signup_data': data
+                })
+
             # Création du compte
             try:
                 user = Utilisateur(
@@ -213,8 +223,8 @@ def signup_view(request):
                 request.session.pop('signup_data', None)
                 request.session.pop('_session_start_time', None)
 
-                # Connecter l'utilisateur
-                login(request, user)
+                # Connecter l'utilisateur (plusieurs backends configurés : préciser lequel)
+                login(request, user, backend='utilisateurs.backends.EmailOuNumeroBackend')
 
                 messages.success(request, "Compte créé avec succès ! Créez maintenant votre profil joueur.")
                 return redirect('profils:create_profil')
@@ -231,6 +241,8 @@ def signup_view(request):
     })
 
 
+@limiter('otp_ip')
+@limiter('otp_identifiant', cle=_email_inscription)
 def resend_otp_view(request):
     """
     Renvoyer un nouveau code OTP pendant l'inscription.
@@ -245,20 +257,24 @@ def resend_otp_view(request):
         messages.error(request, "Aucune inscription en cours.")
         return redirect('utilisateurs:signup')
 
-    code = generate_otp()
     numero = data['numero']
     email = data['email']
 
+    code = otp.emettre(numero)
+    if code is None:
+        messages.error(request, otp.message(otp.VERROUILLE, numero))
+        return redirect('utilisateurs:signup')
     email_envoye = send_otp_email(email, code)
     
     if email_envoye:
-        OtpCode.objects.create(numero=numero, code=code)
         messages.success(request, f"Nouveau code envoyé à {email} !")
     else:
         messages.error(request, "Impossible d'envoyer le code. Réessayez.")
     
     return redirect('utilisateurs:signup')
 
+@limiter('mot_de_passe_ip')
+@limiter('otp_identifiant', cle=_email_mot_de_passe_oublie)
 def forgot_password_view(request):
     """
     Mot de passe oublié → 3 étapes dans une seule view
@@ -285,11 +301,12 @@ def forgot_password_view(request):
                 messages.error(request, "Aucun compte associé à cet email.")
                 return render(request, "utilisateurs/forgot_password.html", {"step": "email"})
 
-            code = generate_otp()
+            code = otp.emettre(email)  # numero peut être un email pour forgot_password
+            if code is None:
+                messages.error(request, otp.message(otp.VERROUILLE, email))
+                return render(request, "utilisateurs/forgot_password.html", {"step": "email"})
             send_otp_email(email, code)
 
-            OtpCode.objects.create(numero=email, code=code)  # numero peut être un email pour forgot_password
-
             request.session['fp_email'] = email
             step = "otp"
             messages.success(request, "Code envoyé à votre email.")
@@ -303,8 +320,9 @@ def forgot_password_view(request):
                 messages.error(request, "Session expirée.")
                 return redirect("utilisateurs:forgot_password")
 
-            if not OtpCode.objects.filter(numero=email, code=code).exists():
-                messages.error(request, "Code incorrect ou expiré.")
+            resultat = otp.verifier(email, code)
+            if resultat != otp.VALIDE:
+                messages.error(request, otp.message(resultat, email))
                 return render(request, "utilisateurs/forgot_password.html", {"step": "otp", "email": email})
 
             request.session['fp_code_ok'] = True
@@ -315,9 +333,14 @@ def forgot_password_view(request):
 
         # 🔁 RENVOYER OTP
         if action == "resend":
-            code = generate_otp()
+            if not email:
+                messages.error(request, "Session expirée.")
+                return redirect("utilisateurs:forgot_password")
+            code = otp.emettre(email)
+            if code is None:
+                messages.error(request, otp.message(otp.VERROUILLE, email))
+                return render(request, "utilisateurs/forgot_password.html", {"step": "otp", "email": email})
             send_otp_email(email, code)
-            OtpCode.objects.create(numero=email, code=code)
             messages.success(request, "Nouveau code envoyé.")
             return render(request, "utilisateurs/forgot_password.html", {"step": "otp", "email": email})
 
@@ -338,6 +361,10 @@ def forgot_password_view(request):
                 messages.error(request, "Mot de passe trop court (6 caractères min).")
                 return render(request, "utilisateurs/forgot_password.html", {"step": "reset"})
 
+            autorise, attente = prendre_hachage()
+            if not autorise:
+                return reponse_refus(request, attente)
+
             user = Utilisateur.objects.get(email=email)
             user.set_password(password1)
             user.save()
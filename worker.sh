@@ -0,0 +1,7 @@
+#!/usr/bin/env bash
+# Worker d'envoi des courriels (service « Background Worker » sur Render, ou systemd/supervisor)
+# Sans lui, avec un backend SMTP, les courriels restent en file (codes OTP compris)
+set -o errexit
+
+echo "📨 Envoi des courriels en file"
+exec python manage.py envoyer_courriels --continu --intervalle 2 --purger-jours 7